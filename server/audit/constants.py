@@ -36,3 +36,8 @@ AUDIT_ACTIONS = {
     "SYSTEM": "system",
 }
 
+# Modules whose entries bypass the batched writer and are saved immediately
+# (login, lockout and other authentication events).
+SYNC_AUDIT_MODULES = {
+    AUDIT_MODULES["AUTH"],
+}
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:22
+
+import audit.search
+from django.db import migrations, models
+import audit.search
+
+
+def backfill_search_text(apps, schema_editor):
+    ActivityLog = apps.get_model('audit', 'ActivityLog')
+    batch = []
+    for entry in ActivityLog.objects.select_related('user').only(
+        'id', 'description', 'module', 'message', 'role', 'metadata',
+        'user__email', 'user__first_name', 'user__last_name',
+    ).iterator(chunk_size=2000):
+        entry.search_text = audit.search.build_search_text(entry, user=entry.user)
+        batch.append(entry)
+        if len(batch) >= 2000:
+            ActivityLog.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        ActivityLog.objects.bulk_update(batch, ['search_text'])
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE audit_activitylog ADD FULLTEXT INDEX audit_search_text_ft (search_text)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE audit_activitylog DROP INDEX audit_search_text_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitylog',
+            name='search_text',
+            field=audit.search.SearchTextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['created_at', 'id'], name='audit_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['action', 'created_at'], name='audit_action_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', 'created_at'], name='audit_user_created_idx'),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
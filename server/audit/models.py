@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .search import SearchTextField, build_search_text
+
 User = get_user_model()
 
 class ActivityLog(models.Model):
@@ -27,9 +29,21 @@ class ActivityLog(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Lower-cased text searched by keyword/user filters (FULLTEXT-indexed on MySQL)
+    search_text = SearchTextField(blank=True, default="", editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="audit_created_id_idx"),
+            models.Index(fields=["action", "created_at"], name="audit_action_created_idx"),
+            models.Index(fields=["user", "created_at"], name="audit_user_created_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.search_text:
+            self.search_text = build_search_text(self)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         user_display = getattr(self.user, "email", None) or str(self.user) if self.user else "System"
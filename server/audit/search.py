@@ -0,0 +1,30 @@
+"""
+Keyword search over the audit trail.
+
+Each ActivityLog stores a lower-cased `search_text` column combining its
+description, module, message, role, the acting user's e-mail/name and the
+metadata entity name/e-mail. On MySQL the column has a FULLTEXT index; the
+field, lookup and search_filter() are shared with the other searchable
+models (see core/search.py).
+"""
+from core.search import (  # noqa: F401 - re-exported for migrations and views
+    FULLTEXT_MIN_TOKEN_SIZE, FULLTEXT_STOPWORDS, FullTextMatch, SearchTextField, search_document, search_filter,
+)
+
+
+def build_search_text(entry, user=None):
+    """Text indexed for an ActivityLog (pass `user` to avoid a lazy FK fetch)"""
+    if user is None and entry.user_id:
+        user = entry.user
+    metadata = entry.metadata if isinstance(entry.metadata, dict) else {}
+    return search_document(
+        entry.description,
+        entry.module,
+        entry.message,
+        entry.role,
+        getattr(user, 'email', None),
+        getattr(user, 'first_name', None),
+        getattr(user, 'last_name', None),
+        metadata.get('entity_name'),
+        metadata.get('email'),
+    )
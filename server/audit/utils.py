@@ -2,8 +2,10 @@ from copy import deepcopy
 
 from django.utils.text import capfirst
 
-from .constants import AUDIT_ACTIONS, AUDIT_MODULES
+from . import writer
+from .constants import AUDIT_ACTIONS, AUDIT_MODULES, SYNC_AUDIT_MODULES
 from .models import ActivityLog
+from .search import build_search_text
 
 
 def log_activity(
@@ -17,10 +19,51 @@ def log_activity(
     before=None,
     after=None,
     request=None,
+    sync=False,
 ):
     """
     Create a standardized audit log entry.
 
+    Entries are written in batches by audit.writer once the current
+    transaction commits. Pass sync=True (or log under a module listed in
+    SYNC_AUDIT_MODULES) for security-critical events that must be on disk
+    before the request returns. See build_activity_log for the other arguments.
+    """
+    entry = build_activity_log(
+        user,
+        action,
+        module=module,
+        description=description,
+        message=message,
+        metadata=metadata,
+        before=before,
+        after=after,
+        request=request,
+    )
+    if sync or entry.module in SYNC_AUDIT_MODULES or not writer.is_enabled():
+        entry.save()
+    else:
+        writer.enqueue(entry)
+    return entry
+
+
+def build_activity_log(
+    user,
+    action,
+    *,
+    module=None,
+    description=None,
+    message="",
+    metadata=None,
+    before=None,
+    after=None,
+    request=None,
+):
+    """
+    Build (but do not save) a standardized audit log entry.
+
+    Lets callers collect several entries and insert them with bulk_create.
+
     Args:
         user: Django user performing the action (optional for system events).
         action: Verb describing the change (use constants from AUDIT_ACTIONS).
@@ -66,7 +109,7 @@ def log_activity(
         payload,
     )
 
-    ActivityLog.objects.create(
+    entry = ActivityLog(
         user=user_to_log,
         role=getattr(user_to_log, "userlevel", "") if user_to_log else "",
         action=normalized_action,
@@ -77,6 +120,8 @@ def log_activity(
         ip_address=ip,
         user_agent=ua or "",
     )
+    entry.search_text = build_search_text(entry, user=user_to_log)
+    return entry
 
 
 def resolve_user(user):
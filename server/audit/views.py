@@ -1,19 +1,32 @@
+import hashlib
+import heapq
+import itertools
 from datetime import datetime, timedelta
 
-from django.db.models import Q
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import permissions, viewsets
+from rest_framework.response import Response
+
+from core.pagination import CursorPaginationMixin, KeysetPagination, keyset_ordering
+from system.archive import archive_horizon, archive_signature, iter_archived_months
 
 from .models import ActivityLog
+from .search import search_filter
 from .serializers import ActivityLogSerializer
 
+User = get_user_model()
+
 
-class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
+class ActivityLogViewSet(CursorPaginationMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ActivityLog.objects.select_related("user").all()
     serializer_class = ActivityLogSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
+    def get_date_range(self):
+        """Parse date_from/date_to into an aware [start, end) range (either may be None)"""
         params = self.request.query_params
 
         parsed_date_from = None
@@ -44,23 +57,33 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         if parsed_date_from and parsed_date_to and parsed_date_to < parsed_date_from:
             parsed_date_from, parsed_date_to = parsed_date_to, parsed_date_from
 
+        start_dt = end_dt = None
         if parsed_date_from:
             start_dt = parsed_date_from.replace(hour=0, minute=0, second=0, microsecond=0)
-            queryset = queryset.filter(created_at__gte=start_dt)
+            if timezone.is_naive(start_dt):
+                start_dt = timezone.make_aware(start_dt)
 
         if parsed_date_to:
             end_dt = parsed_date_to.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            if timezone.is_naive(end_dt):
+                end_dt = timezone.make_aware(end_dt)
+
+        return start_dt, end_dt
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        start_dt, end_dt = self.get_date_range()
+        if start_dt:
+            queryset = queryset.filter(created_at__gte=start_dt)
+        if end_dt:
             queryset = queryset.filter(created_at__lt=end_dt)
 
+        # User e-mail/name and metadata entity name/e-mail are part of search_text
         user_query = params.get("user")
         if user_query:
-            queryset = queryset.filter(
-                Q(user__email__icontains=user_query)
-                | Q(user__first_name__icontains=user_query)
-                | Q(user__last_name__icontains=user_query)
-                | Q(metadata__entity_name__icontains=user_query)
-                | Q(metadata__email__icontains=user_query)
-            )
+            queryset = queryset.filter(search_filter(user_query))
 
         role = params.get("role")
         if role:
@@ -68,15 +91,12 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
 
         action_type = params.get("action_type")
         if action_type:
-            queryset = queryset.filter(action__iexact=action_type.lower())
+            # Actions are stored lower-cased (see normalize_action)
+            queryset = queryset.filter(action=action_type.lower())
 
         keyword = params.get("keyword") or params.get("search")
         if keyword:
-            queryset = queryset.filter(
-                Q(description__icontains=keyword)
-                | Q(module__icontains=keyword)
-                | Q(message__icontains=keyword)
-            )
+            queryset = queryset.filter(search_filter(keyword))
 
         ordering = params.get("ordering", "-created_at")
         allowed_fields = {"created_at", "action", "role", "module"}
@@ -84,4 +104,163 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         if order_field not in allowed_fields:
             ordering = "-created_at"
 
-        return queryset.order_by(ordering, "-created_at")
+        return queryset.order_by(ordering, "-created_at", "-id")
+
+    def get_cursor_ordering(self):
+        """Validated ordering for keyset pagination (always ends with id)"""
+        ordering = self.request.query_params.get("ordering", "-created_at")
+        # role/module are nullable, which keyset comparisons cannot page through
+        if ordering.lstrip("-") not in {"created_at", "action"}:
+            ordering = "-created_at"
+        return keyset_ordering(ordering.lstrip("-"), ordering.startswith("-"))
+
+    def list(self, request, *args, **kwargs):
+        """
+        When date_from reaches past the retention horizon, merge archived
+        entries (see system.archive) into the results, ordered by created_at.
+        Keyset pagination only covers the live table.
+        """
+        start_dt, end_dt = self.get_date_range()
+        horizon = archive_horizon("activity_logs") if start_dt else None
+        if not horizon or start_dt >= horizon or isinstance(self.paginator, KeysetPagination):
+            return super().list(request, *args, **kwargs)
+
+        descending = not request.query_params.get("ordering", "-created_at") == "created_at"
+        queryset = self.get_queryset().order_by("-created_at" if descending else "created_at")
+        archived = self.get_archived_entries(start_dt, end_dt, descending)
+
+        results = ArchiveMergedResults(queryset, archived, descending)
+        page = self.paginate_queryset(results)
+        if page is None:
+            page = results[:]
+        serializer = self.get_serializer(self.to_entries(page), many=True)
+        if self.paginator is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def get_archived_entries(self, start_dt, end_dt, descending=True):
+        """Archived rows matching the request filters (see ArchivedEntries)"""
+        params = self.request.query_params
+        user_query = (params.get("user") or "").lower()
+        role = (params.get("role") or "").lower()
+        action_type = (params.get("action_type") or "").lower()
+        keyword = (params.get("keyword") or params.get("search") or "").lower()
+
+        def matches(row):
+            metadata = row.get("metadata") or {}
+            if user_query and not any(
+                user_query in str(value or "").lower()
+                for value in (
+                    row.get("user_email"), row.get("user_first_name"), row.get("user_last_name"),
+                    metadata.get("entity_name"), metadata.get("email"),
+                )
+            ):
+                return False
+            if role and role not in (row.get("role") or "").lower():
+                return False
+            if action_type and (row.get("action") or "").lower() != action_type:
+                return False
+            if keyword and not any(
+                keyword in (row.get(field) or "").lower() for field in ("description", "module", "message")
+            ):
+                return False
+            return True
+
+        filters = (user_query, role, action_type, keyword, start_dt, end_dt)
+        return ArchivedEntries("activity_logs", start_dt, end_dt, matches, descending, filters)
+
+    def to_entries(self, items):
+        """Turn archived rows in a page into unsaved ActivityLog instances (hot entries pass through)"""
+        rows = [item for item in items if isinstance(item, dict)]
+        if not rows:
+            return list(items)
+        users = User.objects.in_bulk({row["user_id"] for row in rows if row.get("user_id")})
+        field_names = {field.attname for field in ActivityLog._meta.concrete_fields}
+
+        entries = []
+        for item in items:
+            if isinstance(item, dict):
+                entry = ActivityLog(**{key: value for key, value in item.items() if key in field_names})
+                entry.user = users.get(item.get("user_id"))
+                item = entry
+            entries.append(item)
+        return entries
+
+
+def _created_at(item):
+    return item["created_at"] if isinstance(item, dict) else item.created_at
+
+
+class ArchivedEntries:
+    """
+    Archived rows matching `matches`, in created_at order.
+
+    Each archive file holds one month, so the first n rows only need the
+    newest (or oldest) months up to the one that completes them; a page never
+    reads further back than it shows. The total for the paginator is counted
+    by streaming the files once and cached until the archive changes or
+    PAGINATION_COUNT_CACHE_SECONDS pass.
+    """
+
+    def __init__(self, name, start, end, matches, descending, filters):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.matches = matches
+        self.descending = descending
+        self.filters = filters
+
+    def _months(self):
+        for _month, rows in iter_archived_months(self.name, self.start, self.end, newest_first=self.descending):
+            yield [row for row in rows if self.matches(row)]
+
+    def head(self, n):
+        """The first n matching rows"""
+        collected = []
+        for rows in self._months():
+            rows.sort(key=_created_at, reverse=self.descending)
+            collected.extend(rows)
+            if len(collected) >= n:
+                break
+        return collected[:n]
+
+    def count(self):
+        digest = hashlib.md5(repr((self.filters, archive_signature(self.name))).encode()).hexdigest()
+        key = f"archive-count:{self.name}:{digest}"
+        total = cache.get(key)
+        if total is None:
+            total = sum(len(rows) for rows in self._months())
+            cache.set(key, total, settings.PAGINATION_COUNT_CACHE_SECONDS)
+        return total
+
+
+class ArchiveMergedResults:
+    """
+    Lazily merges a hot queryset with archived entries so the standard
+    paginator can slice across both. A slice [start:stop] reads at most
+    `stop` rows from each side.
+    """
+
+    def __init__(self, queryset, archived, descending=True):
+        self.queryset = queryset
+        self.archived = archived
+        self.descending = descending
+
+    def count(self):
+        return self.queryset.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else self.count()
+        merged = heapq.merge(
+            self.queryset[:stop],
+            self.archived.head(stop),
+            key=_created_at,
+            reverse=self.descending,
+        )
+        return list(itertools.islice(merged, start, stop))
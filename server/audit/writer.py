@@ -0,0 +1,135 @@
+"""
+Batched, asynchronous ActivityLog writer.
+
+log_activity() hands entries to this module instead of inserting them one by
+one. Entries are queued in memory and a single daemon thread per process
+writes them with bulk_create every AUDIT_FLUSH_INTERVAL seconds or as soon as
+AUDIT_BATCH_SIZE entries are waiting. Entries are only queued once the
+caller's transaction commits, so rolled-back work leaves no audit trail, as
+before.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def is_enabled():
+    return getattr(settings, 'AUDIT_ASYNC_ENABLED', True)
+
+
+def enqueue(entry):
+    """Queue an unsaved ActivityLog for the background writer"""
+    transaction.on_commit(lambda: _put(entry))
+
+
+def _put(entry):
+    _ensure_worker()
+    _queue.put(entry)
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='ierms-audit-writer', daemon=True)
+            _worker.start()
+
+
+def _collect(batch_size, interval):
+    """Block for the first entry, then gather more until the batch is full or the interval passes"""
+    batch = [_queue.get()]
+    deadline = time.monotonic() + interval
+    while len(batch) < batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run():
+    batch_size = getattr(settings, 'AUDIT_BATCH_SIZE', 100)
+    interval = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 2.0)
+    while True:
+        batch = _collect(batch_size, interval)
+        close_old_connections()
+        try:
+            write_batch(batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+            connection.close()
+
+
+def write_batch(entries):
+    """
+    Insert entries with one bulk_create.
+
+    If the batch fails (e.g. a referenced user was deleted meanwhile), fall
+    back to row-by-row inserts so one bad entry does not drop the others.
+    """
+    if not entries:
+        return
+    try:
+        ActivityLog.objects.bulk_create(entries, batch_size=getattr(settings, 'AUDIT_BATCH_SIZE', 100))
+        return
+    except Exception as e:
+        logger.warning(f"Bulk audit insert of {len(entries)} entries failed, retrying individually: {str(e)}")
+
+    for entry in entries:
+        entry.pk = None
+        try:
+            entry.save()
+        except Exception as e:
+            logger.error(f"Failed to write audit entry '{entry.description}': {str(e)}")
+
+
+def flush(timeout=5.0):
+    """
+    Write everything queued so far.
+
+    Drains the queue on the calling thread when the worker is not running
+    (e.g. at interpreter exit or in management commands); otherwise waits up
+    to `timeout` seconds for the worker to catch up.
+    """
+    if _worker is None or not _worker.is_alive():
+        pending = []
+        while True:
+            try:
+                pending.append(_queue.get_nowait())
+                _queue.task_done()
+            except queue.Empty:
+                break
+        write_batch(pending)
+        return
+
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+@atexit.register
+def _flush_at_exit():
+    if _queue.unfinished_tasks:
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Failed to flush audit entries at exit: {str(e)}")
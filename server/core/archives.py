@@ -0,0 +1,120 @@
+"""
+Constant-memory archive and upload helpers.
+
+- stream_zip() builds a ZIP archive as a generator of byte chunks, ready for
+  a StreamingHttpResponse. zipfile writes into a small in-memory sink that
+  cannot seek, so it emits data descriptors instead of rewinding, and each
+  chunk is handed to the client as soon as it is produced. Only one
+  read-buffer of a member is in memory at a time.
+- upload_path() gives a filesystem path for an uploaded file without
+  re-buffering it. Django already spools large uploads to a temporary file;
+  small in-memory ones are copied out chunk by chunk.
+- save_upload() moves or copies an upload to its final location the same way.
+- copy_member() extracts a single ZIP member to a file in chunks.
+"""
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+
+from django.core.files.move import file_move_safe
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Already-compressed formats are stored as-is instead of deflated again
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.zip', '.gz'}
+
+
+class _ZipSink:
+    """Write-only, non-seekable file object that buffers what zipfile writes until drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """What was written since the last drain, as a list of at most one non-empty chunk"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return [data] if data else []
+
+
+def stream_zip(members, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield a ZIP archive of `members` chunk by chunk.
+
+    Args:
+        members: Iterable of (arcname, source) where source is a file path or bytes
+        chunk_size: Bytes read from each member file at a time
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for arcname, source in members:
+            is_path = isinstance(source, (str, os.PathLike))
+            if is_path:
+                info = zipfile.ZipInfo.from_file(source, arcname)
+            else:
+                info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+                info.file_size = len(source)
+            stored = os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+
+            with zipf.open(info, 'w') as dest:
+                if is_path:
+                    with open(source, 'rb') as src:
+                        for chunk in iter(lambda: src.read(chunk_size), b''):
+                            dest.write(chunk)
+                            yield from sink.drain()
+                else:
+                    dest.write(source)
+            yield from sink.drain()
+    # Central directory
+    yield from sink.drain()
+
+
+@contextmanager
+def upload_path(uploaded_file, suffix=''):
+    """Path of an uploaded file on disk, spooling in-memory uploads to a temporary file"""
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        yield uploaded_file.temporary_file_path()
+        return
+
+    temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    try:
+        with temp:
+            for chunk in uploaded_file.chunks():
+                temp.write(chunk)
+        yield temp.name
+    finally:
+        if os.path.exists(temp.name):
+            os.remove(temp.name)
+
+
+def save_upload(uploaded_file, dest_path):
+    """Store an upload at dest_path, moving Django's temporary file instead of copying it when possible"""
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        file_move_safe(uploaded_file.temporary_file_path(), dest_path, allow_overwrite=True)
+        return dest_path
+    with open(dest_path, 'wb') as dest:
+        for chunk in uploaded_file.chunks():
+            dest.write(chunk)
+    return dest_path
+
+
+def copy_member(zipf, info, dest_path, chunk_size=STREAM_CHUNK_SIZE):
+    """Extract one ZIP member to dest_path without loading it into memory"""
+    with zipf.open(info) as src, open(dest_path, 'wb') as dest:
+        shutil.copyfileobj(src, dest, chunk_size)
@@ -3,6 +3,12 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The API itself is served by core.wsgi. This application serves the
+notification push channel (/api/notifications/stream/ and
+/api/notifications/poll/) from its own process, see the "push" entry in the
+Procfile, so open streams wait on the event loop instead of holding WSGI
+threads. Under WSGI the stream is disabled and the poll returns immediately.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
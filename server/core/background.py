@@ -0,0 +1,100 @@
+"""
+Helpers for running work off the request path.
+
+Tasks are handed to Celery when a broker is configured. If the broker cannot
+be reached (or BACKGROUND_TASK_BACKEND is set to "thread"), the task body runs
+in a small in-process thread pool instead so the request never waits on it.
+
+run_concurrently() is the request-path counterpart: it fans independent
+read-only queries out over a separate pool and waits for all of them.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_request_executor = None
+
+
+def get_executor():
+    """Return the shared in-process worker pool (created lazily)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+            thread_name_prefix='ierms-background',
+        )
+    return _executor
+
+
+def _run_in_thread(func, args, kwargs):
+    """Run a task body in a worker thread with its own DB connection."""
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Background task {getattr(func, '__name__', func)} failed: {str(e)}")
+        raise
+    finally:
+        connection.close()
+
+
+def dispatch(task, *args, **kwargs):
+    """
+    Run a Celery task asynchronously.
+
+    Falls back to the in-process pool when Celery is disabled or the broker
+    is unavailable.
+    """
+    if getattr(settings, 'BACKGROUND_TASK_BACKEND', 'celery') == 'celery' and hasattr(task, 'delay'):
+        try:
+            return task.delay(*args, **kwargs)
+        except Exception as e:
+            logger.warning(
+                f"Could not enqueue {getattr(task, 'name', task)} on Celery ({str(e)}); "
+                "running it in-process instead"
+            )
+
+    return submit(getattr(task, 'run', task), *args, **kwargs)
+
+
+def dispatch_on_commit(task, *args, **kwargs):
+    """Dispatch a task once the surrounding transaction commits."""
+    transaction.on_commit(lambda: dispatch(task, *args, **kwargs))
+
+
+def submit(func, *args, **kwargs):
+    """Run a function in the in-process pool (for work that must stay in this process)."""
+    return get_executor().submit(_run_in_thread, func, args, kwargs)
+
+
+def _run_request_call(func):
+    """Run one request-path call in a pool thread on that thread's own DB connection."""
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        # Closes the thread's connection unless CONN_MAX_AGE lets it be reused
+        close_old_connections()
+
+
+def run_concurrently(*funcs):
+    """
+    Call independent, read-only functions in parallel and return their
+    results in order. Exceptions propagate to the caller.
+
+    Each worker thread queries over its own database connection, so the
+    calls must not rely on the caller's transaction or unsaved state.
+    """
+    global _request_executor
+    if _request_executor is None:
+        _request_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'REQUEST_POOL_WORKERS', 6),
+            thread_name_prefix='ierms-request',
+        )
+    futures = [_request_executor.submit(_run_request_call, func) for func in funcs]
+    return [future.result() for future in futures]
@@ -0,0 +1,42 @@
+"""
+Small helpers on top of Django's cache framework.
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def shared_cache():
+    """
+    Whether the default cache is visible to every web worker and to Celery.
+
+    The local-memory (and dummy) backends are per process, so state that other
+    processes must see (buffers, counters, invalidation versions) cannot live
+    there; callers fall back to the database when this is False.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+@contextmanager
+def cache_lock(name, timeout=5, wait=0.5):
+    """
+    Best-effort mutual exclusion built on cache.add().
+
+    Works across processes when the cache is shared (Redis) and across
+    threads with the local-memory cache. Yields True if the lock was acquired
+    within `wait` seconds; callers decide whether to proceed without it.
+    """
+    key = f"lock:{name}"
+    deadline = time.monotonic() + wait
+    acquired = cache.add(key, 1, timeout)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.01)
+        acquired = cache.add(key, 1, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(key)
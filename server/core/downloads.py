@@ -0,0 +1,183 @@
+"""
+File downloads with HTTP caching, byte ranges and web-server offloading.
+
+serve_file() answers a GET/HEAD for a file on disk:
+
+- ETag (mtime and size) and Last-Modified, with If-None-Match /
+  If-Modified-Since answered by 304 (and If-Match / If-Unmodified-Since by 412)
+- Accept-Ranges and single "Range: bytes=..." requests answered with 206 and
+  Content-Range (416 when unsatisfiable); If-Range falls back to the whole
+  file when the client's copy is stale. Multi-range requests get the whole
+  file, as RFC 9110 allows.
+- the body is a FileResponse, so WSGI servers with wsgi.file_wrapper can
+  sendfile() whole files; ranges are read in FileResponse.block_size pieces.
+
+With DOWNLOAD_OFFLOAD set to "x-accel-redirect" (nginx) or "x-sendfile"
+(Apache/lighttpd), the response carries only headers and the web server
+sends the file (including ranges) itself, so no Python worker is tied up for
+the transfer. X-Accel-Redirect needs each served directory mapped to an
+internal location in DOWNLOAD_ACCEL_LOCATIONS.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import escape_uri_path
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Read-only view of bytes [start, end] of an open file"""
+
+    def __init__(self, f, start, end):
+        self._file = f
+        self._remaining = end - start + 1
+        f.seek(start)
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def file_etag(stat):
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, None to serve the
+    whole file (no/malformed/multi-range header), or False if unsatisfiable.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    """Whether a Range request's If-Range (if any) still names this version of the file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(mtime) <= since
+
+
+def _accel_url(path):
+    """Internal nginx URL for `path`, from DOWNLOAD_ACCEL_LOCATIONS, or None if it is not mapped"""
+    real_path = os.path.realpath(path)
+    for root, location in getattr(settings, 'DOWNLOAD_ACCEL_LOCATIONS', {}).items():
+        root = os.path.realpath(root)
+        if real_path.startswith(root + os.sep):
+            relative = os.path.relpath(real_path, root).replace(os.sep, '/')
+            return location.rstrip('/') + '/' + escape_uri_path(relative)
+    return None
+
+
+def _offload_response(path):
+    offload = getattr(settings, 'DOWNLOAD_OFFLOAD', '')
+    if offload == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    if offload == 'x-accel-redirect':
+        url = _accel_url(path)
+        if url:
+            response = HttpResponse()
+            response['X-Accel-Redirect'] = url
+            return response
+    return None
+
+
+def serve_file(request, path, filename=None, as_attachment=False, content_type=None):
+    """
+    Response for downloading `path` (see the module docstring).
+
+    Raises:
+        Http404: If `path` is not an existing file
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404('File not found')
+    if not os.path.isfile(path):
+        raise Http404('File not found')
+
+    etag = file_etag(stat)
+    last_modified = http_date(stat.st_mtime)
+    filename = filename or os.path.basename(path)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return not_modified
+
+    response = _offload_response(path)
+    if response is not None:
+        response['Content-Type'] = content_type
+        if as_attachment:
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    else:
+        byte_range = None
+        if request.method in ('GET', 'HEAD') and _if_range_matches(request, etag, stat.st_mtime):
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range is None:
+            response = FileResponse(
+                open(path, 'rb'), as_attachment=as_attachment, filename=filename, content_type=content_type
+            )
+        else:
+            start, end = byte_range
+            response = FileResponse(
+                RangeFile(open(path, 'rb'), start, end),
+                as_attachment=as_attachment, filename=filename, content_type=content_type, status=206,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    return response
+
+
+def serve_media(request, path):
+    """MEDIA_URL view (replaces django.views.static.serve for media files)"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    return serve_file(request, full_path)
@@ -0,0 +1,172 @@
+"""
+Shared image pipeline used for inspection photos and help images.
+
+Builds resized, EXIF-free variants of an uploaded image. Each variant is
+encoded as WebP with a JPEG fallback so older clients and the PDF generators
+(ReportLab cannot read WebP) always have something they can render.
+"""
+import os
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+
+# Bounding boxes (width, height) for each generated variant
+IMAGE_VARIANTS = {
+    'thumbnail': (320, 320),
+    'medium': (1280, 1280),
+}
+
+# Encoder settings per output format
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 75, 'method': 6},
+    'jpeg': {'format': 'JPEG', 'quality': 80, 'optimize': True, 'progressive': True},
+}
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff'}
+
+
+def is_image_name(name):
+    """Return True if the file name looks like a raster image we can process."""
+    return os.path.splitext(name or '')[1].lower() in IMAGE_EXTENSIONS
+
+
+def flatten_to_rgb(img):
+    """Convert an image to RGB, compositing any transparency onto white."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def load_image(file_obj):
+    """
+    Open an image, apply its EXIF orientation and drop all metadata.
+
+    Raises:
+        ValueError: If the file is not a readable image
+    """
+    try:
+        img = Image.open(file_obj)
+        img.load()
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Unsupported image file: {str(e)}")
+
+    # Rotate according to the camera orientation tag before EXIF is discarded
+    img = ImageOps.exif_transpose(img)
+    img.info.pop('exif', None)
+    return flatten_to_rgb(img)
+
+
+def encode_image(img, fmt):
+    """Encode an RGB image into bytes for the given key of VARIANT_FORMATS."""
+    options = dict(VARIANT_FORMATS[fmt])
+    pil_format = options.pop('format')
+    output = BytesIO()
+    img.save(output, format=pil_format, **options)
+    return output.getvalue()
+
+
+def resize_to_fit(img, size):
+    """Return a copy scaled down to fit inside size; never upscales."""
+    resized = img.copy()
+    resized.thumbnail(size, Image.Resampling.LANCZOS)
+    return resized
+
+
+def build_variants(file_obj, storage_prefix, storage=None):
+    """
+    Generate every IMAGE_VARIANTS entry for an image and save it to storage.
+
+    Args:
+        file_obj: Open binary file (or path) of the source image
+        storage_prefix: Storage directory the variants are written under
+        storage: Django storage backend (defaults to default_storage)
+
+    Returns:
+        dict: {'width', 'height', <variant>: {'webp': name, 'jpeg': name}}
+        where each name is relative to the storage root.
+    """
+    storage = storage or default_storage
+    img = load_image(file_obj)
+    result = {'width': img.width, 'height': img.height}
+
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = resize_to_fit(img, size)
+        result[variant] = {}
+        for fmt in VARIANT_FORMATS:
+            try:
+                data = encode_image(resized, fmt)
+            except (OSError, KeyError):
+                # Pillow built without WebP support - keep the JPEG fallback only
+                continue
+            ext = 'jpg' if fmt == 'jpeg' else fmt
+            name = f"{storage_prefix.rstrip('/')}/{variant}.{ext}"
+            if storage.exists(name):
+                storage.delete(name)
+            result[variant][fmt] = storage.save(name, ContentFile(data))
+
+    return result
+
+
+def delete_variants(variants, storage=None):
+    """Remove files previously produced by build_variants."""
+    storage = storage or default_storage
+    for value in (variants or {}).values():
+        if not isinstance(value, dict):
+            continue
+        for name in value.values():
+            if name and storage.exists(name):
+                storage.delete(name)
+
+
+def shrink_image_in_place(path, max_size=IMAGE_VARIANTS['medium']):
+    """
+    Downscale an image file on disk and strip its EXIF, keeping name and format.
+
+    Used for help images whose URLs are already stored in the help topics and
+    therefore cannot change. Animated GIFs are left untouched.
+
+    Returns:
+        bool: True if the file was rewritten
+    """
+    with Image.open(path) as original:
+        pil_format = original.format
+        if pil_format not in ('JPEG', 'PNG', 'WEBP'):
+            return False
+        has_exif = bool(original.info.get('exif'))
+        too_large = original.width > max_size[0] or original.height > max_size[1]
+        if not (has_exif or too_large):
+            return False
+
+        img = ImageOps.exif_transpose(original)
+        img.info.pop('exif', None)
+        img = resize_to_fit(img, max_size)
+
+    output = BytesIO()
+    if pil_format == 'JPEG':
+        flatten_to_rgb(img).save(output, format='JPEG', **{
+            k: v for k, v in VARIANT_FORMATS['jpeg'].items() if k != 'format'
+        })
+    elif pil_format == 'WEBP':
+        img.save(output, format='WEBP', quality=VARIANT_FORMATS['webp']['quality'], method=6)
+    else:
+        img.save(output, format='PNG', optimize=True)
+
+    # Write next to the original and swap, so readers never see a partial file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(output.getvalue())
+    if not os.path.exists(path):
+        # Renamed or deleted while we were working - drop the result
+        os.remove(temp_path)
+        return False
+    os.replace(temp_path, path)
+    return True
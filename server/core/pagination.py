@@ -1,4 +1,18 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -10,3 +24,215 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
 
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a stable ordering such as
+    ("-created_at", "-id").
+
+    Each page is fetched with a WHERE on the last row's sort key instead of
+    OFFSET, so page 1000 costs the same as page 1. The final ordering field
+    must be unique (normally "id") and ordering fields must not be NULL.
+
+    Query params: `cursor` (opaque, from next/previous links), `page_size`
+    and `with_count=1` to include a total. The total is cached per filtered
+    query for PAGINATION_COUNT_CACHE_SECONDS, so it is approximate: it can lag
+    recent writes, but scrolling does not re-count the table on every page.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    ordering = ("-created_at", "-id")
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = tuple(ordering)
+
+    # Cursor encoding -------------------------------------------------------
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({"v": [self._encode_value(v) for v in values], "r": int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None, False
+        try:
+            padded = raw + "=" * (-len(raw) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values = payload["v"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return values, bool(payload.get("r"))
+        except (ValueError, KeyError, TypeError):
+            raise NotFound("Invalid cursor")
+
+    # Query building --------------------------------------------------------
+
+    def _fields(self, reverse=False):
+        """[(field name, descending)] in query order"""
+        fields = []
+        for field in self.ordering:
+            descending = field.startswith("-")
+            fields.append((field.lstrip("-"), descending != reverse))
+        return fields
+
+    def _after(self, values, reverse):
+        """Q selecting rows strictly after `values` in the (possibly reversed) ordering"""
+        condition = Q()
+        fields = self._fields(reverse)
+        for index, (name, descending) in enumerate(fields):
+            # Equal on every earlier key, strictly past on this one
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[index]})
+            for earlier in range(index):
+                step &= Q(**{fields[earlier][0]: values[earlier]})
+            condition |= step
+        return condition
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _row_values(self, row):
+        values = []
+        for name, _ in self._fields():
+            value = row
+            for part in name.split("__"):
+                value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def get_count(self, queryset):
+        """Cached total for the filtered queryset (before cursor filtering)"""
+        queryset = queryset.order_by()
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(f"{sql}|{params!r}".encode()).hexdigest()
+        key = f"pagination:count:{queryset.model._meta.label_lower}:{digest}"
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, getattr(settings, "PAGINATION_COUNT_CACHE_SECONDS", 60))
+        return count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true", "True"):
+            self.count = self.get_count(queryset)
+
+        order = [f"-{name}" if descending else name for name, descending in self._fields(reverse)]
+        queryset = queryset.order_by(*order)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+
+        rows = list(queryset[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+
+        # Walking backwards, "more" means there is a previous page
+        self.has_next = has_more if not reverse else values is not None
+        self.has_previous = (values is not None) if not reverse else has_more
+        self.first_values = self._row_values(rows[0]) if rows else None
+        self.last_values = self._row_values(rows[-1]) if rows else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or self.last_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_values, False))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.first_values, True))
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ])
+        if self.count is not None:
+            response["count"] = self.count
+            response.move_to_end("count", last=False)
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer"},
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+def keyset_ordering(field, descending=True, tiebreakers=("created_at",)):
+    """
+    Ordering tuple for KeysetPagination: `field`, then the tie-breakers, then
+    id, all in the same direction.
+    """
+    direction = "-" if descending else ""
+    fields = [field]
+    fields += [name for name in tiebreakers if name not in fields]
+    if "id" not in fields:
+        fields.append("id")
+    return tuple(f"{direction}{name}" for name in fields)
+
+
+class CursorPaginationMixin:
+    """
+    Opt-in keyset pagination for generic views and viewsets.
+
+    Requests with `?pagination=cursor` (or carrying a `cursor` from a previous
+    page) are paginated with KeysetPagination; all other requests keep the
+    view's normal page-number pagination. Views set `cursor_ordering` or
+    override get_cursor_ordering() to follow their own sort parameters. Sort
+    fields must be non-nullable.
+    """
+
+    cursor_ordering = ("-created_at", "-id")
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return "cursor" in params or params.get("pagination") == "cursor"
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.use_cursor_pagination():
+                self._paginator = KeysetPagination(ordering=self.get_cursor_ordering())
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
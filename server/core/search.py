@@ -0,0 +1,108 @@
+"""
+Shared keyword search over maintained search documents.
+
+Searchable models keep a lower-cased `search_text` column combining the
+fields users search by (see audit/search.py, establishments/models.py,
+users/models.py and inspections/search.py). On MySQL the column has a
+FULLTEXT index and is queried with MATCH ... AGAINST in boolean mode (every
+word must appear, as a word prefix). Words the index cannot serve (shorter
+than InnoDB's minimum token size, or stopwords) and other database backends
+fall back to LIKE on the same single column, so a search never joins or
+ORs across the source columns.
+"""
+import re
+
+from django.db import NotSupportedError, connection, models
+from django.db.models import Lookup, Q
+
+# InnoDB defaults: innodb_ft_min_token_size and the built-in stopword list
+FULLTEXT_MIN_TOKEN_SIZE = 3
+FULLTEXT_STOPWORDS = {
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from',
+    'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to',
+    'was', 'what', 'when', 'where', 'who', 'will', 'with', 'und', 'www',
+}
+
+
+class SearchTextField(models.TextField):
+    """TextField that supports the `matches` (MySQL FULLTEXT boolean mode) lookup"""
+
+
+@SearchTextField.register_lookup
+class FullTextMatch(Lookup):
+    lookup_name = 'matches'
+
+    def as_mysql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)", lhs_params + rhs_params
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError("The 'matches' lookup requires MySQL")
+
+
+def search_document(*parts):
+    """Lower-cased, de-duplicated text of the non-empty parts"""
+    seen = []
+    for part in parts:
+        text = str(part).strip().lower() if part else ''
+        if text and text not in seen:
+            seen.append(text)
+    return ' '.join(seen)
+
+
+def search_filter(text, field='search_text'):
+    """Q requiring every word of `text` in the search column"""
+    words = re.findall(r'\w+', (text or '').lower())
+    if not words:
+        return Q()
+
+    if connection.vendor == 'mysql':
+        indexed = [w for w in words if len(w) >= FULLTEXT_MIN_TOKEN_SIZE and w not in FULLTEXT_STOPWORDS]
+        other = [w for w in words if w not in indexed]
+    else:
+        indexed, other = [], words
+
+    query = Q()
+    if indexed:
+        query &= Q(**{f'{field}__matches': ' '.join(f'+{word}*' for word in indexed)})
+    for word in other:
+        query &= Q(**{f'{field}__icontains': word})
+    return query
+
+
+def rebuild_search_text(queryset, build, batch_size=1000):
+    """
+    Recompute `search_text` with `build(instance)` for every row of
+    `queryset`, writing only the rows that changed.
+
+    Returns:
+        int: Number of rows updated
+    """
+    model = queryset.model
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(ids), batch_size):
+        changed = []
+        for instance in model.objects.filter(pk__in=ids[start:start + batch_size]):
+            text = build(instance)
+            if instance.search_text != text:
+                instance.search_text = text
+                changed.append(instance)
+        if changed:
+            model.objects.bulk_update(changed, ['search_text'])
+            updated += len(changed)
+    return updated
+
+
+def fulltext_index_operations(table, index_name):
+    """(forward, reverse) RunPython functions adding a MySQL FULLTEXT index on `table.search_text`"""
+    def add_index(apps, schema_editor):
+        if schema_editor.connection.vendor == 'mysql':
+            schema_editor.execute(f'ALTER TABLE {table} ADD FULLTEXT INDEX {index_name} (search_text)')
+
+    def drop_index(apps, schema_editor):
+        if schema_editor.connection.vendor == 'mysql':
+            schema_editor.execute(f'ALTER TABLE {table} DROP INDEX {index_name}')
+
+    return add_index, drop_index
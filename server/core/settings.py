@@ -78,6 +78,9 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# How long a cursor-paginated list caches its optional total (?with_count=1)
+PAGINATION_COUNT_CACHE_SECONDS = int(os.getenv("PAGINATION_COUNT_CACHE_SECONDS", 60))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),      
@@ -226,6 +229,11 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', '127.0.0.1'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        # Keep connections open between requests (and run_concurrently calls,
+        # whose pool threads each hold one) instead of reconnecting every time;
+        # health checks replace connections the server has dropped
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
@@ -246,6 +254,14 @@ CACHES = {
     }
 }
 
+# Use Redis as the shared cache when configured, so buffers and counters are
+# visible to every web worker and to Celery
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL'),
+    }
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -283,6 +299,58 @@ DEFAULT_BACKUP_DIR = os.path.join(BASE_DIR, "backups")
 # Ensure the folder exists
 os.makedirs(DEFAULT_BACKUP_DIR, exist_ok=True)
 
+# Monthly archive files for notifications/audit logs past their retention. Retention is
+# off until an admin sets it in the system configuration; point ARCHIVE_DIR at persistent
+# storage (not the container's disk) before enabling it.
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(BASE_DIR, "archives"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 1000))
+
+# File downloads (core.downloads): serve /media/ through Django when DEBUG or SERVE_MEDIA,
+# and optionally hand the transfer to the web server ("x-accel-redirect" for nginx,
+# "x-sendfile" for Apache/lighttpd). X-Accel-Redirect maps each directory to an internal location.
+SERVE_MEDIA = os.getenv("SERVE_MEDIA", str(DEBUG)) == "True"
+DOWNLOAD_OFFLOAD = os.getenv("DOWNLOAD_OFFLOAD", "")
+DOWNLOAD_ACCEL_LOCATIONS = {
+    MEDIA_ROOT: os.getenv("DOWNLOAD_ACCEL_MEDIA_LOCATION", "/protected/media/"),
+    DEFAULT_BACKUP_DIR: os.getenv("DOWNLOAD_ACCEL_BACKUP_LOCATION", "/protected/backups/"),
+}
+
+# Batched audit log writer (see audit/writer.py). Disable to save every entry inline.
+AUDIT_ASYNC_ENABLED = os.getenv("AUDIT_ASYNC_ENABLED", "True") == "True"
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 100))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 2))
+
+# Notification push channel (SSE/long-poll, served by the ASGI "push" process). Events go
+# through Redis pub/sub so every worker and Celery reach open streams; it defaults
+# to the Celery broker when that is configured, otherwise events stay in-process.
+NOTIFICATION_PUBSUB_URL = os.getenv("NOTIFICATION_PUBSUB_URL", os.getenv("CELERY_BROKER_URL", ""))
+# Lifetime of the signed ticket EventSource passes in the URL instead of the access token
+NOTIFICATION_STREAM_TICKET_SECONDS = int(os.getenv("NOTIFICATION_STREAM_TICKET_SECONDS", 60))
+NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", 25))
+NOTIFICATION_STREAM_MAX_SECONDS = int(os.getenv("NOTIFICATION_STREAM_MAX_SECONDS", 300))
+NOTIFICATION_POLL_TIMEOUT = int(os.getenv("NOTIFICATION_POLL_TIMEOUT", 25))
+
+# Write-behind buffer for low-value inspection events (auto-save markers, draft saves)
+INSPECTION_EVENT_FLUSH_SECONDS = int(os.getenv("INSPECTION_EVENT_FLUSH_SECONDS", 300))
+
+# Chunked/resumable document uploads (staging files live outside MEDIA_ROOT)
+UPLOAD_STAGING_DIR = os.getenv("UPLOAD_STAGING_DIR", os.path.join(BASE_DIR, "upload_staging"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 2 * 1024 * 1024))  # Keep below FILE_UPLOAD_MAX_MEMORY_SIZE
+UPLOAD_MAX_FILE_SIZE = int(os.getenv("UPLOAD_MAX_FILE_SIZE", 500 * 1024 * 1024))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", 24))
+
+# How long grouped dashboard analytics are cached per role scope and period
+ANALYTICS_CACHE_SECONDS = int(os.getenv("ANALYTICS_CACHE_SECONDS", 120))
+
+# How long top-bar global search results are cached per normalized query and role
+GLOBAL_SEARCH_CACHE_SECONDS = int(os.getenv("GLOBAL_SEARCH_CACHE_SECONDS", 30))
+
+# Establishment map tiles (see establishments/map_tiles.py)
+MAP_TILE_CACHE_SECONDS = int(os.getenv("MAP_TILE_CACHE_SECONDS", 300))
+MAP_CLUSTER_MAX_ZOOM = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", 13))
+MAP_POLYGON_MIN_ZOOM = int(os.getenv("MAP_POLYGON_MIN_ZOOM", 14))
+MAP_MAX_TILES_PER_REQUEST = int(os.getenv("MAP_MAX_TILES_PER_REQUEST", 64))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -295,6 +363,13 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_ENABLE_UTC = True
 
+# Background work (image variants, deferred cleanup, ...) goes to Celery by default.
+# Set BACKGROUND_TASK_BACKEND=thread to run it in an in-process thread pool instead.
+BACKGROUND_TASK_BACKEND = os.getenv('BACKGROUND_TASK_BACKEND', 'celery')
+BACKGROUND_TASK_WORKERS = int(os.getenv('BACKGROUND_TASK_WORKERS', 2))
+# Threads for parallel read queries within a request (core.background.run_concurrently)
+REQUEST_POOL_WORKERS = int(os.getenv('REQUEST_POOL_WORKERS', 6))
+
 # Celery Beat Configuration (for scheduled tasks)
 CELERY_BEAT_SCHEDULE = {
     'create-scheduled-backup': {
@@ -305,9 +380,37 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'system.tasks.cleanup_old_backups',
         'schedule': 86400.0,  # Run daily at midnight
     },
+    'archive-expired-records': {
+        'task': 'system.tasks.archive_expired_records',
+        'schedule': 86400.0,  # Run daily
+    },
     'send-nov-compliance-reminders': {
         'task': 'inspections.tasks.send_nov_compliance_reminders',
         'schedule': 86400.0,  # Run daily (every 24 hours)
     },
+    'flush-inspection-events': {
+        'task': 'inspections.tasks.flush_inspection_events',
+        'schedule': 300.0,  # Every 5 minutes (same window as the old auto-save throttle)
+    },
+    'cleanup-stale-uploads': {
+        'task': 'inspections.tasks.cleanup_stale_uploads',
+        'schedule': 3600.0,  # Run hourly
+    },
+    'reconcile-unread-notification-counts': {
+        'task': 'notifications.tasks.reconcile_unread_counts',
+        'schedule': 3600.0,  # Run hourly
+    },
+    'reconcile-inspection-workloads': {
+        'task': 'inspections.tasks.reconcile_workloads',
+        'schedule': 3600.0,  # Run hourly
+    },
+    'sweep-deadlines': {
+        'task': 'inspections.tasks.sweep_deadlines',
+        'schedule': 86400.0,  # Run daily
+    },
+    'evaluate-previous-quarter': {
+        'task': 'inspections.tasks.evaluate_previous_quarter',
+        'schedule': 86400.0,  # Run daily; only the first run after a quarter ends writes evaluations
+    },
 }
 
@@ -1,10 +1,11 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from establishments.views import EstablishmentViewSet
 from audit.views import ActivityLogViewSet
+from .downloads import serve_media
 from .views import GlobalSearchView, SearchFilterOptionsView, SearchSuggestionsView  
 
 # DRF router for ViewSets
@@ -43,4 +44,9 @@ urlpatterns = [
 # Serve static files during development
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+# Media files with Range/conditional GET support (or X-Accel-Redirect/X-Sendfile, see core/downloads.py)
+if settings.DEBUG or settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+    ]
@@ -1,15 +1,24 @@
+import hashlib
+import logging
+import re
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import Prefetch
+from core.background import run_concurrently
+from core.search import search_filter
 from establishments.models import Establishment
 from inspections.models import Inspection
-from establishments.serializers import EstablishmentSerializer
-from inspections.serializers import InspectionSerializer
-from users.serializers import UserSerializer
+from establishments.serializers import EstablishmentSearchSerializer
+from inspections.serializers import InspectionSearchSerializer
+from users.serializers import UserSearchSerializer
 from Levenshtein import distance as levenshtein_distance
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
 def fuzzy_match(query, text, threshold=2):
@@ -44,7 +53,16 @@ def fuzzy_match(query, text, threshold=2):
     return False
 
 class GlobalSearchView(APIView):
+    """
+    Top-bar search across establishments, users and inspections.
+
+    The three searches run concurrently (see core.background.run_concurrently)
+    over the indexed search_text columns and return compact rows. Results are
+    cached for GLOBAL_SEARCH_CACHE_SECONDS per normalized query and role, so
+    repeated keystrokes and popular queries skip the database entirely.
+    """
     permission_classes = [IsAuthenticated]
+    result_limit = 10
 
     def get(self, request, *args, **kwargs):
         try:
@@ -59,65 +77,26 @@ class GlobalSearchView(APIView):
                     "suggestions": []
                 })
 
-            # Establishments query
-            try:
-                est_qs = Establishment.objects.all()
-                if q:
-                    est_qs = est_qs.filter(
-                        Q(name__icontains=q)
-                        | Q(nature_of_business__icontains=q)
-                        | Q(province__icontains=q)
-                        | Q(city__icontains=q)
-                        | Q(barangay__icontains=q)
-                    )
-                establishments = EstablishmentSerializer(est_qs[:10], many=True).data
-            except Exception as e:
-                print(f"Establishment search error: {e}")
-                establishments = []
-
-            # Users query
-            try:
-                user_qs = User.objects.all()
-                if q:
-                    user_qs = user_qs.filter(
-                        Q(first_name__icontains=q)
-                        | Q(last_name__icontains=q)
-                        | Q(email__icontains=q)
-                        | Q(userlevel__icontains=q)
-                    )
-                users = UserSerializer(user_qs[:10], many=True).data
-            except Exception as e:
-                print(f"User search error: {e}")
-                users = []
-
-            # Inspections query - Handle ManyToMany relationship
-            try:
-                insp_qs = Inspection.objects.prefetch_related("establishments").all()
-                if q:
-                    insp_qs = insp_qs.filter(
-                        Q(code__icontains=q) |
-                        Q(law__icontains=q) |
-                        Q(establishments__name__icontains=q)
-                    ).distinct()
-                inspections = InspectionSerializer(insp_qs[:10], many=True).data
-            except Exception as e:
-                print(f"Inspection search error: {e}")
-                inspections = []
+            key = self.cache_key(q, getattr(request.user, 'userlevel', None))
+            results = cache.get(key)
+            if results is None:
+                establishments, users, inspections = run_concurrently(
+                    lambda: self.search_establishments(q),
+                    lambda: self.search_users(q),
+                    lambda: self.search_inspections(q),
+                )
+                results = {"establishments": establishments, "users": users, "inspections": inspections}
+                cache.set(key, results, settings.GLOBAL_SEARCH_CACHE_SECONDS)
 
             # Generate search suggestions
-            suggestions = self.generate_search_suggestions(q, establishments, users, inspections)
+            suggestions = self.generate_search_suggestions(
+                q, results["establishments"], results["users"], results["inspections"]
+            )
 
-            return Response({
-                "establishments": establishments,
-                "users": users,
-                "inspections": inspections,
-                "suggestions": suggestions
-            })
+            return Response({**results, "suggestions": suggestions})
         
         except Exception as e:
-            print(f"Global search error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Global search error: {e}")
             return Response({
                 "establishments": [],
                 "users": [],
@@ -126,6 +105,42 @@ class GlobalSearchView(APIView):
                 "error": str(e)
             }, status=500)
 
+    @staticmethod
+    def cache_key(query, role):
+        """Same words in any case/spacing/punctuation share an entry, as search_filter() ignores them"""
+        normalized = ' '.join(re.findall(r'\w+', query.lower()))
+        digest = hashlib.md5(normalized.encode()).hexdigest()
+        return f'global-search:{role}:{digest}'
+
+    def search_establishments(self, q):
+        try:
+            est_qs = Establishment.objects.filter(search_filter(q))
+            return list(EstablishmentSearchSerializer(est_qs[:self.result_limit], many=True).data)
+        except Exception as e:
+            logger.error(f"Establishment search error: {e}")
+            return []
+
+    def search_users(self, q):
+        try:
+            user_qs = User.objects.filter(search_filter(q))
+            return list(UserSearchSerializer(user_qs[:self.result_limit], many=True).data)
+        except Exception as e:
+            logger.error(f"User search error: {e}")
+            return []
+
+    def search_inspections(self, q):
+        try:
+            # Establishment names are part of search_text, so no M2M join or DISTINCT
+            insp_qs = (
+                Inspection.objects.filter(search_filter(q))
+                .select_related('assigned_to')
+                .prefetch_related(Prefetch('establishments', Establishment.objects.only('id', 'name', 'city')))
+            )
+            return list(InspectionSearchSerializer(insp_qs[:self.result_limit], many=True).data)
+        except Exception as e:
+            logger.error(f"Inspection search error: {e}")
+            return []
+
     def generate_search_suggestions(self, query, establishments, users, inspections):
         suggestions = []
         
@@ -0,0 +1,102 @@
+"""
+Per-establishment inspection state.
+
+Establishment.has_active_inspection, current_inspection and
+last_inspection_at summarise the inspections an establishment belongs to, so
+listing endpoints can filter on indexed columns instead of scanning the
+inspection/establishment M2M table on every request. The state is refreshed
+from inspections' post_save/post_delete and the M2M m2m_changed signals (see
+inspections/signals.py); rebuild_establishment_state() recomputes all of it.
+
+- has_active_inspection: an inspection is in the workflow (past CREATED and
+  not closed), so the establishment is not available for a new one
+- current_inspection: most recent inspection that is not closed
+- last_inspection_at: creation time of the most recent inspection
+"""
+from django.db.models import Exists, OuterRef
+
+from .models import Establishment
+
+CLOSED_STATUSES = ('CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT')
+STATE_FIELDS = ['has_active_inspection', 'current_inspection', 'last_inspection_at']
+
+
+def assigned_to_user(user):
+    """Establishments with an open inspection assigned to `user` (single EXISTS query)"""
+    from inspections.models import Inspection
+
+    assigned = Inspection.establishments.through.objects.filter(
+        establishment_id=OuterRef('pk'),
+        inspection__assigned_to=user,
+    ).exclude(inspection__current_status__in=CLOSED_STATUSES)
+    # Every establishment with an open inspection has current_inspection set
+    return Establishment.objects.filter(current_inspection__isnull=False).filter(Exists(assigned))
+
+
+def is_active_status(status):
+    """Status of an inspection that keeps its establishments busy"""
+    return status not in CLOSED_STATUSES and status != 'CREATED'
+
+
+def compute_state(inspection_rows):
+    """
+    Fold (establishment_id, inspection_id, status, created_at) rows, newest
+    first, into {establishment_id: (has_active, current_inspection_id, last_inspection_at)}.
+    """
+    state = {}
+    for establishment_id, inspection_id, status, created_at in inspection_rows:
+        has_active, current_id, last_at = state.get(establishment_id, (False, None, None))
+        if last_at is None:
+            last_at = created_at
+        if current_id is None and status not in CLOSED_STATUSES:
+            current_id = inspection_id
+        state[establishment_id] = (has_active or is_active_status(status), current_id, last_at)
+    return state
+
+
+def _inspection_rows(establishment_ids=None):
+    from inspections.models import Inspection
+
+    through = Inspection.establishments.through
+    rows = through.objects.all()
+    if establishment_ids is not None:
+        rows = rows.filter(establishment_id__in=establishment_ids)
+    return rows.order_by('-inspection__created_at', '-inspection_id').values_list(
+        'establishment_id', 'inspection_id', 'inspection__current_status', 'inspection__created_at',
+    )
+
+
+def refresh_establishment_state(establishment_ids):
+    """Recompute the state of the given establishments (one read, one bulk write)"""
+    establishment_ids = {pk for pk in establishment_ids if pk is not None}
+    if not establishment_ids:
+        return 0
+
+    state = compute_state(_inspection_rows(establishment_ids))
+    establishments = list(Establishment.objects.filter(pk__in=establishment_ids).only('pk', *STATE_FIELDS))
+    changed = []
+    for establishment in establishments:
+        has_active, current_id, last_at = state.get(establishment.pk, (False, None, None))
+        if (establishment.has_active_inspection, establishment.current_inspection_id, establishment.last_inspection_at) \
+                != (has_active, current_id, last_at):
+            establishment.has_active_inspection = has_active
+            establishment.current_inspection_id = current_id
+            establishment.last_inspection_at = last_at
+            changed.append(establishment)
+    if changed:
+        Establishment.objects.bulk_update(changed, STATE_FIELDS)
+    return len(changed)
+
+
+def rebuild_establishment_state(batch_size=1000):
+    """
+    Recompute every establishment's state.
+
+    Returns:
+        int: Number of establishments updated
+    """
+    ids = list(Establishment.objects.order_by('pk').values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(ids), batch_size):
+        updated += refresh_establishment_state(ids[start:start + batch_size])
+    return updated
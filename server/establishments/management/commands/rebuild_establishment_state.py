@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from establishments.inspection_state import rebuild_establishment_state
+
+
+class Command(BaseCommand):
+    help = 'Recompute every establishment\'s inspection state (active flag, current inspection, last inspection date).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Establishments per update batch')
+
+    def handle(self, *args, **options):
+        updated = rebuild_establishment_state(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated inspection state of {updated} establishment(s)'))
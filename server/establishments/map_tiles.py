@@ -0,0 +1,180 @@
+"""
+Map tiles for establishments.
+
+The map requests establishments per web-mercator tile (z/x/y) instead of
+downloading the whole registry with full-precision polygons. Each tile is a
+compact columnar payload:
+
+    {
+        "z": 12, "x": 3421, "y": 1881,
+        "clusters": {"lat": [...], "lng": [...], "count": [...]},
+        "points":   {"id": [...], "name": [...], "lat": [...], "lng": [...],
+                     "marker_icon": [...], "is_active": [...]},
+        "polygons": {"id": [...], "coords": [[[lat, lng], ...], ...]}
+    }
+
+Below MAP_CLUSTER_MAX_ZOOM nearby markers are merged into grid clusters
+(cells holding a single marker stay points). Polygons are only sent from
+MAP_POLYGON_MIN_ZOOM, simplified to about one pixel at the tile's zoom and
+rounded to the precision that zoom can show. Points belong to exactly one
+tile; a polygon is listed in every tile it touches, so clients key them by id.
+
+Unrestricted tiles are cached per tile for MAP_TILE_CACHE_SECONDS under
+tile_version(): the spatial index version (see spatial.py) plus a delete
+counter bumped by the post_delete signal, so any establishment save,
+set_polygon or delete invalidates them. Views read the version once per
+request and pass it to get_tile() for every tile they return.
+"""
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import spatial
+
+MAX_ZOOM = 22
+DELETES_KEY = 'establishments:tile:deletes'
+CLUSTER_GRID = 8  # cells per tile side when clustering
+
+
+def tile_bounds(z, x, y):
+    """(min_lat, max_lat, min_lng, max_lng) of a web-mercator tile"""
+    n = 2 ** z
+    min_lng = x / n * 360.0 - 180.0
+    max_lng = (x + 1) / n * 360.0 - 180.0
+    max_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    min_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def tiles_for_bbox(min_lat, max_lat, min_lng, max_lng, z):
+    """[(x, y)] of the tiles covering a bounding box at zoom z"""
+    n = 2 ** z
+
+    def tile_x(lng):
+        return min(n - 1, max(0, int((lng + 180.0) / 360.0 * n)))
+
+    def tile_y(lat):
+        lat = max(-85.0511, min(85.0511, lat))
+        rad = math.radians(lat)
+        return min(n - 1, max(0, int((1 - math.asinh(math.tan(rad)) / math.pi) / 2 * n)))
+
+    return [
+        (x, y)
+        for x in range(tile_x(min_lng), tile_x(max_lng) + 1)
+        for y in range(tile_y(max_lat), tile_y(min_lat) + 1)
+    ]
+
+
+def _precision(z):
+    """Decimal places that still matter at zoom z (about a tenth of a pixel)"""
+    return max(2, min(6, math.ceil(math.log10(256 * 2 ** z / 360.0)) + 1))
+
+
+def _cluster(rows, bounds):
+    min_lat, max_lat, min_lng, max_lng = bounds
+    cells = defaultdict(list)
+    for row in rows:
+        lat, lng = row[2], row[3]
+        col = min(CLUSTER_GRID - 1, int((lng - min_lng) / (max_lng - min_lng) * CLUSTER_GRID))
+        cell_row = min(CLUSTER_GRID - 1, int((lat - min_lat) / (max_lat - min_lat) * CLUSTER_GRID))
+        cells[(cell_row, col)].append(row)
+
+    clusters, points = [], []
+    for members in cells.values():
+        if len(members) == 1:
+            points.extend(members)
+        else:
+            clusters.append((
+                sum(member[2] for member in members) / len(members),
+                sum(member[3] for member in members) / len(members),
+                len(members),
+            ))
+    return clusters, points
+
+
+def build_tile(z, x, y, queryset):
+    """Tile payload for the establishments in `queryset`"""
+    bounds = tile_bounds(z, x, y)
+    min_lat, max_lat, min_lng, max_lng = bounds
+    digits = _precision(z)
+
+    rows = [
+        (pk, name, float(lat), float(lng), icon, active)
+        for pk, name, lat, lng, icon, active in queryset.filter(
+            latitude__gte=min_lat, latitude__lt=max_lat,
+            longitude__gte=min_lng, longitude__lt=max_lng,
+        ).order_by('pk').values_list('pk', 'name', 'latitude', 'longitude', 'marker_icon', 'is_active')
+    ]
+
+    if z <= settings.MAP_CLUSTER_MAX_ZOOM:
+        clusters, points = _cluster(rows, bounds)
+    else:
+        clusters, points = [], rows
+
+    payload = {
+        'z': z, 'x': x, 'y': y,
+        'clusters': {
+            'lat': [round(c[0], digits) for c in clusters],
+            'lng': [round(c[1], digits) for c in clusters],
+            'count': [c[2] for c in clusters],
+        },
+        'points': {
+            'id': [p[0] for p in points],
+            'name': [p[1] for p in points],
+            'lat': [round(p[2], digits) for p in points],
+            'lng': [round(p[3], digits) for p in points],
+            'marker_icon': [p[4] for p in points],
+            'is_active': [p[5] for p in points],
+        },
+        'polygons': {'id': [], 'coords': []},
+    }
+
+    if z >= settings.MAP_POLYGON_MIN_ZOOM:
+        tolerance = 360.0 / (256 * 2 ** z)
+        polygons = queryset.filter(
+            polygon_min_lat__lte=max_lat, polygon_max_lat__gte=min_lat,
+            polygon_min_lng__lte=max_lng, polygon_max_lng__gte=min_lng,
+        ).order_by('pk').values_list('pk', 'polygon')
+        for pk, polygon in polygons:
+            coords = _simplified(polygon, tolerance, digits)
+            if coords:
+                payload['polygons']['id'].append(pk)
+                payload['polygons']['coords'].append(coords)
+    return payload
+
+
+def _simplified(polygon, tolerance, digits):
+    shape = spatial.to_shape(polygon)
+    if shape is None:
+        return None
+    simple = shape.simplify(tolerance, preserve_topology=True)
+    if simple.is_empty or simple.geom_type != 'Polygon':
+        simple = shape
+    return [[round(lat, digits), round(lng, digits)] for lng, lat in list(simple.exterior.coords)[:-1]]
+
+
+def tile_version():
+    """Cache version of unrestricted tiles; read it once per request"""
+    return f'{spatial.get_version()}-{cache.get(DELETES_KEY, 0)}'
+
+
+def note_delete():
+    """Invalidate cached tiles after an establishment is deleted"""
+    try:
+        cache.incr(DELETES_KEY)
+    except ValueError:
+        cache.set(DELETES_KEY, 1, None)
+
+
+def get_tile(z, x, y, queryset, version=None):
+    """Tile payload, served from the per-tile cache under `version` (see tile_version) when one is given"""
+    if version is None:
+        return build_tile(z, x, y, queryset)
+    key = f'establishments:tile:{version}:{z}:{x}:{y}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_tile(z, x, y, queryset)
+        cache.set(key, payload, settings.MAP_TILE_CACHE_SECONDS)
+    return payload
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['created_at'], name='establishme_created_9d9b68_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+CLOSED_STATUSES = ('CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT')
+
+
+def backfill_inspection_state(apps, schema_editor):
+    Establishment = apps.get_model('establishments', 'Establishment')
+    Inspection = apps.get_model('inspections', 'Inspection')
+    rows = Inspection.establishments.through.objects.order_by('-inspection__created_at', '-inspection_id').values_list(
+        'establishment_id', 'inspection_id', 'inspection__current_status', 'inspection__created_at',
+    )
+
+    state = {}
+    for establishment_id, inspection_id, status, created_at in rows.iterator(chunk_size=2000):
+        has_active, current_id, last_at = state.get(establishment_id, (False, None, None))
+        if last_at is None:
+            last_at = created_at
+        if current_id is None and status not in CLOSED_STATUSES:
+            current_id = inspection_id
+        has_active = has_active or (status not in CLOSED_STATUSES and status != 'CREATED')
+        state[establishment_id] = (has_active, current_id, last_at)
+
+    batch = []
+    for establishment in Establishment.objects.filter(pk__in=list(state)).only('pk').iterator(chunk_size=2000):
+        establishment.has_active_inspection, establishment.current_inspection_id, establishment.last_inspection_at = \
+            state[establishment.pk]
+        batch.append(establishment)
+        if len(batch) >= 1000:
+            Establishment.objects.bulk_update(batch, ['has_active_inspection', 'current_inspection', 'last_inspection_at'])
+            batch = []
+    if batch:
+        Establishment.objects.bulk_update(batch, ['has_active_inspection', 'current_inspection', 'last_inspection_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0013_keyset_indexes'),
+        ('establishments', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='establishment',
+            name='current_inspection',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inspections.inspection'),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='has_active_inspection',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='last_inspection_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['has_active_inspection', 'created_at'], name='establishme_has_act_db8533_idx'),
+        ),
+        migrations.RunPython(backfill_inspection_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+def backfill_polygon_bounds(apps, schema_editor):
+    Establishment = apps.get_model('establishments', 'Establishment')
+    fields = ['polygon_min_lat', 'polygon_max_lat', 'polygon_min_lng', 'polygon_max_lng']
+    batch = []
+    for establishment in Establishment.objects.exclude(polygon__isnull=True).only('pk', 'polygon').iterator(chunk_size=1000):
+        polygon = establishment.polygon
+        if not isinstance(polygon, list) or len(polygon) < 3:
+            continue
+        try:
+            lats = [float(point[0]) for point in polygon]
+            lngs = [float(point[1]) for point in polygon]
+        except (TypeError, ValueError, IndexError):
+            continue
+        establishment.polygon_min_lat, establishment.polygon_max_lat = min(lats), max(lats)
+        establishment.polygon_min_lng, establishment.polygon_max_lng = min(lngs), max(lngs)
+        batch.append(establishment)
+        if len(batch) >= 1000:
+            Establishment.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Establishment.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0003_inspection_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='establishment',
+            name='polygon_max_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='polygon_max_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='polygon_min_lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='establishment',
+            name='polygon_min_lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['polygon_min_lat', 'polygon_max_lat'], name='establishme_polygon_29e1e5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['polygon_min_lng', 'polygon_max_lng'], name='establishme_polygon_258c71_idx'),
+        ),
+        migrations.RunPython(backfill_polygon_bounds, migrations.RunPython.noop),
+    ]
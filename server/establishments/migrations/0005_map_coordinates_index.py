@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0004_polygon_bounds'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['latitude', 'longitude'], name='establishme_latitud_0b2ead_idx'),
+        ),
+    ]
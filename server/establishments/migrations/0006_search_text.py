@@ -0,0 +1,31 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:44
+
+import core.search
+from django.db import migrations
+
+from establishments.models import build_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    Establishment = apps.get_model('establishments', 'Establishment')
+    core.search.rebuild_search_text(Establishment.objects.all(), build_search_text, batch_size=2000)
+
+
+add_fulltext_index, drop_fulltext_index = core.search.fulltext_index_operations('establishments_establishment', 'establishment_search_text_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0005_map_coordinates_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='establishment',
+            name='search_text',
+            field=core.search.SearchTextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0006_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='establishment',
+            index=models.Index(fields=['updated_at'], name='establishme_updated_9ffd32_idx'),
+        ),
+    ]
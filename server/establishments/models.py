@@ -2,6 +2,32 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 
+from core.search import SearchTextField, search_document
+
+POLYGON_BOUNDS_FIELDS = ['polygon_min_lat', 'polygon_max_lat', 'polygon_min_lng', 'polygon_max_lng']
+
+
+def polygon_bounds(polygon):
+    """(min_lat, max_lat, min_lng, max_lng) of a [[lat, lng], ...] polygon, all None if unusable"""
+    if not isinstance(polygon, list) or len(polygon) < 3:
+        return None, None, None, None
+    try:
+        lats = [float(point[0]) for point in polygon]
+        lngs = [float(point[1]) for point in polygon]
+    except (TypeError, ValueError, IndexError):
+        return None, None, None, None
+    return min(lats), max(lats), min(lngs), max(lngs)
+
+
+# Fields combined into Establishment.search_text
+SEARCH_FIELDS = ['name', 'nature_of_business', 'street_building', 'barangay', 'city', 'province']
+
+
+def build_search_text(establishment):
+    """Text indexed for an establishment's keyword search"""
+    return search_document(*(getattr(establishment, field) for field in SEARCH_FIELDS))
+
+
 class Establishment(models.Model):
     name = models.CharField(max_length=255, unique=True)
     nature_of_business = models.CharField(max_length=255)
@@ -21,6 +47,12 @@ class Establishment(models.Model):
     # Store polygon as JSON in database
     polygon = models.JSONField(blank=True, null=True)
     
+    # Polygon bounding box, kept in sync on save for overlap/viewport prefilters
+    polygon_min_lat = models.FloatField(null=True, blank=True, editable=False)
+    polygon_max_lat = models.FloatField(null=True, blank=True, editable=False)
+    polygon_min_lng = models.FloatField(null=True, blank=True, editable=False)
+    polygon_max_lng = models.FloatField(null=True, blank=True, editable=False)
+    
     # Marker icon type (stores the key from ESTABLISHMENT_ICON_MAP)
     marker_icon = models.CharField(max_length=100, blank=True, null=True)
     
@@ -29,9 +61,27 @@ class Establishment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Inspection state, maintained from inspection changes (see inspection_state.py)
+    has_active_inspection = models.BooleanField(default=False, editable=False)
+    current_inspection = models.ForeignKey(
+        'inspections.Inspection', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+', editable=False,
+    )
+    last_inspection_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    # Lower-cased name/business/address text, kept in sync on save (FULLTEXT-indexed on MySQL)
+    search_text = SearchTextField(blank=True, default='', editable=False)
+    
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored document so signals can tell when inspections need re-indexing
+        instance._loaded_search_text = instance.__dict__.get('search_text')
+        return instance
+
     def clean(self):
         # Check for case-insensitive duplicates
         if Establishment.objects.filter(
@@ -41,6 +91,14 @@ class Establishment(models.Model):
     
     def save(self, *args, **kwargs):
         self.full_clean()  # Run validation before saving
+        self.polygon_min_lat, self.polygon_max_lat, self.polygon_min_lng, self.polygon_max_lng = \
+            polygon_bounds(self.polygon)
+        self.search_text = build_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'polygon' in update_fields:
+            kwargs['update_fields'] = update_fields = set(update_fields) | set(POLYGON_BOUNDS_FIELDS)
+        if update_fields is not None and set(update_fields) & set(SEARCH_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'search_text'}
         super().save(*args, **kwargs)
 
     class Meta:
@@ -50,4 +108,10 @@ class Establishment(models.Model):
             models.Index(fields=['nature_of_business']),
             models.Index(fields=['city']),
             models.Index(fields=['barangay']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['has_active_inspection', 'created_at']),
+            models.Index(fields=['polygon_min_lat', 'polygon_max_lat']),
+            models.Index(fields=['polygon_min_lng', 'polygon_max_lng']),
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['updated_at']),
         ]
\ No newline at end of file
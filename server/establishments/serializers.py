@@ -6,7 +6,8 @@ from django.core.exceptions import ValidationError
 class EstablishmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Establishment
-        fields = '__all__'
+        # search_text is an internal index column
+        exclude = ['search_text']
     
     def validate(self, data):
         # Check for case-insensitive duplicates
@@ -102,4 +103,13 @@ class AdminReportEstablishmentSerializer(serializers.ModelSerializer):
             parts.append(obj.city)
         if obj.province:
             parts.append(obj.province)
-        return ', '.join(parts) if parts else 'N/A'
\ No newline at end of file
+        return ', '.join(parts) if parts else 'N/A'
+
+
+class EstablishmentSearchSerializer(serializers.ModelSerializer):
+    """Compact establishment row for global search results (no polygon or map fields)"""
+
+    class Meta:
+        model = Establishment
+        fields = ['id', 'name', 'nature_of_business', 'street_building', 'barangay', 'city', 'province', 'is_active']
+        read_only_fields = fields
@@ -1,5 +1,6 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .map_tiles import note_delete
 from .models import Establishment
 from audit.utils import log_activity
 
@@ -21,3 +22,8 @@ def log_establishment_save(sender, instance, created, **kwargs):
             module="ESTABLISHMENTS",
             description=f"Updated establishment: {instance.name}",
         )
+
+
+@receiver(post_delete, sender=Establishment)
+def invalidate_map_tiles(sender, instance, **kwargs):
+    note_delete()
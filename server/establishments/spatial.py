@@ -0,0 +1,140 @@
+"""
+Spatial lookups over establishment polygons.
+
+Each establishment stores its polygon's bounding box in indexed columns
+(see Establishment.save). candidates_near() answers "which polygons could
+touch this area" from an in-process Shapely STRtree when it is current, and
+otherwise from an indexed bounding-box query, so overlap checks only ever
+build and compare the few polygons that are actually nearby.
+
+The tree is tagged with a version read from the database (the latest
+updated_at, one seek on its index), so a save in any process makes every
+other process's tree stale on its next lookup. Deletes do not change that
+version, so tree hits are confirmed by primary key and a missing one triggers
+a rebuild. A stale tree is rebuilt in the background rather than on the
+request that finds it; until then lookups use the bounding-box query.
+
+Polygons are stored as [[lat, lng], ...]; Shapely geometries use (lng, lat).
+"""
+import logging
+import threading
+
+from django.db.models import Max
+
+from core.background import submit
+
+from .models import Establishment
+
+try:
+    from shapely import STRtree
+    from shapely.geometry import Polygon as ShapelyPolygon, box
+except Exception:
+    STRtree = None
+    ShapelyPolygon = None
+    box = None
+
+logger = logging.getLogger(__name__)
+
+_tree = None  # (version, STRtree, [establishment ids], [geometries])
+_tree_lock = threading.Lock()
+_rebuilding = False
+
+
+def to_shape(polygon):
+    """Shapely polygon for stored [[lat, lng], ...] data, or None if unusable"""
+    if ShapelyPolygon is None or not isinstance(polygon, list) or len(polygon) < 3:
+        return None
+    try:
+        shape = ShapelyPolygon([(float(lng), float(lat)) for lat, lng in polygon])
+    except Exception:
+        return None
+    if not shape.is_valid or shape.area <= 0:
+        return None
+    return shape
+
+
+def get_version():
+    """Changes whenever an establishment is created or saved, in any process"""
+    latest = Establishment.objects.aggregate(latest=Max('updated_at'))['latest']
+    return latest.timestamp() if latest else 0
+
+
+def build_tree():
+    """Rebuild the tree from every stored polygon (runs in the background)"""
+    global _tree, _rebuilding
+    try:
+        version = get_version()
+        ids, shapes = [], []
+        rows = Establishment.objects.filter(polygon_min_lat__isnull=False).values_list('pk', 'polygon')
+        for pk, polygon in rows.iterator(chunk_size=2000):
+            shape = to_shape(polygon)
+            if shape is not None:
+                ids.append(pk)
+                shapes.append(shape)
+        with _tree_lock:
+            _tree = (version, STRtree(shapes), ids, shapes)
+        logger.info(f"Built establishment polygon index with {len(ids)} polygon(s)")
+    finally:
+        _rebuilding = False
+
+
+def _schedule_rebuild():
+    global _rebuilding
+    with _tree_lock:
+        if not _rebuilding:
+            _rebuilding = True
+            try:
+                submit(build_tree)
+            except Exception as e:
+                _rebuilding = False
+                logger.warning(f"Could not schedule polygon index rebuild: {str(e)}")
+
+
+def _current_tree():
+    """The cached tree if it matches the database version; otherwise schedule a rebuild and return None"""
+    if STRtree is None:
+        return None
+    tree = _tree
+    if tree is not None and tree[0] == get_version():
+        return tree
+    _schedule_rebuild()
+    return None
+
+
+def candidates_near(min_lat, max_lat, min_lng, max_lng, exclude_pk=None):
+    """[(establishment id, shape)] whose bounding boxes intersect the given box"""
+    tree = _current_tree()
+    if tree is not None:
+        _, strtree, ids, shapes = tree
+        hits = [i for i in sorted(strtree.query(box(min_lng, min_lat, max_lng, max_lat))) if ids[i] != exclude_pk]
+        if not hits:
+            return []
+        existing = set(Establishment.objects.filter(pk__in=[ids[i] for i in hits]).values_list('pk', flat=True))
+        if len(existing) < len(hits):
+            # Deleted since the tree was built
+            _schedule_rebuild()
+        return [(ids[i], shapes[i]) for i in hits if ids[i] in existing]
+
+    rows = Establishment.objects.filter(
+        polygon_min_lat__lte=max_lat,
+        polygon_max_lat__gte=min_lat,
+        polygon_min_lng__lte=max_lng,
+        polygon_max_lng__gte=min_lng,
+    )
+    if exclude_pk is not None:
+        rows = rows.exclude(pk=exclude_pk)
+    candidates = []
+    for pk, polygon in rows.values_list('pk', 'polygon'):
+        shape = to_shape(polygon)
+        if shape is not None:
+            candidates.append((pk, shape))
+    return candidates
+
+
+def overlapping_shapes(shape, exclude_pk=None):
+    """Stored polygons (other than exclude_pk) that intersect `shape`"""
+    min_lng, min_lat, max_lng, max_lat = shape.bounds
+    return [
+        other for _, other in candidates_near(min_lat, max_lat, min_lng, max_lng, exclude_pk)
+        if other.intersects(shape)
+    ]
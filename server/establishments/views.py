@@ -2,12 +2,18 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from .models import Establishment
 from .serializers import EstablishmentSerializer
-from django.db.models import Q
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.utils import log_activity
+from notifications.services import active_users, notify_users
+from core.pagination import CursorPaginationMixin
+from core.search import search_filter
+from .inspection_state import assigned_to_user
+from .map_tiles import MAX_ZOOM, get_tile, tile_version, tiles_for_bbox
+from .spatial import overlapping_shapes
 
 try:
     from shapely.geometry import Polygon as ShapelyPolygon, MultiPolygon as ShapelyMultiPolygon
@@ -19,7 +25,10 @@ except Exception:
 
 User = get_user_model()
 
-class EstablishmentViewSet(viewsets.ModelViewSet):
+# Roles that see every establishment (others only those they are inspecting)
+ALL_ESTABLISHMENTS_LEVELS = ['Admin', 'Division Chief', 'Legal Unit']
+
+class EstablishmentViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Establishment.objects.all()
     serializer_class = EstablishmentSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -36,20 +45,19 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         # Apply search filter if provided
         search = request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(street_building__icontains=search) |
-                Q(barangay__icontains=search) |
-                Q(city__icontains=search) |
-                Q(province__icontains=search) |
-                Q(nature_of_business__icontains=search)
-            )
+            queryset = queryset.filter(search_filter(search))
         
         # Apply province filter if provided
         province = request.query_params.get('province')
         if province:
             queryset = queryset.filter(province__icontains=province)
         
+        # Cursor mode (?pagination=cursor): keyset pages, no OFFSET or count
+        if self.use_cursor_pagination():
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         # Calculate pagination
         total_count = queryset.count()
         start_index = (page - 1) * page_size
@@ -139,18 +147,13 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         # Users who should be notified about new establishments
         notify_userlevels = ["Admin", "Legal Unit", "Division Chief", "Section Chief", "Unit Head"]
         
-        # Get all users with these levels
-        users_to_notify = User.objects.filter(userlevel__in=notify_userlevels, is_active=True)
-        
-        for recipient in users_to_notify:
-            from notifications.models import Notification
-            Notification.objects.create(
-                recipient=recipient,
-                sender=created_by,
-                notification_type='new_establishment',
-                title='New Establishment Created',
-                message=f'A new establishment "{establishment.name}" has been created by {created_by.email}.'
-            )
+        notify_users(
+            active_users(notify_userlevels),
+            sender=created_by,
+            notification_type='new_establishment',
+            title='New Establishment Created',
+            message=f'A new establishment "{establishment.name}" has been created by {created_by.email}.'
+        )
     
     @action(detail=True, methods=['post'])
     def set_polygon(self, request, pk=None):
@@ -184,17 +187,8 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
                 if not drawn.is_valid or drawn.area == 0:
                     return Response({'error': 'Invalid or empty polygon'}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Collect other establishment polygons
-                others = Establishment.objects.exclude(pk=establishment.pk).values_list('polygon', flat=True)
-                shapes = []
-                for poly in others:
-                    if isinstance(poly, list) and len(poly) >= 3:
-                        try:
-                            shp = ShapelyPolygon([(float(lng), float(lat)) for lat, lng in poly])
-                            if shp.is_valid and shp.area > 0:
-                                shapes.append(shp)
-                        except Exception:
-                            continue
+                # Only polygons that actually intersect (bounding-box/STRtree prefilter)
+                shapes = overlapping_shapes(drawn, exclude_pk=establishment.pk)
                 if shapes:
                     union = unary_union(shapes)
                     diff = drawn.difference(union)
@@ -245,6 +239,46 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         
         return Response({'error': 'No polygon data provided'}, status=400)
     
+    def _map_scope(self, request):
+        """(queryset, tile cache version or None) of establishments the user may see on the map"""
+        if request.user.userlevel in ALL_ESTABLISHMENTS_LEVELS:
+            return Establishment.objects.all(), tile_version()
+        return assigned_to_user(request.user), None
+    
+    @action(detail=False, methods=['get'], url_path=r'map/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)')
+    def map_tile(self, request, z=None, x=None, y=None):
+        """Clustered/simplified establishments for one map tile (see map_tiles.py)"""
+        z, x, y = int(z), int(x), int(y)
+        if z > MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+            return Response({'error': 'Invalid tile'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset, version = self._map_scope(request)
+        return Response(get_tile(z, x, y, queryset, version))
+    
+    @action(detail=False, methods=['get'])
+    def map(self, request):
+        """
+        Map tiles covering a viewport: ?bbox=min_lng,min_lat,max_lng,max_lat&zoom=12
+        """
+        try:
+            min_lng, min_lat, max_lng, max_lat = [float(v) for v in request.query_params.get('bbox', '').split(',')]
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response(
+                {'error': 'bbox (min_lng,min_lat,max_lng,max_lat) and zoom are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 0 <= zoom <= MAX_ZOOM or min_lng > max_lng or min_lat > max_lat:
+            return Response({'error': 'Invalid bbox or zoom'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        tiles = tiles_for_bbox(min_lat, max_lat, min_lng, max_lng, zoom)
+        if len(tiles) > settings.MAP_MAX_TILES_PER_REQUEST:
+            return Response(
+                {'error': f'Viewport spans {len(tiles)} tiles; zoom in or request tiles individually'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset, version = self._map_scope(request)
+        return Response({'zoom': zoom, 'tiles': [get_tile(zoom, x, y, queryset, version) for x, y in tiles]})
+    
     @action(detail=False, methods=['get'])
     def active(self, request):
         active_establishments = Establishment.objects.filter(is_active=True)
@@ -259,15 +293,8 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         if not query or len(query) < 2:
             return Response({'results': [], 'count': 0})
         
-        # Simple search across name, address, and business type
-        establishments = Establishment.objects.filter(
-            Q(name__icontains=query) |
-            Q(street_building__icontains=query) |
-            Q(barangay__icontains=query) |
-            Q(city__icontains=query) |
-            Q(province__icontains=query) |
-            Q(nature_of_business__icontains=query)
-        )
+        # Name, address and business type are all part of search_text
+        establishments = Establishment.objects.filter(search_filter(query))
         
         serializer = self.get_serializer(establishments, many=True)
         return Response({
@@ -283,9 +310,9 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         - CLOSED_COMPLIANT
         - CLOSED_NON_COMPLIANT
         - CREATED (initial state, can be overridden)
-        """
-        from inspections.models import Inspection
         
+        Uses the maintained has_active_inspection flag (see inspection_state.py).
+        """
         # Get pagination parameters
         page = int(request.query_params.get('page', 1))
         page_size = int(request.query_params.get('page_size', 10))
@@ -293,39 +320,19 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         # Get search parameter
         search = request.query_params.get('search', '').strip()
         
-        # Get all establishments
-        queryset = Establishment.objects.all()
+        # Establishments without active inspections
+        queryset = Establishment.objects.filter(has_active_inspection=False)
         
         # Apply search filter if provided
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(street_building__icontains=search) |
-                Q(barangay__icontains=search) |
-                Q(city__icontains=search) |
-                Q(province__icontains=search) |
-                Q(nature_of_business__icontains=search)
-            )
-        
-        # Exclude establishments that have active inspections
-        # Active statuses are all except the final closed states
-        active_statuses = [
-            'SECTION_ASSIGNED', 'SECTION_IN_PROGRESS', 'SECTION_COMPLETED',
-            'UNIT_ASSIGNED', 'UNIT_IN_PROGRESS', 'UNIT_COMPLETED',
-            'MONITORING_ASSIGNED', 'MONITORING_IN_PROGRESS', 
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'UNIT_REVIEWED', 'SECTION_REVIEWED', 'DIVISION_REVIEWED',
-            'LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT'
-        ]
-        
-        # Get establishment IDs that have active inspections
-        active_inspection_establishment_ids = Inspection.objects.filter(
-            current_status__in=active_statuses
-        ).values_list('establishments', flat=True)
-        
-        # Exclude establishments with active inspections
-        queryset = queryset.exclude(id__in=active_inspection_establishment_ids)
+            queryset = queryset.filter(search_filter(search))
         
+        # Cursor mode (?pagination=cursor): keyset pages, no OFFSET or count
+        if self.use_cursor_pagination():
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         # Calculate pagination
         total_count = queryset.count()
         start_index = (page - 1) * page_size
@@ -352,58 +359,30 @@ class EstablishmentViewSet(viewsets.ModelViewSet):
         - Admin, Division Chief, Legal Unit: All establishments
         - Section Chief, Unit Head, Monitoring Personnel: Only establishments with active inspections assigned to them
         """
-        from inspections.models import Inspection
-        
         user = request.user
         page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 10000))
-        
-        # Define active inspection statuses (not closed)
-        active_statuses = [
-            'CREATED',
-            'SECTION_ASSIGNED', 'SECTION_IN_PROGRESS', 
-            'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
-            'UNIT_ASSIGNED', 'UNIT_IN_PROGRESS', 
-            'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_ASSIGNED', 'MONITORING_IN_PROGRESS',
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'UNIT_REVIEWED', 'SECTION_REVIEWED', 'DIVISION_REVIEWED',
-            'LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT'
-        ]
+        page_size = int(request.query_params.get('page_size', 10))
         
         # Role-based filtering
-        if user.userlevel in ['Admin', 'Division Chief', 'Legal Unit']:
+        if user.userlevel in ALL_ESTABLISHMENTS_LEVELS:
             # Show all establishments
             queryset = Establishment.objects.all()
         else:
-            # Section Chief, Unit Head, Monitoring Personnel
-            # Get establishment IDs from active inspections assigned to this user
-            # Handle ManyToMany field properly
-            inspections = Inspection.objects.filter(
-                assigned_to=user,
-                current_status__in=active_statuses
-            ).prefetch_related('establishments')
-            
-            # Collect unique establishment IDs from the ManyToMany relationship
-            establishment_ids = set()
-            for inspection in inspections:
-                establishment_ids.update(inspection.establishments.values_list('id', flat=True))
-            
-            # Filter establishments
-            queryset = Establishment.objects.filter(id__in=establishment_ids)
+            # Section Chief, Unit Head, Monitoring Personnel: establishments with an
+            # open inspection assigned to this user
+            queryset = assigned_to_user(user)
         
         # Apply search if provided
         search = request.query_params.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(street_building__icontains=search) |
-                Q(barangay__icontains=search) |
-                Q(city__icontains=search) |
-                Q(province__icontains=search) |
-                Q(nature_of_business__icontains=search)
-            )
+            queryset = queryset.filter(search_filter(search))
         
+        # Cursor mode (?pagination=cursor): keyset pages, no OFFSET or count
+        if self.use_cursor_pagination():
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         # Calculate pagination
         total_count = queryset.count()
         start_index = (page - 1) * page_size
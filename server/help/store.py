@@ -0,0 +1,157 @@
+"""
+In-process cache of the help content files.
+
+Help topics and categories live in JSON files under MEDIA_ROOT/help and
+change only when an admin saves them, yet were re-read and re-parsed on
+every request. HelpStore keeps each file's parsed content, an ETag (hash of
+the raw bytes) and, for topics, a search index, and reuses them until the
+file's (mtime, size) signature changes. Writes through help.utils call
+invalidate() so this process sees its own saves immediately; other workers
+pick them up on their next stat().
+
+The topic index maps every word of a topic's title, description and tags to
+the topics containing it. search() matches each query word as a prefix of
+an indexed word (bisect over the sorted vocabulary), requires all words, and
+ranks title hits first.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+WORD_RE = re.compile(r'\w+')
+
+
+def words(text):
+    return WORD_RE.findall(str(text or '').lower())
+
+
+class TopicIndex:
+    """Word-prefix index over topic titles, descriptions and tags"""
+
+    def __init__(self, topics):
+        self.topics = [topic for topic in topics if isinstance(topic, dict)] if isinstance(topics, list) else []
+        postings = defaultdict(set)
+        self.title_words = []
+        for position, topic in enumerate(self.topics):
+            title = set(words(topic.get('title')))
+            self.title_words.append(title)
+            tags = topic.get('tags') if isinstance(topic.get('tags'), list) else []
+            for word in title.union(words(topic.get('description')), *(words(tag) for tag in tags)):
+                postings[word].add(position)
+        self.postings = dict(postings)
+        self.vocabulary = sorted(self.postings)
+
+    def _matching(self, prefix):
+        """Positions of topics with a word starting with `prefix`"""
+        matches = set()
+        start = bisect_left(self.vocabulary, prefix)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            matches |= self.postings[word]
+        return matches
+
+    def search(self, query, category=None):
+        """Topics matching every word of `query` (title matches first), optionally in one category"""
+        query_words = words(query)
+        if not query_words:
+            positions = set(range(len(self.title_words)))
+        else:
+            positions = self._matching(query_words[0])
+            for word in query_words[1:]:
+                if not positions:
+                    break
+                positions &= self._matching(word)
+
+        def rank(position):
+            title = self.title_words[position]
+            title_hits = sum(1 for word in query_words if any(t.startswith(word) for t in title))
+            return (-title_hits, position)
+
+        results = []
+        for position in sorted(positions, key=rank):
+            topic = self.topics[position]
+            if category and topic.get('category') != category:
+                continue
+            results.append(topic)
+        return results
+
+
+class _Entry:
+    __slots__ = ('signature', 'data', 'etag', 'index')
+
+    def __init__(self, signature, data, etag):
+        self.signature = signature
+        self.data = data
+        self.etag = etag
+        self.index = None
+
+
+class HelpStore:
+    """Parsed JSON files cached by (mtime, size); callers must not mutate the returned data"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _entry(self, path):
+        signature = self._signature(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry.signature == signature:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                return entry
+            # Keyed by the signature seen before reading, so a write racing the
+            # read shows up as a changed signature on the next call
+            if signature is None:
+                raw, data = b'[]', []
+            else:
+                try:
+                    with open(path, 'rb') as f:
+                        raw = f.read()
+                    data = json.loads(raw.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
+                    raise ValueError(f"Error reading {os.path.basename(path)}: {str(e)}")
+            entry = _Entry(signature, data, f'"{hashlib.md5(raw).hexdigest()}"')
+            self._entries[path] = entry
+            return entry
+
+    def load(self, path):
+        """(data, etag) of a JSON file ([] when the file does not exist)"""
+        entry = self._entry(path)
+        return entry.data, entry.etag
+
+    def etag(self, path):
+        return self._entry(path).etag
+
+    def search(self, path, query, category=None):
+        """(matching topics, etag) of a topics file, using its cached index"""
+        entry = self._entry(path)
+        if entry.index is None:
+            entry.index = TopicIndex(entry.data)
+        return entry.index.search(query, category), entry.etag
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+
+help_store = HelpStore()
@@ -0,0 +1,19 @@
+"""
+Celery tasks for help app
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def shrink_help_image(path):
+    """Downscale a newly uploaded help image and strip its EXIF data in place."""
+    from core.image_pipeline import shrink_image_in_place
+
+    try:
+        return shrink_image_in_place(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not optimize help image {path}: {str(e)}")
+        return False
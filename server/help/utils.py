@@ -1,15 +1,21 @@
 """
 Utility functions for help content management.
+
+Reads go through the in-process help_store (see store.py), so the JSON files
+are only parsed again after they change.
 """
+import copy
 import json
 import os
 import zipfile
-import tempfile
-import shutil
 from datetime import datetime
 from django.conf import settings
 from pathlib import Path
 
+from core.archives import copy_member, stream_zip
+
+from .store import help_store
+
 
 # Help directory configuration
 HELP_DATA_DIR = os.path.join(settings.MEDIA_ROOT, 'help')
@@ -23,25 +29,22 @@ os.makedirs(HELP_BACKUPS_DIR, exist_ok=True)
 
 
 def get_help_topics():
-    """Read help topics from JSON file."""
-    try:
-        if os.path.exists(HELP_TOPICS_FILE):
-            with open(HELP_TOPICS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    except (json.JSONDecodeError, IOError) as e:
-        raise ValueError(f"Error reading help topics: {str(e)}")
+    """Read help topics (a copy of the cached file contents, safe to modify)."""
+    return copy.deepcopy(help_store.load(HELP_TOPICS_FILE)[0])
 
 
 def get_help_categories():
-    """Read help categories from JSON file."""
-    try:
-        if os.path.exists(HELP_CATEGORIES_FILE):
-            with open(HELP_CATEGORIES_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    except (json.JSONDecodeError, IOError) as e:
-        raise ValueError(f"Error reading help categories: {str(e)}")
+    """Read help categories (a copy of the cached file contents, safe to modify)."""
+    return copy.deepcopy(help_store.load(HELP_CATEGORIES_FILE)[0])
+
+
+def _write_json(path, data):
+    """Atomically replace a help JSON file, so readers never see a partial write."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+    help_store.invalidate(path)
 
 
 def rename_help_images(topics):
@@ -238,12 +241,10 @@ def save_help_topics(topics):
                 raise ValueError(f"Topic missing required field: {field}")
     
     # Load old topics to compare images
-    old_topics = []
     old_image_files = set()
     if os.path.exists(HELP_TOPICS_FILE):
         try:
-            old_topics = get_help_topics()
-            old_image_files = _extract_image_filenames_from_topics(old_topics)
+            old_image_files = _extract_image_filenames_from_topics(help_store.load(HELP_TOPICS_FILE)[0])
         except Exception as e:
             print(f"Warning: Could not load old topics for image comparison: {e}")
     
@@ -279,8 +280,7 @@ def save_help_topics(topics):
     
     # Save new data
     try:
-        with open(HELP_TOPICS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(topics, f, indent=2, ensure_ascii=False)
+        _write_json(HELP_TOPICS_FILE, topics)
         return True
     except IOError as e:
         raise ValueError(f"Error saving help topics: {str(e)}")
@@ -319,8 +319,7 @@ def save_help_categories(categories):
     
     # Save new data
     try:
-        with open(HELP_CATEGORIES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(categories, f, indent=2, ensure_ascii=False)
+        _write_json(HELP_CATEGORIES_FILE, categories)
         return True
     except IOError as e:
         raise ValueError(f"Error saving help categories: {str(e)}")
@@ -379,10 +378,12 @@ def export_help_data(include_images=True):
     """Export all help data as a single JSON object or ZIP archive with images.
     
     Args:
-        include_images: If True, returns ZIP bytes with JSON and images. If False, returns dict.
+        include_images: If True, returns a streamed ZIP with JSON and images. If False, returns dict.
     
     Returns:
-        If include_images=True: (zip_bytes, filename)
+        If include_images=True: (zip_chunks, filename, stats) where zip_chunks is
+        a generator of ZIP bytes (see core.archives.stream_zip) and stats holds
+        the topic, category and image counts
         If include_images=False: dict with topics, categories, exported_at
     """
     topics = get_help_topics()
@@ -396,45 +397,22 @@ def export_help_data(include_images=True):
     if not include_images:
         return data
     
-    # Create ZIP archive with images
+    # Referenced images that exist, added to the images/ folder in the ZIP
     help_images_dir = os.path.join(settings.MEDIA_ROOT, 'help', 'images')
-    
-    # Create temporary ZIP file
-    temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-    temp_zip_path = temp_zip.name
-    temp_zip.close()
-    
-    try:
-        with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add JSON data
-            json_str = json.dumps(data, indent=2, ensure_ascii=False)
-            zipf.writestr('help_data.json', json_str.encode('utf-8'))
-            
-            # Extract and add all referenced images
-            image_files = _extract_image_filenames_from_topics(topics)
-            images_added = 0
-            
-            for filename in image_files:
-                image_path = os.path.join(help_images_dir, filename)
-                if os.path.exists(image_path):
-                    # Add to images/ folder in ZIP
-                    zipf.write(image_path, f'images/{filename}')
-                    images_added += 1
-            
-            print(f"Exported {len(topics)} topics, {len(categories)} categories, and {images_added} images")
-        
-        # Read ZIP file as bytes
-        with open(temp_zip_path, 'rb') as f:
-            zip_bytes = f.read()
-        
-        # Generate filename
-        zip_filename = f"help_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-        
-        return zip_bytes, zip_filename
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_zip_path):
-            os.remove(temp_zip_path)
+    image_paths = []
+    for filename in sorted(_extract_image_filenames_from_topics(topics)):
+        image_path = os.path.join(help_images_dir, filename)
+        if os.path.isfile(image_path):
+            image_paths.append((f'images/{filename}', image_path))
+    
+    members = [('help_data.json', json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))] + image_paths
+    stats = {
+        'topics_count': len(topics),
+        'categories_count': len(categories),
+        'images_count': len(image_paths),
+    }
+    zip_filename = f"help_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return stream_zip(members), zip_filename, stats
 
 
 def import_help_data(data, zip_file_path=None):
@@ -451,49 +429,38 @@ def import_help_data(data, zip_file_path=None):
     categories = []
     images_imported = 0
     
-    # If ZIP file provided, extract it
+    # If ZIP file provided, read it member by member
     if zip_file_path and os.path.exists(zip_file_path):
         help_images_dir = os.path.join(settings.MEDIA_ROOT, 'help', 'images')
         os.makedirs(help_images_dir, exist_ok=True)
         
-        temp_extract_dir = tempfile.mkdtemp()
-        
         try:
             with zipfile.ZipFile(zip_file_path, 'r') as zipf:
-                # Extract all files
-                zipf.extractall(temp_extract_dir)
-                
                 # Read JSON data
-                json_path = os.path.join(temp_extract_dir, 'help_data.json')
-                if not os.path.exists(json_path):
+                try:
+                    with zipf.open('help_data.json') as f:
+                        data = json.load(f)
+                except KeyError:
                     raise ValueError("ZIP file missing help_data.json")
                 
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
                 topics = data.get('topics', [])
                 categories = data.get('categories', [])
                 
-                # Extract and copy images
-                images_dir_in_zip = os.path.join(temp_extract_dir, 'images')
-                if os.path.exists(images_dir_in_zip):
-                    for filename in os.listdir(images_dir_in_zip):
-                        src_path = os.path.join(images_dir_in_zip, filename)
-                        if os.path.isfile(src_path):
-                            # Check if image already exists (skip if same)
-                            dst_path = os.path.join(help_images_dir, filename)
-                            if not os.path.exists(dst_path):
-                                shutil.copy2(src_path, dst_path)
-                                images_imported += 1
-                            else:
-                                # File exists, check if different
-                                if os.path.getsize(src_path) != os.path.getsize(dst_path):
-                                    shutil.copy2(src_path, dst_path)
-                                    images_imported += 1
-        finally:
-            # Clean up temporary directory
-            if os.path.exists(temp_extract_dir):
-                shutil.rmtree(temp_extract_dir)
+                # Copy images one at a time, skipping ones that are already present
+                for info in zipf.infolist():
+                    if info.is_dir() or not info.filename.startswith('images/'):
+                        continue
+                    # Only the base name is used, so members cannot escape the images folder
+                    filename = os.path.basename(info.filename)
+                    if not filename:
+                        continue
+                    dst_path = os.path.join(help_images_dir, filename)
+                    if os.path.exists(dst_path) and os.path.getsize(dst_path) == info.file_size:
+                        continue
+                    copy_member(zipf, info, dst_path)
+                    images_imported += 1
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Invalid ZIP file: {str(e)}")
     else:
         # Import from JSON dict
         if not isinstance(data, dict):
@@ -5,13 +5,19 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse, FileResponse
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from system_config.permissions import IsSystemAdmin
 from audit.utils import log_activity
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
+from core.archives import upload_path
+from core.background import dispatch_on_commit
+from .store import help_store
+from .tasks import shrink_help_image
 from .utils import (
     get_help_topics,
     get_help_categories,
@@ -27,13 +33,33 @@ import os
 import uuid
 
 
+def _conditional_response(request, data, etag):
+    """200 with an ETag, or 304 when the client's If-None-Match already has it."""
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    # Let browsers keep the content but revalidate it on every use
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_topics(request):
-    """Get all help topics."""
+    """
+    Get all help topics, or with ?q= (and optionally ?category=) the topics
+    whose title, description or tags match every word, best title matches first.
+    """
     try:
-        topics = get_help_topics()
-        return Response(topics, status=status.HTTP_200_OK)
+        query = request.query_params.get('q', '').strip()
+        category = request.query_params.get('category', '').strip()
+        if query or category:
+            topics, etag = help_store.search(HELP_TOPICS_FILE, query, category or None)
+        else:
+            topics, etag = help_store.load(HELP_TOPICS_FILE)
+        return _conditional_response(request, topics, etag)
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -46,8 +72,8 @@ def get_topics(request):
 def get_categories(request):
     """Get all help categories."""
     try:
-        categories = get_help_categories()
-        return Response(categories, status=status.HTTP_200_OK)
+        categories, etag = help_store.load(HELP_CATEGORIES_FILE)
+        return _conditional_response(request, categories, etag)
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -335,12 +361,8 @@ def export_backup(request):
             
             return Response(data, status=status.HTTP_200_OK)
         else:
-            # Return ZIP with images
-            zip_bytes, zip_filename = export_help_data(include_images=True)
-            
-            # Get topic and category counts for logging
-            topics = get_help_topics()
-            categories = get_help_categories()
+            # Return ZIP with images, streamed as it is built
+            zip_chunks, zip_filename, stats = export_help_data(include_images=True)
             
             # Log export
             log_activity(
@@ -352,15 +374,15 @@ def export_backup(request):
                 metadata={
                     "format": "zip",
                     "filename": zip_filename,
-                    "topics_count": len(topics),
-                    "categories_count": len(categories),
+                    "topics_count": stats['topics_count'],
+                    "categories_count": stats['categories_count'],
+                    "images_count": stats['images_count'],
                     "status": "success"
                 },
                 request=request
             )
             
-            from django.http import HttpResponse
-            response = HttpResponse(zip_bytes, content_type='application/zip')
+            response = StreamingHttpResponse(zip_chunks, content_type='application/zip')
             response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
             return response
     except Exception as e:
@@ -384,8 +406,6 @@ def export_backup(request):
 def restore_backup(request):
     """Import help data from JSON or ZIP archive (admin only)."""
     try:
-        import tempfile
-        
         # Check if ZIP file was uploaded
         if 'file' in request.FILES:
             zip_file = request.FILES['file']
@@ -397,48 +417,38 @@ def restore_backup(request):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Save uploaded file temporarily
-            temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-            for chunk in zip_file.chunks():
-                temp_zip.write(chunk)
-            temp_zip.close()
+            # Import from ZIP (large uploads are already spooled to disk by Django)
+            with upload_path(zip_file, suffix='.zip') as zip_path:
+                result = import_help_data(None, zip_file_path=zip_path)
             
-            try:
-                # Import from ZIP
-                result = import_help_data(None, zip_file_path=temp_zip.name)
-                
-                # Log import
-                log_activity(
-                    user=request.user,
-                    action=AUDIT_ACTIONS["IMPORT"],
-                    module=AUDIT_MODULES["HELP"],
-                    description="Imported help data from ZIP archive",
-                    message=f"Imported help data from ZIP file: {zip_file.name}",
-                    metadata={
-                        "format": "zip",
-                        "filename": zip_file.name,
-                        "topics_imported": result.get('topics_imported', 0),
-                        "categories_imported": result.get('categories_imported', 0),
-                        "images_imported": result.get('images_imported', 0),
-                        "status": "success"
-                    },
-                    request=request
-                )
-                
-                return Response(
-                    {
-                        'success': True,
-                        'message': 'Help data restored successfully',
-                        'topics_imported': result['topics_imported'],
-                        'categories_imported': result['categories_imported'],
-                        'images_imported': result['images_imported']
-                    },
-                    status=status.HTTP_200_OK
-                )
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_zip.name):
-                    os.remove(temp_zip.name)
+            # Log import
+            log_activity(
+                user=request.user,
+                action=AUDIT_ACTIONS["IMPORT"],
+                module=AUDIT_MODULES["HELP"],
+                description="Imported help data from ZIP archive",
+                message=f"Imported help data from ZIP file: {zip_file.name}",
+                metadata={
+                    "format": "zip",
+                    "filename": zip_file.name,
+                    "topics_imported": result.get('topics_imported', 0),
+                    "categories_imported": result.get('categories_imported', 0),
+                    "images_imported": result.get('images_imported', 0),
+                    "status": "success"
+                },
+                request=request
+            )
+            
+            return Response(
+                {
+                    'success': True,
+                    'message': 'Help data restored successfully',
+                    'topics_imported': result['topics_imported'],
+                    'categories_imported': result['categories_imported'],
+                    'images_imported': result['images_imported']
+                },
+                status=status.HTTP_200_OK
+            )
         else:
             # Import from JSON (backward compatibility)
             data = request.data
@@ -578,6 +588,10 @@ def upload_help_image(request):
             for chunk in file.chunks():
                 destination.write(chunk)
         
+        # Downscale and strip EXIF in the background (name and format are kept)
+        if file.content_type != 'image/gif':
+            dispatch_on_commit(shrink_help_image, file_path)
+        
         # Return URL
         image_url = f"{settings.MEDIA_URL}help/images/{filename}"
         
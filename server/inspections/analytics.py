@@ -0,0 +1,80 @@
+"""
+Grouped dashboard analytics.
+
+Dashboard widgets used to run one role-filtered query plus one aggregate per
+law. The helpers here apply the role scope once and let the database group
+by law, and cache the result per (role scope, period) in the shared cache
+for ANALYTICS_CACHE_SECONDS.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import InspectionForm
+from .roster import COMBINED_SECTION, COMBINED_SECTION_LAWS
+
+
+def role_scope(user, prefix=''):
+    """
+    (Q, cache scope) limiting inspections to what `user` may see.
+
+    `prefix` is prepended to the field names (e.g. 'inspection__' to filter
+    InspectionForm). The cache scope names everyone who sees the same rows.
+    """
+    def q(**lookups):
+        return Q(**{f'{prefix}{field}': value for field, value in lookups.items()})
+
+    level = user.userlevel
+    if level == 'Admin':
+        return Q(), 'admin'
+    if level == 'Division Chief':
+        # Inspections they created or that await division review
+        return q(created_by=user) | q(current_status='DIVISION_REVIEWED'), f'division:{user.pk}'
+    if level in ['Section Chief', 'Unit Head']:
+        # Inspections assigned to them or under their section's law(s)
+        laws = list(COMBINED_SECTION_LAWS) if user.section == COMBINED_SECTION else [user.section]
+        return q(assigned_to=user) | q(law__in=laws), f'section:{user.pk}:{user.section}'
+    if level == 'Legal Unit':
+        return q(current_status__in=['LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT']), 'legal'
+    # Monitoring Personnel and anyone else: only what is assigned to them
+    return q(assigned_to=user), f'user:{user.pk}'
+
+
+def _cache_key(name, scope, *parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'analytics:{name}:{scope}:{digest}'
+
+
+def compliance_by_law(user, laws, start, end):
+    """
+    {law: {'pending', 'compliant', 'non_compliant'}} for forms created in
+    [start, end], from one grouped query (cached).
+    """
+    scope_q, scope = role_scope(user, prefix='inspection__')
+    key = _cache_key('compliance_by_law', scope, sorted(laws), start.isoformat(), end.isoformat())
+    stats = cache.get(key)
+    if stats is None:
+        rows = (
+            InspectionForm.objects.filter(scope_q, inspection__law__in=laws, created_at__range=[start, end])
+            .order_by()
+            .values('inspection__law')
+            .annotate(
+                pending=Count('inspection_id', filter=Q(compliance_decision='PENDING')),
+                compliant=Count('inspection_id', filter=Q(compliance_decision='COMPLIANT')),
+                non_compliant=Count(
+                    'inspection_id', filter=Q(compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT'])
+                ),
+            )
+        )
+        stats = {
+            row['inspection__law']: {
+                'pending': row['pending'],
+                'compliant': row['compliant'],
+                'non_compliant': row['non_compliant'],
+            }
+            for row in rows
+        }
+        cache.set(key, stats, settings.ANALYTICS_CACHE_SECONDS)
+    return stats
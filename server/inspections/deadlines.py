@@ -0,0 +1,367 @@
+"""
+Batched deadline sweeps.
+
+The daily reminder jobs used to walk every open case in Python, running a
+duplicate-notification check, an establishments.first() lookup and a
+notification INSERT/e-mail per row. Each sweep here instead:
+
+1. reads every due item with one query, with the NOV deadline and the first
+   establishment's name joined in,
+2. loads the ids already notified today into a set (one query),
+3. creates all notifications with one bulk_create, and
+4. queues all e-mails as one batch sent over a single SMTP connection after
+   the transaction commits.
+
+Sweeps return the items they processed; dry runs return them without
+notifying anyone.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from core.background import submit
+from establishments.models import Establishment
+from notifications.models import Notification
+from notifications.services import (
+    active_users, build_email, build_notifications, send_email_batch, send_notifications,
+)
+
+from .models import Inspection, NoticeOfViolation
+from .reinspection import mark_reminded, pending_reminders
+from .utils import build_notice_email
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_FORMAT = '%B %d, %Y at %I:%M %p'
+
+
+def first_establishment_name(inspection_ref='pk'):
+    """Subquery for the name of an inspection's first establishment (as establishments.first())"""
+    return Subquery(
+        Establishment.objects.filter(inspections_new=OuterRef(inspection_ref)).order_by('-created_at').values('name')[:1]
+    )
+
+
+def notified_today(notification_type, related_object_type, object_ids, today=None):
+    """Ids of objects that already got a `notification_type` notification today (one query)"""
+    if not object_ids:
+        return set()
+    today = today or timezone.localdate()
+    return set(
+        Notification.objects.filter(
+            notification_type=notification_type,
+            related_object_type=related_object_type,
+            related_object_id__in=list(object_ids),
+            created_at__date=today,
+        ).values_list('related_object_id', flat=True).distinct()
+    )
+
+
+# Expired NOV compliance deadlines -> Legal Unit -----------------------------
+
+def expired_compliance(now=None):
+    """NOV_SENT/NOO_SENT inspections whose NOV compliance deadline has passed (one query)"""
+    now = now or timezone.now()
+    return (
+        Inspection.objects.filter(
+            current_status__in=['NOV_SENT', 'NOO_SENT'],
+            form__nov__compliance_deadline__lt=now,
+        )
+        .annotate(
+            compliance_deadline=F('form__nov__compliance_deadline'),
+            nov_violations=F('form__nov__violations'),
+            nov_compliance_instructions=F('form__nov__compliance_instructions'),
+            violations_found=F('form__violations_found'),
+            establishment_name=first_establishment_name(),
+        )
+        .order_by('form__nov__compliance_deadline')
+    )
+
+
+def _expired_email_body(inspection, days_overdue):
+    return f"""
+Compliance Deadline Expired
+
+Inspection Details:
+- Inspection Code: {inspection.code}
+- Establishment: {inspection.establishment_name or 'N/A'}
+- Current Status: {inspection.get_current_status_display()}
+- Original Deadline: {inspection.compliance_deadline.strftime(DEADLINE_FORMAT)}
+- Days Overdue: {days_overdue}
+
+Violations:
+{inspection.nov_violations or inspection.violations_found or 'No violations listed'}
+
+Compliance Instructions:
+{inspection.nov_compliance_instructions or 'No instructions listed'}
+
+Suggested Actions:
+1. Review inspection status
+2. Send Notice of Order (NOO) with penalties if not already sent
+3. Escalate to higher authority if necessary
+4. Mark as non-compliant and close if appropriate
+
+View this inspection at:
+{getattr(settings, 'FRONTEND_URL', None) or 'http://localhost:5173'}/inspections/{inspection.id}/review
+
+---
+This is an automated notification from the Integrated Establishments Regulatory Management System.
+"""
+
+
+def sweep_compliance_deadlines(now=None, dry_run=False):
+    """
+    Notify the Legal Unit (in-app and by e-mail) of every expired NOV
+    deadline not already reported today.
+
+    Returns:
+        list: (inspection, days_overdue) for each newly reported inspection
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    inspections = list(expired_compliance(now))
+    already = notified_today('COMPLIANCE_EXPIRED', 'inspection', [i.pk for i in inspections], today)
+    due = [
+        (inspection, (today - timezone.localdate(inspection.compliance_deadline)).days)
+        for inspection in inspections
+        if inspection.pk not in already
+    ]
+    if dry_run or not due:
+        return due
+
+    legal_users = list(active_users('Legal Unit'))
+    if not legal_users:
+        logger.warning("No active Legal Unit users to notify of expired compliance deadlines")
+        return []
+
+    notifications, emails = [], []
+    for inspection, days_overdue in due:
+        title = f'Compliance Deadline Expired - {inspection.code}'
+        notifications += build_notifications(
+            legal_users,
+            notification_type='COMPLIANCE_EXPIRED',
+            title=title,
+            message=(
+                f'The compliance deadline for inspection {inspection.code} '
+                f'({inspection.establishment_name or "N/A"}) has expired. '
+                f'Deadline was {inspection.compliance_deadline.strftime(DEADLINE_FORMAT)}. '
+                f'Currently {days_overdue} days overdue.'
+            ),
+            related_object_type='inspection',
+            related_object_id=inspection.id,
+        )
+        body = _expired_email_body(inspection, days_overdue)
+        emails += [build_email(title, body, [user.email]) for user in legal_users if user.email]
+    send_notifications(notifications, emails)
+    return due
+
+
+# NOV compliance reminders -> establishment -----------------------------------
+
+def nov_reminders_due(now=None):
+    """NOVs of NOV_SENT inspections whose deadline is about a day away (23-25 hours, one query)"""
+    now = now or timezone.now()
+    return (
+        NoticeOfViolation.objects.filter(
+            compliance_deadline__gte=now + timedelta(hours=23),
+            compliance_deadline__lte=now + timedelta(hours=25),
+            inspection_form__inspection__current_status='NOV_SENT',
+            recipient_email__isnull=False,
+        )
+        .exclude(recipient_email='')
+        .select_related('inspection_form__inspection')
+        .annotate(establishment_name=first_establishment_name('inspection_form__inspection'))
+    )
+
+
+def _inspection_date(form):
+    general = form.checklist.get('general') if isinstance(form.checklist, dict) else None
+    if general and general.get('inspection_date_time'):
+        from django.utils.dateparse import parse_datetime
+        try:
+            date_obj = parse_datetime(general.get('inspection_date_time'))
+        except (TypeError, ValueError):
+            date_obj = None
+        if date_obj:
+            return date_obj.strftime('%B %d, %Y')
+    return 'N/A'
+
+
+def _nov_reminder_body(inspection, establishment_name, nov):
+    deadline_str = nov.compliance_deadline.strftime(DEADLINE_FORMAT)
+    deadline_date = nov.compliance_deadline.strftime('%B %d, %Y')
+    recipient_name = nov.recipient_name or nov.contact_person or 'Sir/Madam'
+    return f"""
+Dear {recipient_name},
+
+This is a reminder that your compliance deadline for the Notice of Violation (NOV) is approaching.
+
+IMPORTANT: Your compliance deadline is TOMORROW ({deadline_date}).
+
+Inspection Details:
+- Inspection Code: {inspection.code}
+- Establishment: {establishment_name}
+- Compliance Deadline: {deadline_str}
+- Law: {inspection.law}
+
+Violations Found:
+{nov.violations or 'No violations listed'}
+
+Compliance Instructions:
+{nov.compliance_instructions or 'No instructions listed'}
+
+Required Actions:
+Please ensure all required compliance actions are completed and submitted before the deadline to avoid further penalties or legal action.
+
+If you have already completed the compliance requirements, please submit your compliance documents as soon as possible.
+
+If you have any questions or need clarification regarding the compliance requirements, please contact the Legal Unit immediately.
+
+Thank you for your prompt attention to this matter.
+
+Best regards,
+Legal Unit
+Integrated Establishments Regulatory Management System
+
+---
+This is an automated reminder from the Integrated Establishments Regulatory Management System.
+Original NOV was sent on {nov.sent_date.strftime("%B %d, %Y") if nov.sent_date else 'N/A'}.
+"""
+
+
+def sweep_nov_reminders(now=None, dry_run=False):
+    """
+    E-mail establishments whose NOV compliance deadline is tomorrow.
+
+    Returns:
+        list: The NoticeOfViolation rows reminded
+    """
+    novs = list(nov_reminders_due(now))
+    if dry_run or not novs:
+        return novs
+
+    emails = []
+    for nov in novs:
+        form = nov.inspection_form
+        inspection = form.inspection
+        establishment_name = nov.establishment_name or 'N/A'
+        context = {
+            'inspection_code': inspection.code,
+            'inspection_date': _inspection_date(form),
+            'establishment_name': establishment_name,
+            'recipient_name': nov.recipient_name or nov.contact_person or 'Sir/Madam',
+            'contact_person': nov.contact_person or '',
+            'violations': nov.violations or '',
+            'compliance_instructions': nov.compliance_instructions or '',
+            'compliance_deadline': nov.compliance_deadline,
+            'deadline_date': nov.compliance_deadline.strftime('%B %d, %Y'),
+            'deadline_time': nov.compliance_deadline.strftime('%I:%M %p'),
+            'nov_sent_date': nov.sent_date.strftime('%B %d, %Y') if nov.sent_date else None,
+            'is_reminder': True,
+        }
+        try:
+            emails.append(build_notice_email(
+                f"Reminder: Compliance Deadline Tomorrow - {inspection.code}",
+                _nov_reminder_body(inspection, establishment_name, nov),
+                nov.recipient_email,
+                notice_type='NOV_REMINDER',
+                context=context,
+            ))
+        except ValueError as e:
+            logger.error(f"Skipping NOV compliance reminder for {inspection.code}: {str(e)}")
+    if emails:
+        submit(send_email_batch, emails)
+    return novs
+
+
+# Reinspection reminders -> Division Chiefs -----------------------------------
+
+def _reinspection_message(schedule, days_until_due):
+    compliance_text = "Compliant" if schedule.compliance_status == 'COMPLIANT' else "Non-Compliant"
+    if days_until_due == 0:
+        urgency = "TODAY"
+    elif days_until_due <= 7:
+        urgency = "URGENT"
+    elif days_until_due <= 30:
+        urgency = "SOON"
+    else:
+        urgency = "UPCOMING"
+    return f"""
+{urgency}: Reinspection due for {schedule.establishment.name}
+
+Establishment: {schedule.establishment.name}
+Original Inspection: {schedule.original_inspection.code}
+Compliance Status: {compliance_text}
+Due Date: {schedule.due_date}
+Days Until Due: {days_until_due}
+
+Please schedule the reinspection accordingly.
+    """.strip()
+
+
+def _reinspection_email_body(chief, schedule, days_until_due):
+    compliance_text = "Compliant" if schedule.compliance_status == 'COMPLIANT' else "Non-Compliant"
+    establishment = schedule.establishment
+    full_address = ', '.join(filter(None, [
+        establishment.street_building, establishment.barangay, establishment.city, establishment.province,
+    ]))
+    return f"""
+Dear {chief.first_name or chief.email},
+
+This is a reminder that a reinspection is due for the following establishment:
+
+Establishment: {establishment.name}
+Address: {full_address}
+Original Inspection Code: {schedule.original_inspection.code}
+Compliance Status: {compliance_text}
+Due Date: {schedule.due_date}
+Days Until Due: {days_until_due}
+
+Please schedule the reinspection accordingly.
+
+Best regards,
+Environmental Management System
+    """.strip()
+
+
+def sweep_reinspection_reminders(days_ahead=30, today=None, dry_run=False):
+    """
+    Remind Division Chiefs of pending reinspections due within `days_ahead`
+    days and flag the schedules as reminded.
+
+    Returns:
+        list: (schedule, days_until_due) for each reminded schedule
+    """
+    today = today or timezone.localdate()
+    schedules = list(pending_reminders(days_ahead, today))
+    already = notified_today('reinspection_reminder', 'reinspection_schedule', [s.pk for s in schedules], today)
+    due = [(schedule, (schedule.due_date - today).days) for schedule in schedules if schedule.pk not in already]
+    if dry_run or not due:
+        return due
+
+    chiefs = list(active_users('Division Chief'))
+    if not chiefs:
+        logger.warning("No active Division Chiefs to remind of upcoming reinspections")
+        return []
+
+    notifications, emails = [], []
+    for schedule, days_until_due in due:
+        title = f'Reinspection Reminder - {schedule.establishment.name}'
+        notifications += build_notifications(
+            chiefs,
+            notification_type='reinspection_reminder',
+            title=title,
+            message=_reinspection_message(schedule, days_until_due),
+            related_object_type='reinspection_schedule',
+            related_object_id=schedule.id,
+        )
+        emails += [
+            build_email(title, _reinspection_email_body(chief, schedule, days_until_due), [chief.email])
+            for chief in chiefs if chief.email
+        ]
+    send_notifications(notifications, emails)
+    mark_reminded([schedule.pk for schedule, _ in due])
+    return due
@@ -0,0 +1,313 @@
+"""
+Write-behind buffer for high-frequency, low-value inspection events.
+
+Auto-save markers and plain draft saves used to write an InspectionHistory row
+and an ActivityLog row (after a "last history" lookup) on every request.
+They are now recorded in the shared cache, coalesced per inspection, user and
+event kind, and flushed to the database with bulk_create every
+INSPECTION_EVENT_FLUSH_SECONDS by a Celery beat task. The web process also
+flushes opportunistically, so events are not stranded when beat is not running.
+
+Buffering needs a cache shared with Celery (REDIS_CACHE_URL). Without one,
+each process writes at most one event per inspection, user and kind every
+INSPECTION_EVENT_FLUSH_SECONDS, from the background pool. Events that cannot
+be buffered because a lock is busy are also written from the background pool.
+A failed flush puts its events back into the buffer for the next run.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
+from audit.models import ActivityLog
+from audit.utils import build_activity_log, get_client_ip
+from core.background import submit
+from core.cache_utils import cache_lock, shared_cache
+
+from .models import Inspection, InspectionHistory
+
+logger = logging.getLogger(__name__)
+
+# What each buffered event kind turns into when flushed
+EVENT_KINDS = {
+    'auto_save': {
+        'history_remarks': 'Auto-saved inspection form',
+        'action': AUDIT_ACTIONS["UPDATE"],
+        'description': '{actor} auto-saved inspection form',
+        'metadata': {'auto_save': True, 'remarks': 'Auto-saved inspection form'},
+    },
+    'draft_save': {
+        'history_remarks': 'Saved inspection form as draft',
+        'action': AUDIT_ACTIONS["UPDATE"],
+        'description': '{actor} saved inspection draft',
+        'metadata': {'draft': True, 'remarks': 'Saved inspection form as draft'},
+    },
+}
+
+PENDING_KEY = 'inspection_events:pending'
+LAST_FLUSH_KEY = 'inspection_events:last_flush'
+EVENTS_TTL = 24 * 60 * 60
+
+# Without a shared cache: when this process last wrote each (inspection, user, kind)
+_last_written = {}
+_last_written_lock = threading.Lock()
+
+
+def _events_key(inspection_id):
+    return f'inspection_events:{inspection_id}'
+
+
+def record_inspection_event(inspection, user, kind, request=None):
+    """
+    Buffer an event instead of writing it synchronously.
+
+    Repeated events of the same kind by the same user on the same inspection
+    are coalesced into one entry carrying a count and first/last timestamps.
+    """
+    if kind not in EVENT_KINDS:
+        raise ValueError(f"Unknown inspection event kind: {kind}")
+
+    now = timezone.now().isoformat()
+    key = _events_key(inspection.id)
+    slot = f'{kind}:{user.id}'
+    event = {
+        'kind': kind,
+        'user_id': user.id,
+        'current_status': inspection.current_status,
+        'count': 1,
+        'first_at': now,
+        'last_at': now,
+        'ip_address': get_client_ip(request) if request else None,
+        'user_agent': request.META.get('HTTP_USER_AGENT', '') if request else '',
+        'path': request.path if request else None,
+        'method': request.method if request else None,
+    }
+
+    if not shared_cache():
+        # A process-local buffer is invisible to the flush task
+        if _due_locally((inspection.id, user.id, kind)):
+            submit(write_inspection_events, {inspection.id: {slot: event}})
+        return
+
+    with cache_lock(key) as acquired:
+        if not acquired:
+            submit(write_inspection_events, {inspection.id: {slot: event}})
+            return
+        events = cache.get(key) or {}
+        _merge_event(events, slot, event)
+        cache.set(key, events, EVENTS_TTL)
+
+    if not _mark_pending([inspection.id]):
+        # Unregistered events would never be drained; write this inspection's buffer now
+        events = _take(inspection.id)
+        if events:
+            submit(write_inspection_events, {inspection.id: events})
+        return
+
+    _maybe_schedule_flush()
+
+
+def _due_locally(event_key):
+    """Whether this process has not written `event_key` within the flush interval (and claim it)"""
+    now = time.monotonic()
+    interval = settings.INSPECTION_EVENT_FLUSH_SECONDS
+    with _last_written_lock:
+        last = _last_written.get(event_key)
+        if last is not None and now - last < interval:
+            return False
+        if len(_last_written) > 10000:
+            # Drop entries that can no longer suppress a write
+            for stale in [k for k, t in _last_written.items() if now - t >= interval]:
+                del _last_written[stale]
+        _last_written[event_key] = now
+    return True
+
+
+def _merge_event(events, slot, event):
+    """Coalesce `event` into the `events` dict of one inspection"""
+    existing = events.get(slot)
+    if existing is None:
+        events[slot] = event
+        return
+    existing['count'] += event['count']
+    existing['first_at'] = min(existing['first_at'], event['first_at'])
+    if event['last_at'] >= existing['last_at']:
+        existing['last_at'] = event['last_at']
+        existing['current_status'] = event['current_status']
+
+
+def _mark_pending(inspection_ids):
+    """Register inspections with buffered events; False if the pending set could not be locked"""
+    pending = cache.get(PENDING_KEY) or set()
+    if pending.issuperset(inspection_ids):
+        return True
+    with cache_lock(PENDING_KEY, wait=2) as acquired:
+        if not acquired:
+            return False
+        pending = cache.get(PENDING_KEY) or set()
+        pending.update(inspection_ids)
+        cache.set(PENDING_KEY, pending, EVENTS_TTL)
+    return True
+
+
+def _take(inspection_id):
+    """Remove and return one inspection's buffered events (None if its lock is busy)"""
+    key = _events_key(inspection_id)
+    with cache_lock(key, wait=2) as acquired:
+        if not acquired:
+            return None
+        events = cache.get(key)
+        cache.delete(key)
+    return events
+
+
+def _maybe_schedule_flush():
+    """Flush in-process if the periodic task has not run for two intervals"""
+    interval = settings.INSPECTION_EVENT_FLUSH_SECONDS
+    last_flush = cache.get(LAST_FLUSH_KEY)
+    if last_flush is None:
+        cache.add(LAST_FLUSH_KEY, time.time(), None)
+        return
+    if time.time() - last_flush < interval * 2:
+        return
+    # Only one worker schedules the catch-up flush
+    if cache.add('inspection_events:flush_scheduled', 1, interval):
+        submit(flush_inspection_events)
+
+
+def _drain():
+    """Take every buffered event out of the cache"""
+    with cache_lock(PENDING_KEY) as acquired:
+        if not acquired:
+            # Another flush is draining; the next run picks up what remains
+            return {}
+        pending = cache.get(PENDING_KEY) or set()
+        cache.delete(PENDING_KEY)
+
+    batches = {}
+    busy = []
+    for inspection_id in pending:
+        key = _events_key(inspection_id)
+        with cache_lock(key) as acquired:
+            if not acquired:
+                busy.append(inspection_id)
+                continue
+            events = cache.get(key)
+            cache.delete(key)
+        if events:
+            batches[inspection_id] = events
+    if busy and not _mark_pending(busy):
+        logger.error(f"Could not re-register {len(busy)} inspection(s) with buffered events")
+    return batches
+
+
+def _rebuffer(batches):
+    """Put events whose flush failed back into the buffer"""
+    for inspection_id, failed in batches.items():
+        key = _events_key(inspection_id)
+        with cache_lock(key, wait=2) as acquired:
+            if not acquired:
+                logger.error(f"Dropped {len(failed)} buffered event(s) of inspection {inspection_id}")
+                continue
+            events = cache.get(key) or {}
+            for slot, event in failed.items():
+                _merge_event(events, slot, event)
+            cache.set(key, events, EVENTS_TTL)
+    if not _mark_pending(list(batches)):
+        logger.error(f"Could not re-register {len(batches)} inspection(s) with buffered events")
+
+
+def flush_inspection_events():
+    """
+    Drain the buffer and write it; the events are re-buffered if the write fails.
+
+    Returns:
+        int: Number of coalesced events written
+    """
+    cache.set(LAST_FLUSH_KEY, time.time(), None)
+    batches = _drain()
+    if not batches:
+        return 0
+    try:
+        return write_inspection_events(batches)
+    except Exception:
+        _rebuffer(batches)
+        raise
+
+
+def write_inspection_events(batches):
+    """
+    Write coalesced events ({inspection_id: {slot: event}}) with one bulk_create per table.
+
+    Returns:
+        int: Number of coalesced events written
+    """
+    User = get_user_model()
+    inspections = Inspection.objects.select_related('assigned_to').in_bulk(list(batches.keys()))
+    user_ids = {event['user_id'] for events in batches.values() for event in events.values()}
+    users = User.objects.in_bulk(list(user_ids))
+
+    history_entries = []
+    log_entries = []
+    written = 0
+    for inspection_id, events in batches.items():
+        inspection = inspections.get(inspection_id)
+        if not inspection:
+            continue
+        for event in events.values():
+            config = EVENT_KINDS.get(event['kind'])
+            user = users.get(event['user_id'])
+            if not config:
+                continue
+            written += 1
+
+            history_entries.append(InspectionHistory(
+                inspection=inspection,
+                previous_status=event['current_status'],
+                new_status=event['current_status'],
+                changed_by=user,
+                remarks=config['history_remarks'],
+            ))
+
+            actor = getattr(user, 'email', None) or 'System'
+            metadata = {
+                "entity_id": inspection.id,
+                "entity_name": f"Inspection #{inspection.id}",
+                "status": "success",
+                "current_status": event['current_status'],
+                "assigned_to": getattr(inspection.assigned_to, "email", None),
+                "event_count": event['count'],
+                "first_at": event['first_at'],
+                "last_at": event['last_at'],
+                **config['metadata'],
+            }
+            if event.get('path'):
+                metadata["path"] = event['path']
+                metadata["method"] = event['method']
+
+            entry = build_activity_log(
+                user,
+                config['action'],
+                module=AUDIT_MODULES["INSPECTIONS"],
+                description=config['description'].format(actor=actor),
+                metadata=metadata,
+            )
+            entry.ip_address = event.get('ip_address')
+            entry.user_agent = event.get('user_agent') or ''
+            log_entries.append(entry)
+
+    try:
+        with transaction.atomic():
+            InspectionHistory.objects.bulk_create(history_entries)
+            ActivityLog.objects.bulk_create(log_entries)
+    except Exception as e:
+        logger.error(f"Failed to flush {written} buffered inspection event(s): {str(e)}")
+        raise
+
+    return written
@@ -0,0 +1,163 @@
+"""
+Minimal JSON Patch (RFC 6902) and JSON Merge Patch (RFC 7396) support.
+
+Used by the delta auto-save endpoint so inspectors send only the parts of the
+checklist that changed instead of the whole form on every tick.
+"""
+import copy
+
+
+class PatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied"""
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def parse_pointer(pointer):
+    """Split a JSON pointer ("/a/b/0") into its unescaped tokens"""
+    if pointer == '':
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise PatchError(f'Invalid JSON pointer: {pointer!r}')
+    return [_unescape(token) for token in pointer[1:].split('/')]
+
+
+def _list_index(container, token, allow_end=False):
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise PatchError(f'Invalid array index: {token!r}')
+    index = int(token)
+    limit = len(container) + (1 if allow_end else 0)
+    if index >= limit:
+        raise PatchError(f'Array index out of range: {index}')
+    return index
+
+
+def _resolve_parent(document, tokens):
+    """Walk to the container holding the last token"""
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise PatchError(f'Path not found: /{"/".join(tokens)}')
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_list_index(target, token)]
+        else:
+            raise PatchError(f'Path not found: /{"/".join(tokens)}')
+    return target
+
+
+def _get(document, tokens):
+    if not tokens:
+        return document
+    parent = _resolve_parent(document, tokens)
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f'Path not found: /{"/".join(tokens)}')
+        return parent[key]
+    if isinstance(parent, list):
+        return parent[_list_index(parent, key)]
+    raise PatchError(f'Path not found: /{"/".join(tokens)}')
+
+
+def _add(document, tokens, value):
+    if not tokens:
+        return value
+    parent = _resolve_parent(document, tokens)
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        raise PatchError(f'Cannot add to /{"/".join(tokens)}')
+    return document
+
+
+def _remove(document, tokens):
+    if not tokens:
+        raise PatchError('Cannot remove the document root')
+    parent = _resolve_parent(document, tokens)
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f'Path not found: /{"/".join(tokens)}')
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, key))
+    raise PatchError(f'Path not found: /{"/".join(tokens)}')
+
+
+def apply_json_patch(document, operations):
+    """
+    Apply a list of RFC 6902 operations and return the patched copy.
+    The input document is never modified.
+    """
+    if not isinstance(operations, list):
+        raise PatchError('Patch must be a list of operations')
+
+    result = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise PatchError(f'Invalid patch operation: {operation!r}')
+        op = operation['op']
+        tokens = parse_pointer(operation['path'])
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise PatchError(f'"{op}" operation requires a value')
+
+        if op == 'add':
+            result = _add(result, tokens, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            _remove(result, tokens)
+        elif op == 'replace':
+            if tokens:
+                _remove(result, tokens)
+            result = _add(result, tokens, copy.deepcopy(operation['value']))
+        elif op in ('move', 'copy'):
+            from_tokens = parse_pointer(operation.get('from', ''))
+            if op == 'move':
+                if tokens[:len(from_tokens)] == from_tokens and len(tokens) > len(from_tokens):
+                    raise PatchError('Cannot move a value into one of its children')
+                value = _remove(result, from_tokens)
+            else:
+                value = copy.deepcopy(_get(result, from_tokens))
+            result = _add(result, tokens, value)
+        elif op == 'test':
+            if _get(result, tokens) != operation['value']:
+                raise PatchError(f'Test failed at {operation["path"]}')
+        else:
+            raise PatchError(f'Unsupported patch operation: {op!r}')
+    return result
+
+
+def apply_merge_patch(document, patch):
+    """Apply an RFC 7396 merge patch and return the merged copy"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def touched_top_level_keys(operations=None, merge_patch=None):
+    """Top-level checklist sections a patch touches (e.g. {'general'})"""
+    keys = set()
+    for operation in operations or []:
+        for pointer in (operation.get('path'), operation.get('from')):
+            if pointer:
+                tokens = parse_pointer(pointer)
+                if tokens:
+                    keys.add(tokens[0])
+    if isinstance(merge_patch, dict):
+        keys.update(merge_patch.keys())
+    return keys
@@ -5,7 +5,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from inspections.models import Inspection, ReinspectionSchedule
-from establishments.models import Establishment
+from inspections.reinspection import build_schedules
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,53 +37,21 @@ class Command(BaseCommand):
         
         self.stdout.write(f"Found {closed_inspections.count()} closed inspections")
         
-        created_count = 0
-        skipped_count = 0
+        # Schedules that already exist are kept as they are
+        schedules = build_schedules(closed_inspections.only('pk', 'current_status'))
+        existing = set(
+            ReinspectionSchedule.objects.filter(
+                original_inspection_id__in={schedule.original_inspection_id for schedule in schedules}
+            ).values_list('establishment_id', 'original_inspection_id')
+        )
+        missing = [
+            schedule for schedule in schedules
+            if (schedule.establishment_id, schedule.original_inspection_id) not in existing
+        ]
+        ReinspectionSchedule.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
         
-        for inspection in closed_inspections:
-            # Determine compliance status and reinspection period
-            if inspection.current_status == 'CLOSED_COMPLIANT':
-                compliance_status = 'COMPLIANT'
-                reinspection_period = timedelta(days=912)  # ~2.5 years
-            else:  # CLOSED_NON_COMPLIANT
-                compliance_status = 'NON_COMPLIANT'
-                reinspection_period = timedelta(days=365)  # 1 year
-            
-            # Create reinspection schedule for each establishment
-            for establishment in inspection.establishments.all():
-                # Check if schedule already exists
-                existing = ReinspectionSchedule.objects.filter(
-                    establishment=establishment,
-                    original_inspection=inspection
-                ).first()
-                
-                if existing:
-                    skipped_count += 1
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Schedule already exists for {establishment.name} - {inspection.code}"
-                        )
-                    )
-                    continue
-                
-                # Calculate due date
-                due_date = timezone.now().date() + reinspection_period
-                
-                # Create schedule
-                schedule = ReinspectionSchedule.objects.create(
-                    establishment=establishment,
-                    original_inspection=inspection,
-                    compliance_status=compliance_status,
-                    due_date=due_date,
-                    status='PENDING'
-                )
-                
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Created schedule for {establishment.name} - Due: {due_date}"
-                    )
-                )
+        created_count = len(missing)
+        skipped_count = len(schedules) - created_count
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,38 @@
+"""
+Management command to build image variants for existing inspection photos
+"""
+from django.core.management.base import BaseCommand
+from inspections.models import InspectionDocument
+from inspections.tasks import generate_document_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/medium WebP + JPEG variants for inspection photo documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild variants even for documents that already have them',
+        )
+
+    def handle(self, *args, **options):
+        documents = InspectionDocument.objects.exclude(file='')
+        if not options.get('force'):
+            documents = documents.filter(variants={})
+
+        processed = 0
+        skipped = 0
+        for document in documents.iterator():
+            if not document.is_image:
+                skipped += 1
+                continue
+            # Run inline: this command is the batch worker
+            if generate_document_variants(document.id):
+                processed += 1
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {processed} document(s), skipped {skipped}"
+        ))
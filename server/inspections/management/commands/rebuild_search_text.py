@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_search_text
+from establishments.models import Establishment, build_search_text as establishment_search_text
+from inspections.search import rebuild_inspection_search_text
+from users.models import User, build_search_text as user_search_text
+
+
+class Command(BaseCommand):
+    help = 'Recompute the keyword search documents of establishments, users and inspections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only', choices=['establishments', 'users', 'inspections'],
+            help='Rebuild a single entity type instead of all three',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per update batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rebuilders = {
+            'establishments': lambda: rebuild_search_text(
+                Establishment.objects.all(), establishment_search_text, batch_size
+            ),
+            'users': lambda: rebuild_search_text(User.objects.all(), user_search_text, batch_size),
+            'inspections': lambda: rebuild_inspection_search_text(batch_size),
+        }
+        for name, rebuild in rebuilders.items():
+            if options['only'] and options['only'] != name:
+                continue
+            updated = rebuild()
+            self.stdout.write(self.style.SUCCESS(f'Updated search text of {updated} {name}'))
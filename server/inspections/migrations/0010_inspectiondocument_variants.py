@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0009_add_reinspection_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspectiondocument',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Storage names of generated image variants'),
+        ),
+    ]
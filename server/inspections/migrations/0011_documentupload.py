@@ -0,0 +1,41 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inspections', '0010_inspectiondocument_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('total_size', models.BigIntegerField(help_text='Expected size of the complete file in bytes')),
+                ('checksum', models.CharField(blank=True, help_text='Optional SHA-256 of the complete file', max_length=64)),
+                ('document_type', models.CharField(choices=[('REPORT', 'Inspection Report'), ('PHOTO', 'Photo Evidence'), ('PERMIT', 'Permit/License'), ('NOTICE', 'Notice'), ('OTHER', 'Other')], default='OTHER', max_length=20)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('chunk_size', models.PositiveIntegerField()),
+                ('next_index', models.PositiveIntegerField(default=0, help_text='Index of the next chunk expected')),
+                ('received_bytes', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETED', 'Completed')], default='PENDING', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('document', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='inspections.inspectiondocument')),
+                ('inspection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to='inspections.inspection')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='inspections_status_b545b1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0011_documentupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspectionform',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0012_inspectionform_revision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['created_at'], name='inspections_created_b87a10_idx'),
+        ),
+    ]
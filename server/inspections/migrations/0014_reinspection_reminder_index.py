@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0013_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reinspectionschedule',
+            index=models.Index(fields=['status', 'reminder_sent', 'due_date'], name='inspections_status_68f30d_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:44
+
+import core.search
+from django.db import migrations
+
+from inspections.search import build_search_text
+
+
+def backfill_search_text(apps, schema_editor):
+    Inspection = apps.get_model('inspections', 'Inspection')
+    ids = list(Inspection.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), 2000):
+        batch = list(
+            Inspection.objects.filter(pk__in=ids[start:start + 2000])
+            .select_related('assigned_to')
+            .prefetch_related('establishments')
+        )
+        for inspection in batch:
+            inspection.search_text = build_search_text(
+                inspection, inspection.establishments.all(), inspection.assigned_to
+            )
+        Inspection.objects.bulk_update(batch, ['search_text'])
+
+
+add_fulltext_index, drop_fulltext_index = core.search.fulltext_index_operations('inspections_inspection', 'inspection_search_text_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspections', '0014_reinspection_reminder_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspection',
+            name='search_text',
+            field=core.search.SearchTextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -2,10 +2,14 @@
 Refactored Inspection Models
 Implements the complete workflow state machine with proper transitions and validations.
 """
+import uuid
+
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from core.search import SearchTextField
 from establishments.models import Establishment
 
 
@@ -96,6 +100,10 @@ class Inspection(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Lower-cased code/law/status/assignee/establishment text, maintained by
+    # signals (see search.py; FULLTEXT-indexed on MySQL)
+    search_text = SearchTextField(blank=True, default='', editable=False)
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -104,11 +112,28 @@ class Inspection(models.Model):
             models.Index(fields=['assigned_to']),
             models.Index(fields=['created_by']),
             models.Index(fields=['law']),
+            models.Index(fields=['created_at']),
         ]
     
     def __str__(self):
         return f"{self.code} - {self.get_simplified_status()}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored assignment so signals can adjust workload counters
+        instance._loaded_assignment = (
+            instance.__dict__.get('assigned_to_id'),
+            instance.__dict__.get('current_status'),
+        )
+        # ... and the stored status for the establishments' inspection state
+        instance._loaded_status = instance.__dict__.get('current_status')
+        # ... and the fields its search document is built from
+        instance._loaded_search_key = tuple(
+            instance.__dict__.get(field) for field in ('code', 'law', 'current_status', 'assigned_to_id')
+        )
+        return instance
+
     def save(self, *args, **kwargs):
         """Generate unique inspection code if not set"""
         if not self.code:
@@ -173,142 +198,23 @@ class Inspection(models.Model):
     
     def can_transition_to(self, new_status, user):
         """Check if transition to new_status is valid for the current state and user"""
-        
-        # Define valid transitions based on current status
-        valid_transitions = {
-            'CREATED': {
-                'SECTION_ASSIGNED': ['Division Chief'],
-            },
-            'SECTION_ASSIGNED': {
-                'SECTION_IN_PROGRESS': ['Section Chief'],
-                'UNIT_ASSIGNED': ['Section Chief'],  # Can forward directly
-                'MONITORING_ASSIGNED': ['Section Chief'],  # Can forward directly if no unit head
-            },
-            'SECTION_IN_PROGRESS': {
-                'SECTION_COMPLETED_COMPLIANT': ['Section Chief'],
-                'SECTION_COMPLETED_NON_COMPLIANT': ['Section Chief'],
-                'DIVISION_REVIEWED': ['Section Chief'],  # Direct submission to Division Chief review
-            },
-            'SECTION_COMPLETED_COMPLIANT': {
-                'UNIT_ASSIGNED': ['Section Chief'],
-                'MONITORING_ASSIGNED': ['Section Chief'],  # If no unit head
-                'DIVISION_REVIEWED': ['Division Chief'],  # Auto-assign to Division Chief
-            },
-            'SECTION_COMPLETED_NON_COMPLIANT': {
-                'UNIT_ASSIGNED': ['Section Chief'],
-                'MONITORING_ASSIGNED': ['Section Chief'],  # If no unit head
-                'DIVISION_REVIEWED': ['Division Chief'],  # Auto-assign to Division Chief
-            },
-            'UNIT_ASSIGNED': {
-                'UNIT_IN_PROGRESS': ['Unit Head'],
-                'MONITORING_ASSIGNED': ['Unit Head'],  # Can forward directly
-                'SECTION_ASSIGNED': ['Unit Head'],  # Return to Section Chief
-            },
-            'UNIT_IN_PROGRESS': {
-                'UNIT_COMPLETED_COMPLIANT': ['Unit Head'],
-                'UNIT_COMPLETED_NON_COMPLIANT': ['Unit Head'],
-                'SECTION_REVIEWED': ['Unit Head'],  # Direct submission to Section Chief review
-            },
-            'UNIT_COMPLETED_COMPLIANT': {
-                'MONITORING_ASSIGNED': ['Unit Head'],
-                'SECTION_REVIEWED': ['Section Chief'],  # Can send to Section
-            },
-            'UNIT_COMPLETED_NON_COMPLIANT': {
-                'MONITORING_ASSIGNED': ['Unit Head'],
-                'SECTION_REVIEWED': ['Section Chief'],  # Can send to Section
-            },
-            'MONITORING_ASSIGNED': {
-                'MONITORING_IN_PROGRESS': ['Monitoring Personnel'],
-                'UNIT_ASSIGNED': ['Monitoring Personnel', 'Unit Head'],  # Return to Unit Head
-                'SECTION_ASSIGNED': ['Unit Head'],  # Optional return to Section Chief
-            },
-            'MONITORING_IN_PROGRESS': {
-                'MONITORING_COMPLETED_COMPLIANT': ['Monitoring Personnel'],
-                'MONITORING_COMPLETED_NON_COMPLIANT': ['Monitoring Personnel'],
-            },
-            'MONITORING_COMPLETED_COMPLIANT': {
-                'UNIT_REVIEWED': ['Unit Head'],  # Auto-assign to Unit Head
-            },
-            'MONITORING_COMPLETED_NON_COMPLIANT': {
-                'UNIT_REVIEWED': ['Unit Head'],  # Auto-assign to Unit Head
-            },
-            'UNIT_REVIEWED': {
-                'SECTION_REVIEWED': ['Section Chief'],  # Section Chief forwards to Division
-            },
-            'SECTION_REVIEWED': {
-                'DIVISION_REVIEWED': ['Division Chief'],  # Division Chief forwards to finalize
-            },
-            'DIVISION_REVIEWED': {
-                'CLOSED_COMPLIANT': ['Division Chief'],  # If compliant
-                'LEGAL_REVIEW': ['Division Chief'],  # If non-compliant
-            },
-            'LEGAL_REVIEW': {
-                'NOV_SENT': ['Legal Unit'],
-                'NOO_SENT': ['Legal Unit'],
-                'CLOSED_NON_COMPLIANT': ['Legal Unit'],
-            },
-            'NOV_SENT': {
-                'NOO_SENT': ['Legal Unit'],
-                'CLOSED_NON_COMPLIANT': ['Legal Unit'],
-            },
-            'NOO_SENT': {
-                'CLOSED_NON_COMPLIANT': ['Legal Unit'],
-            },
-        }
-        
-        # Get allowed transitions from current status
-        allowed = valid_transitions.get(self.current_status, {})
-        
-        # Check if new_status is allowed
-        if new_status not in allowed:
-            return False
-        
-        # Check if user has the right level
-        required_levels = allowed[new_status]
-        return user.userlevel in required_levels
+        from .workflow import can_transition
+
+        return can_transition(self.current_status, new_status, user.userlevel)
     
     def auto_assign_personnel(self):
-        """Auto-assign personnel based on law and district"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Special case: PD-1586, RA-8749, RA-9275 should be assigned to combined section
-        target_section = self.law
-        if self.law in ['PD-1586', 'RA-8749', 'RA-9275']:
-            target_section = 'PD-1586,RA-8749,RA-9275'  # EIA, Air & Water Combined
+        """Auto-assign the least-loaded Section Chief for the law, preferring the same district"""
+        from .roster import pick_assignee, section_for_law
         
-        user_has_district = any(field.name == 'district' for field in User._meta.get_fields())
-        
-        # Auto-assign Section Chief
-        section_filters = {
-            'userlevel': 'Section Chief',
-            'section': target_section,
-            'is_active': True,
-        }
-        if user_has_district:
-            if self.district:
-                section_filters['district'] = self.district
-            else:
-                section_filters['district__isnull'] = True
-        section_chief = User.objects.filter(**section_filters).first()
-        
-        # If no district match, find any section chief for this target section
-        if not section_chief:
-            fallback_filters = {
-                'userlevel': 'Section Chief',
-                'section': target_section,
-                'is_active': True,
-            }
-            section_chief = User.objects.filter(**fallback_filters).first()
+        section_chief = pick_assignee('Section Chief', section_for_law(self.law), district=self.district)
         
         if section_chief and self.current_status == 'SECTION_ASSIGNED':
             self.assigned_to = section_chief
             self.save()
     
     def get_next_assignee(self, next_status):
-        """Get the next assignee based on the target status"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
+        """Get the next assignee (least-loaded matching user) for the target status"""
+        from .roster import ANY, pick_assignee, section_for_law
         
         # Map status to user level
         status_to_level = {
@@ -332,40 +238,19 @@ class Inspection(models.Model):
         if not required_level:
             return None
         
-        # Find user with required level, law, and district
-        query = User.objects.filter(
-            userlevel=required_level,
-            is_active=True
-        )
-        
-        # For non-division/legal roles, filter by law
-        if required_level not in ['Division Chief', 'Legal Unit']:
-            # Special case: For Section Chief and Unit Head, use combined section for PD-1586, RA-8749, RA-9275
-            # But for Monitoring Personnel, always use the specific law
-            if required_level == 'Monitoring Personnel':
-                # Monitoring Personnel should be assigned by specific law
-                query = query.filter(section=self.law)
-            else:
-                # Section Chief and Unit Head use combined section logic
-                target_section = self.law
-                if self.law in ['PD-1586', 'RA-8749', 'RA-9275']:
-                    target_section = 'PD-1586,RA-8749,RA-9275'  # EIA, Air & Water Combined
-                query = query.filter(section=target_section)
+        # Division Chief and Legal Unit are not tied to a law or district
+        if required_level in ['Division Chief', 'Legal Unit']:
+            return pick_assignee(required_level)
         
-        user_has_district = any(field.name == 'district' for field in User._meta.get_fields())
-        
-        # For all roles except division/legal, prefer same district
-        if (
-            user_has_district
-            and self.district
-            and required_level not in ['Division Chief', 'Legal Unit']
-        ):
-            district_user = query.filter(district=self.district).first()
-            if district_user:
-                return district_user
+        # Monitoring Personnel are assigned by specific law; Section Chief and
+        # Unit Head use the combined section for PD-1586, RA-8749, RA-9275
+        if required_level == 'Monitoring Personnel':
+            section = self.law
+        else:
+            section = section_for_law(self.law)
         
-        # Fallback to any user with required level
-        return query.first()
+        # Prefer same district, fall back to anyone with the required level
+        return pick_assignee(required_level, section, district=self.district or ANY)
 
 
 class InspectionForm(models.Model):
@@ -411,6 +296,9 @@ class InspectionForm(models.Model):
         help_text='User who first filled out this inspection form'
     )
     
+    # Bumped on every write; delta auto-saves must be based on the current revision
+    revision = models.PositiveIntegerField(default=0)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -418,6 +306,20 @@ class InspectionForm(models.Model):
     def __str__(self):
         return f"Form for {self.inspection.code}"
     
+    def save(self, *args, **kwargs):
+        """Increment revision atomically so stale delta auto-saves are rejected"""
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'revision'}
+        self.revision = models.F('revision') + 1
+        super().save(*args, **kwargs)
+        # Leave revision deferred: it is re-read only by callers that use it
+        del self.__dict__['revision']
+    
     def clean(self):
         """Validate that non-compliant requires violations"""
         if self.compliance_decision == 'NON_COMPLIANT' and not self.violations_found:
@@ -556,11 +458,89 @@ class InspectionDocument(models.Model):
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
+    # Resized image variants (thumbnail/medium, WebP + JPEG) built in the background
+    variants = models.JSONField(default=dict, blank=True,
+        help_text='Storage names of generated image variants')
+    
     class Meta:
         ordering = ['-uploaded_at']
     
     def __str__(self):
         return f"{self.document_type} - {self.inspection_form.inspection.code}"
+    
+    @property
+    def is_image(self):
+        """Check if the attached file is an image the pipeline can process"""
+        from core.image_pipeline import is_image_name
+        return bool(self.file) and is_image_name(self.file.name)
+    
+    def get_variant_storage_prefix(self):
+        """Storage directory holding this document's generated variants"""
+        return f"inspections/documents/variants/{self.pk}"
+
+
+class DocumentUpload(models.Model):
+    """
+    Staging record for a chunked, resumable document upload.
+    Chunks are appended to a private staging file and finalized into an InspectionDocument.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('COMPLETED', 'Completed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    inspection = models.ForeignKey(
+        Inspection,
+        on_delete=models.CASCADE,
+        related_name='document_uploads'
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='document_uploads'
+    )
+    
+    # File metadata supplied when the upload is initiated
+    file_name = models.CharField(max_length=255)
+    total_size = models.BigIntegerField(help_text='Expected size of the complete file in bytes')
+    checksum = models.CharField(max_length=64, blank=True, help_text='Optional SHA-256 of the complete file')
+    document_type = models.CharField(max_length=20, choices=InspectionDocument.DOCUMENT_TYPE_CHOICES, default='OTHER')
+    description = models.CharField(max_length=255, blank=True)
+    
+    # Progress
+    chunk_size = models.PositiveIntegerField()
+    next_index = models.PositiveIntegerField(default=0, help_text='Index of the next chunk expected')
+    received_bytes = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    document = models.OneToOneField(
+        InspectionDocument,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload'
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),  # Stale upload cleanup
+        ]
+    
+    def __str__(self):
+        return f"Upload {self.id} ({self.received_bytes}/{self.total_size} bytes)"
+    
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+    
+    @property
+    def is_complete(self):
+        return self.received_bytes == self.total_size
 
 
 class InspectionHistory(models.Model):
@@ -864,49 +844,20 @@ class ComplianceQuota(models.Model):
         except Law.DoesNotExist:
             return None
 
-    @property
+    @cached_property
     def accomplished(self):
         """
         Calculate accomplished inspections for this quota period.
         Counts finished inspections where this law is in their applicable environmental laws.
-        Uses month-specific date range for monthly quotas.
+        Uses month-specific date range for monthly quotas. Memoized per instance, so
+        percentage/exceeded/auto_adjust_next_quarter reuse it; list views fill it in bulk
+        with quota_evaluation.prime_accomplished().
         """
-        from datetime import datetime
-        
-        # Get month date range for monthly quotas
-        if self.month:
-            month_start, month_end = self.get_month_dates(self.month)
-        else:
-            # Fallback to quarter date range (for backward compatibility)
-            month_start, month_end = self.get_quarter_dates()
-        
-        # Count finished inspections
-        finished_statuses = [
-            'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
-            'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT'
-        ]
-        
-        # Get all finished inspections in this month/period
-        finished_inspections = Inspection.objects.filter(
-            current_status__in=finished_statuses,
-            updated_at__range=[month_start, month_end]
-        ).prefetch_related('form')
-        
-        # Count inspections where this law is in their applicable environmental laws
-        count = 0
-        for inspection in finished_inspections:
-            if hasattr(inspection, 'form') and inspection.form:
-                checklist = inspection.form.checklist if hasattr(inspection.form, 'checklist') else {}
-                general = checklist.get('general', {})
-                applicable_laws = general.get('environmental_laws', [])
-                
-                # Check if this quota's law is in the inspection's applicable laws
-                if self.law in applicable_laws:
-                    count += 1
-        
-        return count
+        from .quota_evaluation import accomplished_by_month
+
+        months = [self.month] if self.month else self.get_months_in_quarter(self.quarter)
+        counts = accomplished_by_month(self.year, months, [self.law])
+        return sum(counts.get((month, self.law), 0) for month in months)
 
     def get_quarter_dates(self):
         """Get start and end dates for this quarter"""
@@ -945,38 +896,12 @@ class ComplianceQuota(models.Model):
     
     def get_accomplished_for_month(self, month):
         """Calculate accomplished inspections for a specific month"""
-        from datetime import datetime
-        
-        # Get month date range
-        month_start, month_end = self.get_month_dates(month)
-        
-        # Count finished inspections (same logic as accomplished property)
-        finished_statuses = [
-            'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
-            'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
-            'CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT'
-        ]
-        
-        # Get all finished inspections in this month
-        finished_inspections = Inspection.objects.filter(
-            current_status__in=finished_statuses,
-            updated_at__range=[month_start, month_end]
-        ).prefetch_related('form')
-        
-        # Count inspections where this law is in their applicable environmental laws
-        count = 0
-        for inspection in finished_inspections:
-            if hasattr(inspection, 'form') and inspection.form:
-                checklist = inspection.form.checklist if hasattr(inspection.form, 'checklist') else {}
-                general = checklist.get('general', {})
-                applicable_laws = general.get('environmental_laws', [])
-                
-                # Check if this quota's law is in the inspection's applicable laws
-                if self.law in applicable_laws:
-                    count += 1
-        
-        return count
+        from .quota_evaluation import accomplished_by_month
+
+        # Validate month
+        if month < 1 or month > 12:
+            raise ValueError(f"Month must be between 1 and 12, got {month}")
+        return accomplished_by_month(self.year, [month], [self.law]).get((month, self.law), 0)
 
     def auto_adjust_next_quarter(self):
         """Auto-set next quarter quota if current accomplishments exceed target"""
@@ -1038,12 +963,9 @@ class ComplianceQuota(models.Model):
     @staticmethod
     def get_quarterly_totals(law, year, quarter):
         """Calculate total target and achieved for a quarter from monthly quotas"""
-        months = ComplianceQuota.get_months_in_quarter(quarter)
-        # Get all monthly quotas for this quarter
-        quotas = ComplianceQuota.objects.filter(law=law, year=year, month__in=months)
-        total_target = sum(q.target for q in quotas) if quotas.exists() else 0
-        total_achieved = sum(q.accomplished for q in quotas) if quotas.exists() else 0
-        return total_target, total_achieved
+        from .quota_evaluation import quarter_totals
+
+        return quarter_totals(year, quarter, [law])[law]
 
 
 class QuarterlyEvaluation(models.Model):
@@ -1175,6 +1097,8 @@ class ReinspectionSchedule(models.Model):
             models.Index(fields=['due_date']),
             models.Index(fields=['status']),
             models.Index(fields=['establishment']),
+            # Reminder sweep: pending, not yet reminded, due within a window
+            models.Index(fields=['status', 'reminder_sent', 'due_date']),
         ]
         unique_together = ['establishment', 'original_inspection']
     
@@ -0,0 +1,171 @@
+"""
+Set-based quota totals and batch quarter evaluation.
+
+ComplianceQuota.accomplished counts finished inspections whose form lists the
+quota's law among its applicable environmental laws. Computing it per quota
+meant re-scanning every finished inspection (and its form) once per law and
+month. accomplished_by_month() reads the (updated_at, environmental_laws)
+pairs of a period once and buckets them by month and law in Python, because
+the law list lives in the form's JSON checklist.
+
+evaluate_quarters() uses it to evaluate every law of a quarter with one quota
+query and one inspection query, and upserts all QuarterlyEvaluation rows in a
+single transaction. The evaluate_previous_quarter Celery task runs it after
+each quarter ends.
+"""
+from calendar import monthrange
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ComplianceQuota, Inspection, QuarterlyEvaluation
+
+FINISHED_STATUSES = (
+    'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT',
+    'UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT',
+    'MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT',
+    'CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT',
+)
+
+EVALUATION_FIELDS = [
+    'quarterly_target', 'quarterly_achieved', 'quarter_status',
+    'surplus', 'deficit', 'remarks', 'evaluated_by', 'is_archived',
+]
+
+
+def month_range(year, month):
+    """Aware [start, end) of a month in the current time zone"""
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(datetime(year, month, monthrange(year, month)[1]) + timedelta(days=1))
+    return start, end
+
+
+def previous_quarter(today=None):
+    """(year, quarter) of the quarter before the one containing `today`"""
+    today = today or timezone.localdate()
+    quarter = (today.month - 1) // 3 + 1
+    return (today.year, quarter - 1) if quarter > 1 else (today.year - 1, 4)
+
+
+def accomplished_by_month(year, months, laws=None):
+    """
+    {(month, law): finished inspections} for the given months of `year`,
+    from one query. Limited to `laws` when given.
+    """
+    months = sorted(months)
+    start, _ = month_range(year, months[0])
+    _, end = month_range(year, months[-1])
+    wanted = set(laws) if laws is not None else None
+
+    rows = Inspection.objects.filter(
+        current_status__in=FINISHED_STATUSES,
+        updated_at__gte=start,
+        updated_at__lt=end,
+        form__isnull=False,
+    ).values_list('updated_at', 'form__checklist__general__environmental_laws')
+
+    counts = defaultdict(int)
+    for updated_at, applicable_laws in rows:
+        if not isinstance(applicable_laws, list):
+            continue
+        month = timezone.localtime(updated_at).month
+        if month not in months:
+            continue
+        for law in {law for law in applicable_laws if isinstance(law, str)}:
+            if wanted is None or law in wanted:
+                counts[(month, law)] += 1
+    return counts
+
+
+def prime_accomplished(quotas):
+    """
+    Fill ComplianceQuota.accomplished for a list of quotas with one inspection
+    query per year instead of one scan per quota. Returns the list.
+    """
+    quotas = list(quotas)
+    by_year = defaultdict(list)
+    for quota in quotas:
+        by_year[quota.year].append(quota)
+    for year, year_quotas in by_year.items():
+        counts = accomplished_by_month(
+            year, {quota.month for quota in year_quotas}, {quota.law for quota in year_quotas}
+        )
+        for quota in year_quotas:
+            quota.__dict__['accomplished'] = counts.get((quota.month, quota.law), 0)
+    return quotas
+
+
+def quarter_totals(year, quarter, laws=None):
+    """
+    {law: (total_target, total_achieved)} for a quarter.
+
+    Laws come from the quarter's monthly quotas (limited to `laws` when
+    given); a requested law without quotas totals (0, 0).
+    """
+    months = ComplianceQuota.get_months_in_quarter(quarter)
+    quotas = ComplianceQuota.objects.filter(year=year, month__in=months)
+    if laws is not None:
+        quotas = quotas.filter(law__in=laws)
+    targets = dict(quotas.order_by().values_list('law').annotate(total=Sum('target')))
+
+    achieved = accomplished_by_month(year, months, targets.keys()) if targets else {}
+    totals = {law: (0, 0) for law in (laws or [])}
+    for law, target in targets.items():
+        totals[law] = (target, sum(achieved.get((month, law), 0) for month in months))
+    return totals
+
+
+def build_evaluation(law, year, quarter, total_target, total_achieved, user=None, remarks=''):
+    """Unsaved QuarterlyEvaluation for a quarter's totals"""
+    if total_achieved >= total_target:
+        quarter_status = 'EXCEEDED' if total_achieved > total_target else 'ACHIEVED'
+    else:
+        quarter_status = 'NOT_ACHIEVED'
+    return QuarterlyEvaluation(
+        law=law,
+        year=year,
+        quarter=quarter,
+        quarterly_target=total_target,
+        quarterly_achieved=total_achieved,
+        quarter_status=quarter_status,
+        surplus=max(0, total_achieved - total_target),
+        deficit=max(0, total_target - total_achieved),
+        remarks=remarks,
+        evaluated_by=user,
+        is_archived=True,
+    )
+
+
+def evaluate_quarters(year, quarter, laws=None, user=None, remarks='', overwrite=True):
+    """
+    Evaluate every law of a quarter (or just `laws`) and upsert the results.
+
+    Existing evaluations are updated when `overwrite` is set and left alone
+    otherwise. Returns the evaluations for the quarter, ordered by law.
+    """
+    totals = quarter_totals(year, quarter, laws)
+    evaluations = [
+        build_evaluation(law, year, quarter, target, achieved, user, remarks)
+        for law, (target, achieved) in sorted(totals.items())
+    ]
+    if not evaluations:
+        return []
+
+    with transaction.atomic():
+        if not overwrite:
+            QuarterlyEvaluation.objects.bulk_create(evaluations, ignore_conflicts=True)
+        else:
+            options = {'update_conflicts': True, 'update_fields': EVALUATION_FIELDS}
+            # MySQL upserts on any unique key and rejects an explicit target
+            if connection.features.supports_update_conflicts_with_target:
+                options['unique_fields'] = ['law', 'year', 'quarter']
+            QuarterlyEvaluation.objects.bulk_create(evaluations, **options)
+
+    return list(
+        QuarterlyEvaluation.objects.filter(year=year, quarter=quarter, law__in=totals.keys())
+        .select_related('evaluated_by')
+        .order_by('law')
+    )
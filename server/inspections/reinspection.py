@@ -0,0 +1,104 @@
+"""
+Reinspection scheduling.
+
+When an inspection moves into a closed status, each of its establishments
+gets a ReinspectionSchedule due after the period for the outcome (about 2.5
+years when compliant, 1 year when not). Schedules are only (re)written on the
+transition itself - see refresh_on_status_change in signals.py - so later
+saves of a closed inspection no longer reset due dates or reminder flags.
+
+All schedules for a batch of inspections are written with one upsert, and
+the reminder sweep reads due schedules with one query over the
+(status, reminder_sent, due_date) index.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import Inspection, ReinspectionSchedule
+
+# Closed status -> (schedule compliance status, reinspection period)
+CLOSED_OUTCOMES = {
+    'CLOSED_COMPLIANT': ('COMPLIANT', timedelta(days=912)),  # ~2.5 years
+    'CLOSED_NON_COMPLIANT': ('NON_COMPLIANT', timedelta(days=365)),
+}
+
+RESCHEDULE_FIELDS = ['compliance_status', 'due_date', 'status', 'reminder_sent', 'reminder_sent_date', 'updated_at']
+
+
+def is_closing(previous_status, current_status):
+    """Whether a save moved an inspection into a closed status"""
+    return current_status in CLOSED_OUTCOMES and previous_status != current_status
+
+
+def build_schedules(inspections, today=None):
+    """Unsaved schedules for every establishment of the given closed inspections (one query)"""
+    today = today or timezone.now().date()
+    outcomes = {
+        inspection.pk: CLOSED_OUTCOMES[inspection.current_status]
+        for inspection in inspections
+        if inspection.current_status in CLOSED_OUTCOMES
+    }
+    if not outcomes:
+        return []
+
+    links = Inspection.establishments.through.objects.filter(inspection_id__in=list(outcomes)).values_list(
+        'inspection_id', 'establishment_id'
+    )
+    schedules = []
+    for inspection_id, establishment_id in links:
+        compliance_status, period = outcomes[inspection_id]
+        schedules.append(ReinspectionSchedule(
+            establishment_id=establishment_id,
+            original_inspection_id=inspection_id,
+            compliance_status=compliance_status,
+            due_date=today + period,
+            status='PENDING',
+            reminder_sent=False,
+            reminder_sent_date=None,
+        ))
+    return schedules
+
+
+def schedule_reinspections(inspections, overwrite=True, today=None):
+    """
+    Create (or, with `overwrite`, reset) the schedules of closed inspections.
+
+    An inspection that is reopened and closed again gets a fresh due date and
+    reminder. Returns the number of schedules written.
+    """
+    schedules = build_schedules(inspections, today)
+    if not schedules:
+        return 0
+
+    if not overwrite:
+        ReinspectionSchedule.objects.bulk_create(schedules, ignore_conflicts=True)
+    else:
+        options = {'update_conflicts': True, 'update_fields': RESCHEDULE_FIELDS}
+        # MySQL upserts on any unique key and rejects an explicit target
+        if connection.features.supports_update_conflicts_with_target:
+            options['unique_fields'] = ['establishment', 'original_inspection']
+        ReinspectionSchedule.objects.bulk_create(schedules, **options)
+    return len(schedules)
+
+
+def pending_reminders(days_ahead=30, today=None):
+    """Pending schedules due within `days_ahead` days that have not been reminded yet"""
+    today = today or timezone.now().date()
+    return ReinspectionSchedule.objects.filter(
+        status='PENDING',
+        reminder_sent=False,
+        due_date__gte=today,
+        due_date__lte=today + timedelta(days=days_ahead),
+    ).select_related('establishment', 'original_inspection')
+
+
+def mark_reminded(schedule_ids):
+    """Flag schedules as reminded with one UPDATE"""
+    if not schedule_ids:
+        return 0
+    now = timezone.now()
+    return ReinspectionSchedule.objects.filter(pk__in=schedule_ids).update(
+        reminder_sent=True, reminder_sent_date=now, updated_at=now
+    )
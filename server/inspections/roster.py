@@ -0,0 +1,217 @@
+"""
+Cached personnel roster and workload-aware assignee selection.
+
+The active users that inspections can be routed to are cached as one roster,
+grouped by (userlevel, section, district), and rebuilt with a single query
+after any user is saved or deleted (see signals.py). Each user's open
+inspection count is kept in a cache counter that is adjusted as inspections
+are (re)assigned or closed, and rewritten hourly by reconcile_workloads().
+
+pick_assignee() returns the least-loaded matching user, so new work spreads
+across everyone with the right role instead of always landing on the first
+match. Once warm, picking costs one primary-key query for the chosen user.
+
+The roster only holds (id, userlevel, section, district) per user; the chosen
+assignee is loaded by primary key, and a user who is no longer active or has
+changed role or section is skipped and the roster rebuilt.
+
+Signal-driven invalidation and counters only reach other processes through a
+shared cache (REDIS_CACHE_URL). Without one, each process rebuilds its roster
+when a user is saved in that process or LOCAL_ROSTER_SECONDS after building
+it (the pk check above covers the changes made elsewhere in between), and
+workloads are counted with one grouped query per pick.
+"""
+import time
+from collections import defaultdict, namedtuple
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.cache_utils import shared_cache
+
+ROSTER_KEY = 'inspections:roster'
+ROSTER_TTL = 60 * 60
+LOCAL_ROSTER_SECONDS = 60
+WORKLOAD_TTL = 24 * 60 * 60
+
+CLOSED_STATUSES = ('CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT')
+
+# Combined EIA, Air & Water section that Section Chiefs/Unit Heads of these laws belong to
+COMBINED_SECTION = 'PD-1586,RA-8749,RA-9275'
+COMBINED_SECTION_LAWS = ('PD-1586', 'RA-8749', 'RA-9275')
+
+# Wildcard for section/district arguments
+ANY = object()
+
+
+def is_open(status):
+    return bool(status) and status not in CLOSED_STATUSES
+
+
+def section_for_law(law):
+    """Section a Section Chief/Unit Head handling `law` belongs to"""
+    return COMBINED_SECTION if law in COMBINED_SECTION_LAWS else law
+
+
+# Roster ------------------------------------------------------------------
+
+RosterEntry = namedtuple('RosterEntry', 'id userlevel section district')
+
+# (built_at, roster) of this process, used when the cache is not shared
+_local_roster = (None, None)
+
+
+def _build_roster():
+    User = get_user_model()
+    fields = ['id', 'userlevel', 'section']
+    if any(field.name == 'district' for field in User._meta.get_fields()):
+        fields.append('district')
+    roster = defaultdict(list)
+    for row in User.objects.filter(is_active=True).order_by('id').values_list(*fields):
+        entry = RosterEntry(*row, *[None] * (4 - len(row)))
+        roster[(entry.userlevel, entry.section, entry.district)].append(entry)
+    return dict(roster)
+
+
+def get_roster():
+    """{(userlevel, section, district): [RosterEntry, ...]} of active users, ordered by id"""
+    global _local_roster
+    if not shared_cache():
+        built_at, roster = _local_roster
+        if roster is None or time.monotonic() - built_at >= LOCAL_ROSTER_SECONDS:
+            roster = _build_roster()
+            _local_roster = (time.monotonic(), roster)
+        return roster
+
+    roster = cache.get(ROSTER_KEY)
+    if roster is None:
+        roster = _build_roster()
+        cache.set(ROSTER_KEY, roster, ROSTER_TTL)
+    return roster
+
+
+def invalidate_roster():
+    global _local_roster
+    _local_roster = (None, None)
+    cache.delete(ROSTER_KEY)
+
+
+def candidates(userlevel, section=ANY, district=ANY):
+    """Roster entries of active users with a role, optionally limited to a section and/or district"""
+    return [
+        entry
+        for (level, user_section, user_district), entries in get_roster().items()
+        if level == userlevel
+        and (section is ANY or user_section == section)
+        and (district is ANY or user_district == district)
+        for entry in entries
+    ]
+
+
+def load_user(entry):
+    """The user behind a roster entry, or None if they were deactivated or moved since it was built"""
+    return get_user_model().objects.filter(
+        pk=entry.id, is_active=True, userlevel=entry.userlevel, section=entry.section
+    ).first()
+
+
+# Workload counters -------------------------------------------------------
+
+def _key(user_id):
+    return f'inspections:workload:{user_id}'
+
+
+def _open_counts(user_ids):
+    from .models import Inspection
+
+    return dict(
+        Inspection.objects.filter(assigned_to_id__in=user_ids)
+        .exclude(current_status__in=CLOSED_STATUSES)
+        .order_by()
+        .values_list('assigned_to_id')
+        .annotate(total=Count('id'))
+    )
+
+
+def get_workloads(user_ids):
+    """{user_id: open inspections}; cache misses are filled with one grouped query"""
+    user_ids = list(user_ids)
+    if not shared_cache():
+        counts = _open_counts(user_ids)
+        return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+    cached = cache.get_many([_key(user_id) for user_id in user_ids])
+    loads = {user_id: cached[_key(user_id)] for user_id in user_ids if _key(user_id) in cached}
+
+    missing = [user_id for user_id in user_ids if user_id not in loads]
+    if missing:
+        counts = _open_counts(missing)
+        fresh = {user_id: counts.get(user_id, 0) for user_id in missing}
+        cache.set_many({_key(user_id): count for user_id, count in fresh.items()}, WORKLOAD_TTL)
+        loads.update(fresh)
+    return loads
+
+
+def adjust_workload(user_id, delta):
+    """Adjust a cached counter; a missing counter is left for the next read to compute"""
+    if not shared_cache():
+        return
+    try:
+        if cache.incr(_key(user_id), delta) < 0:
+            cache.delete(_key(user_id))
+    except ValueError:
+        pass
+
+
+def reconcile_workloads():
+    """
+    Rewrite every rostered user's counter from one grouped query.
+
+    Returns:
+        int: Number of counters written
+    """
+    if not shared_cache():
+        return 0
+    user_ids = [entry.id for entries in get_roster().values() for entry in entries]
+    counts = _open_counts(user_ids)
+    cache.set_many({_key(user_id): counts.get(user_id, 0) for user_id in user_ids}, WORKLOAD_TTL)
+    return len(user_ids)
+
+
+# Selection ---------------------------------------------------------------
+
+def least_loaded(entries):
+    """
+    User with the fewest open inspections (lowest id on ties), or None.
+
+    Entries whose user no longer matches are skipped, and the roster is
+    rebuilt on the next pick.
+    """
+    if not entries:
+        return None
+    loads = get_workloads(entry.id for entry in entries)
+    for entry in sorted(entries, key=lambda entry: (loads.get(entry.id, 0), entry.id)):
+        user = load_user(entry)
+        if user is not None:
+            return user
+        invalidate_roster()
+    return None
+
+
+def pick_assignee(userlevel, section=ANY, district=ANY):
+    """
+    Least-loaded active user with `userlevel` (and `section`).
+
+    `section` may be a list of sections tried in order. When `district` is
+    given, users in that district are preferred over the rest of the pool.
+    """
+    sections = section if isinstance(section, (list, tuple)) else [section]
+    for target in sections:
+        pool = candidates(userlevel, target)
+        if district is not ANY:
+            pool = [entry for entry in pool if entry.district == district] or pool
+        user = least_loaded(pool)
+        if user is not None:
+            return user
+    return None
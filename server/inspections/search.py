@@ -0,0 +1,79 @@
+"""
+Inspection search document.
+
+Inspection.search_text combines the inspection's code, law and status with
+its assignee's name/e-mail and its establishments' names, locations and
+business types, so inspection search filters one FULLTEXT-indexed column
+(see core/search.py) instead of joining users and the establishment M2M
+table and de-duplicating with DISTINCT.
+
+The document is refreshed from signals (see signals.py) when an inspection's
+own fields or establishment links change, and when an establishment or user
+it mentions is edited. rebuild_inspection_search_text() recomputes all of it.
+"""
+from core.search import search_document
+
+from .models import Inspection
+
+def search_key(inspection):
+    """Stored values the document depends on, compared to skip unrelated saves"""
+    return (inspection.code, inspection.law, inspection.current_status, inspection.assigned_to_id)
+
+
+def build_search_text(inspection, establishments=(), assigned_to=None):
+    """Text indexed for an inspection (establishments and assignee passed in to avoid queries)"""
+    parts = [
+        inspection.code,
+        inspection.law,
+        inspection.current_status,
+        inspection.get_current_status_display(),
+        getattr(assigned_to, 'first_name', None),
+        getattr(assigned_to, 'last_name', None),
+        getattr(assigned_to, 'email', None),
+    ]
+    for establishment in establishments:
+        parts += [establishment.name, establishment.city, establishment.province, establishment.nature_of_business]
+    return search_document(*parts)
+
+
+def refresh_inspection_search_text(inspection_ids):
+    """Recompute the documents of the given inspections (two reads, one bulk write)"""
+    inspection_ids = {pk for pk in inspection_ids if pk is not None}
+    if not inspection_ids:
+        return 0
+
+    inspections = Inspection.objects.filter(pk__in=inspection_ids).select_related('assigned_to').prefetch_related(
+        'establishments'
+    ).only(
+        'pk', 'code', 'law', 'current_status', 'search_text',
+        'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__email',
+    )
+    changed = []
+    for inspection in inspections:
+        text = build_search_text(inspection, inspection.establishments.all(), inspection.assigned_to)
+        if inspection.search_text != text:
+            inspection.search_text = text
+            changed.append(inspection)
+    if changed:
+        Inspection.objects.bulk_update(changed, ['search_text'])
+    return len(changed)
+
+
+def inspections_of_establishment(establishment_id):
+    return Inspection.establishments.through.objects.filter(establishment_id=establishment_id).values_list(
+        'inspection_id', flat=True
+    )
+
+
+def rebuild_inspection_search_text(batch_size=1000):
+    """
+    Recompute every inspection's document.
+
+    Returns:
+        int: Number of inspections updated
+    """
+    ids = list(Inspection.objects.order_by('pk').values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(ids), batch_size):
+        updated += refresh_inspection_search_text(ids[start:start + batch_size])
+    return updated
@@ -2,10 +2,13 @@
 Serializers for Refactored Inspection Models
 """
 from rest_framework import serializers
+from django.db import models
+from django.core.files.storage import default_storage
 from .models import (
     Inspection, InspectionForm, InspectionDocument, InspectionHistory,
     BillingRecord, NoticeOfViolation, NoticeOfOrder
 )
+from . import workflow
 from establishments.models import Establishment
 
 
@@ -47,12 +50,15 @@ class InspectionDocumentSerializer(serializers.ModelSerializer):
     """Serializer for inspection documents"""
     uploaded_by_name = serializers.SerializerMethodField()
     file_url = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
     
     class Meta:
         model = InspectionDocument
         fields = [
             'id', 'inspection_form', 'file', 'file_url', 'document_type',
-            'description', 'uploaded_by', 'uploaded_by_name', 'uploaded_at'
+            'description', 'uploaded_by', 'uploaded_by_name', 'uploaded_at',
+            'variants', 'thumbnail_url'
         ]
         read_only_fields = ['id', 'uploaded_at']
     
@@ -67,6 +73,29 @@ class InspectionDocumentSerializer(serializers.ModelSerializer):
             if request:
                 return request.build_absolute_uri(obj.file.url)
         return None
+    
+    def _storage_url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_variants(self, obj):
+        """URLs of the generated image variants, e.g. variants.thumbnail.webp"""
+        if not obj.variants:
+            return None
+        return {
+            variant: {fmt: self._storage_url(name) for fmt, name in formats.items()}
+            for variant, formats in obj.variants.items()
+            if isinstance(formats, dict)
+        }
+    
+    def get_thumbnail_url(self, obj):
+        """JPEG thumbnail (renders everywhere); falls back to the original image"""
+        thumbnail = (obj.variants or {}).get('thumbnail') or {}
+        name = thumbnail.get('jpeg') or thumbnail.get('webp')
+        if name:
+            return self._storage_url(name)
+        return self.get_file_url(obj) if obj.is_image else None
 
 
 class NoticeOfViolationSerializer(serializers.ModelSerializer):
@@ -122,10 +151,10 @@ class InspectionFormSerializer(serializers.ModelSerializer):
             'inspection', 'scheduled_at', 'checklist',
             'compliance_decision', 'violations_found', 'documents',
             'nov', 'noo', 'inspected_by', 'inspected_by_name', 'inspector_info',
-            'created_at', 'updated_at'
+            'revision', 'created_at', 'updated_at'
         ]
         read_only_fields = [
-            'created_at', 'updated_at', 'inspected_by'
+            'created_at', 'updated_at', 'inspected_by', 'revision'
         ]
     
     def get_checklist(self, obj):
@@ -183,6 +212,17 @@ class InspectionFormSerializer(serializers.ModelSerializer):
         return data
 
 
+class InspectionListSerializer(serializers.ListSerializer):
+    """Computes every row's available actions in one pass before serializing"""
+
+    def to_representation(self, data):
+        request = self.context.get('request')
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if request and getattr(request.user, 'is_authenticated', False):
+            self.available_actions = workflow.actions_for_many(items, request.user)
+        return super().to_representation(items)
+
+
 class InspectionSerializer(serializers.ModelSerializer):
     """Main inspection serializer with all related data"""
     
@@ -226,28 +266,36 @@ class InspectionSerializer(serializers.ModelSerializer):
             'previous_inspection_code', 'previous_inspection_date'
         ]
         read_only_fields = ['id', 'code', 'created_at', 'updated_at']
+        list_serializer_class = InspectionListSerializer
     
     def get_establishments(self, obj):
         """Get establishment IDs"""
         return list(obj.establishments.values_list('id', flat=True))
     
     def get_establishments_detail(self, obj):
-        """Get detailed establishment information"""
+        """Get detailed establishment information (polygons are left out of list rows - the map loads them per tile)"""
         establishments = obj.establishments.all()
-        return [{
-            'id': est.id,
-            'name': est.name,
-            'nature_of_business': est.nature_of_business,
-            'year_established': est.year_established,
-            'province': est.province,
-            'city': est.city,
-            'barangay': est.barangay,
-            'street_building': est.street_building,
-            'postal_code': est.postal_code,
-            'latitude': str(est.latitude),
-            'longitude': str(est.longitude),
-            'polygon': est.polygon,  # Add polygon data
-        } for est in establishments]
+        view = self.context.get('view')
+        include_polygon = getattr(view, 'action', None) != 'list'
+        details = []
+        for est in establishments:
+            detail = {
+                'id': est.id,
+                'name': est.name,
+                'nature_of_business': est.nature_of_business,
+                'year_established': est.year_established,
+                'province': est.province,
+                'city': est.city,
+                'barangay': est.barangay,
+                'street_building': est.street_building,
+                'postal_code': est.postal_code,
+                'latitude': str(est.latitude),
+                'longitude': str(est.longitude),
+            }
+            if include_polygon:
+                detail['polygon'] = est.polygon  # Add polygon data
+            details.append(detail)
+        return details
     
     def get_created_by_name(self, obj):
         if obj.created_by:
@@ -280,98 +328,15 @@ class InspectionSerializer(serializers.ModelSerializer):
         return False
 
     def get_available_actions(self, obj):
-        """Get available actions for current user"""
+        """Get available actions for current user (precomputed per page when listing)"""
         request = self.context.get('request')
         if not request or not request.user:
             return []
 
-        user = request.user
-        status = obj.current_status
-        
-        
-        # Define actions based on status and user level - 5 Button Strategy
-        actions_map = {
-            # Initial creation - Division Chief can assign to sections
-            ('CREATED', 'Division Chief'): ['forward'],
-            
-            # Section Chief workflow
-            ('SECTION_ASSIGNED', 'Section Chief'): ['inspect', 'forward'],
-            ('SECTION_IN_PROGRESS', 'Section Chief'): ['continue'],
-            ('SECTION_COMPLETED_COMPLIANT', 'Division Chief'): ['review'],  # NO forward, auto-assigned
-            ('SECTION_COMPLETED_NON_COMPLIANT', 'Division Chief'): ['review'],  # NO forward, auto-assigned
-            
-            # Unit Head workflow
-            ('UNIT_ASSIGNED', 'Unit Head'): ['inspect', 'forward', 'return_to_previous'],
-            ('UNIT_IN_PROGRESS', 'Unit Head'): ['continue', 'forward'],
-            ('UNIT_COMPLETED_COMPLIANT', 'Section Chief'): ['review'],  # NO forward, auto-assigned
-            ('UNIT_COMPLETED_NON_COMPLIANT', 'Section Chief'): ['review'],  # NO forward, auto-assigned
-            
-            # Monitoring Personnel workflow
-            ('MONITORING_ASSIGNED', 'Monitoring Personnel'): ['inspect'],
-            ('MONITORING_ASSIGNED', 'Monitoring Personnel'): ['inspect', 'return_to_previous'],
-            ('MONITORING_ASSIGNED', 'Unit Head'): ['forward', 'return_to_previous'],
-            ('MONITORING_IN_PROGRESS', 'Monitoring Personnel'): ['continue'],
-            ('MONITORING_COMPLETED_COMPLIANT', 'Unit Head'): ['review'],  # NO forward, auto-assigned
-            ('MONITORING_COMPLETED_NON_COMPLIANT', 'Unit Head'): ['review'],  # NO forward, auto-assigned
-            # Section Chief can review Monitoring completed when no Unit Head exists
-            ('MONITORING_COMPLETED_COMPLIANT', 'Section Chief'): ['review'],  # When no Unit Head
-            ('MONITORING_COMPLETED_NON_COMPLIANT', 'Section Chief'): ['review'],  # When no Unit Head
-            
-            # Review statuses (NO Forward button - removed as requested)
-            ('UNIT_REVIEWED', 'Section Chief'): ['review', 'return_to_monitoring'],
-            ('SECTION_REVIEWED', 'Division Chief'): ['review', 'return_to_unit'],
-            # DIVISION_REVIEWED actions depend on compliance status - handled separately below
-            ('DIVISION_REVIEWED', 'Division Chief'): ['return_to_section'],
-            
-            # Legal Unit actions
-            ('LEGAL_REVIEW', 'Legal Unit'): ['review'],
-            ('NOV_SENT', 'Legal Unit'): ['review'],
-            ('NOO_SENT', 'Legal Unit'): ['review', 'close'],
-        }
-        
-        key = (status, user.userlevel)
-        available_actions = actions_map.get(key, [])
-        
-        # Special case: DIVISION_REVIEWED - actions handled via manual buttons (review only)
-        if status == 'DIVISION_REVIEWED' and user.userlevel == 'Division Chief':
-            return available_actions
-        
-        # Special case: Monitoring Personnel with MONITORING_ASSIGNED status
-        if status == 'MONITORING_ASSIGNED' and user.userlevel == 'Monitoring Personnel':
-            actions = ['inspect']
-            if 'return_to_previous' in available_actions:
-                actions.append('return_to_previous')
-            return actions
-        
-        # Filter actions based on assignment status
-        if obj.assigned_to == user:
-            # User is assigned - can perform all available actions
-            return available_actions
-        else:
-            # User is not assigned - allow stage owners to take over or perform review/final actions
-            filtered_actions = []
-            for action in available_actions:
-                if action == 'inspect' and (
-                    (status == 'SECTION_ASSIGNED' and user.userlevel == 'Section Chief') or
-                    (status == 'UNIT_ASSIGNED' and user.userlevel == 'Unit Head') or
-                    (status == 'MONITORING_ASSIGNED' and user.userlevel == 'Monitoring Personnel')
-                ):
-                    filtered_actions.append(action)
-                elif action == 'forward' and user.userlevel in ['Section Chief', 'Unit Head', 'Division Chief']:
-                    filtered_actions.append(action)
-                elif action == 'review' and user.userlevel in ['Unit Head', 'Section Chief', 'Division Chief']:
-                    # Unit Head, Section Chief, and Division Chief can review inspections even if not assigned (for review tab)
-                    filtered_actions.append(action)
-                elif action == 'return_to_previous' and (
-                    (status == 'MONITORING_ASSIGNED' and user.userlevel == 'Unit Head') or
-                    (status == 'UNIT_ASSIGNED' and user.userlevel == 'Unit Head')
-                ):
-                    filtered_actions.append(action)
-                elif action in ['send_to_legal', 'close'] and user.userlevel == 'Division Chief':
-                    # Division Chief can perform these actions even if not directly assigned
-                    filtered_actions.append(action)
-            
-            return filtered_actions
+        precomputed = getattr(self.parent, 'available_actions', None)
+        if precomputed is not None and obj.pk in precomputed:
+            return precomputed[obj.pk]
+        return workflow.actions_for(obj.current_status, request.user.userlevel, obj.assigned_to_id == request.user.pk)
     
     def get_return_remarks(self, obj):
         """Get the most recent return remarks - only called when needed"""
@@ -553,7 +518,7 @@ class InspectionCreateSerializer(serializers.Serializer):
             
             # Send notifications to assigned Section Chief
             if inspection.assigned_to:
-                from notifications.models import Notification
+                from notifications.services import notify_user
                 from .utils import send_inspection_assignment_notification
                 import logging
                 
@@ -564,8 +529,8 @@ class InspectionCreateSerializer(serializers.Serializer):
                 establishment_list = ", ".join(establishment_names) if establishment_names else "No establishments"
                 
                 # Create system notification
-                Notification.objects.create(
-                    recipient=inspection.assigned_to,
+                notify_user(
+                    inspection.assigned_to,
                     sender=user,
                     notification_type='new_inspection',
                     title='New Inspection Assignment',
@@ -785,6 +750,35 @@ class LegalReportSerializer(serializers.ModelSerializer):
         return None
 
 
+class InspectionSearchSerializer(serializers.ModelSerializer):
+    """
+    Compact inspection row for global search results. Expects assigned_to
+    selected and establishments prefetched (no form, history or per-row queries).
+    """
+    establishments = serializers.SerializerMethodField()
+    assigned_to_name = serializers.SerializerMethodField()
+    simplified_status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Inspection
+        fields = [
+            'id', 'code', 'law', 'establishments', 'assigned_to', 'assigned_to_name',
+            'current_status', 'simplified_status', 'created_at',
+        ]
+        read_only_fields = fields
+
+    def get_establishments(self, obj):
+        return [{'id': est.id, 'name': est.name, 'city': est.city} for est in obj.establishments.all()]
+
+    def get_assigned_to_name(self, obj):
+        if obj.assigned_to:
+            return f"{obj.assigned_to.first_name} {obj.assigned_to.last_name}".strip() or obj.assigned_to.email
+        return None
+
+    def get_simplified_status(self, obj):
+        return obj.get_simplified_status()
+
+
 class DivisionReportSerializer(serializers.ModelSerializer):
     """Serializer for Division Report Generation with inspection data"""
     establishment_name = serializers.SerializerMethodField()
@@ -1,9 +1,13 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from django.utils import timezone
-from datetime import timedelta
-from .models import Inspection, InspectionHistory, ReinspectionSchedule
+from .models import Inspection, InspectionDocument, InspectionHistory
+from .reinspection import is_closing, schedule_reinspections
+from .roster import adjust_workload, invalidate_roster, is_open
+from .search import inspections_of_establishment, refresh_inspection_search_text, search_key
+from establishments.inspection_state import refresh_establishment_state
+from establishments.models import Establishment
 from audit.utils import log_activity
 import logging
 
@@ -33,51 +37,6 @@ def log_inspection_creation(sender, instance, created, **kwargs):
             logger.error(f"Failed to log inspection creation: {str(e)}")
 
 
-@receiver(post_save, sender=Inspection)
-def create_reinspection_schedule(sender, instance, created, **kwargs):
-    """Create reinspection schedule when inspection is closed"""
-    if not created and instance.current_status in ['CLOSED_COMPLIANT', 'CLOSED_NON_COMPLIANT']:
-        try:
-            # Determine compliance status and reinspection period
-            if instance.current_status == 'CLOSED_COMPLIANT':
-                compliance_status = 'COMPLIANT'
-                # 2-3 years for compliant (using 2.5 years as default)
-                reinspection_period = timedelta(days=912)  # ~2.5 years
-            else:  # CLOSED_NON_COMPLIANT
-                compliance_status = 'NON_COMPLIANT'
-                # 1 year for non-compliant
-                reinspection_period = timedelta(days=365)
-            
-            # Create reinspection schedule for each establishment
-            for establishment in instance.establishments.all():
-                due_date = timezone.now().date() + reinspection_period
-                
-                # Create or update reinspection schedule
-                schedule, created = ReinspectionSchedule.objects.get_or_create(
-                    establishment=establishment,
-                    original_inspection=instance,
-                    defaults={
-                        'compliance_status': compliance_status,
-                        'due_date': due_date,
-                        'status': 'PENDING'
-                    }
-                )
-                
-                if not created:
-                    # Update existing schedule if inspection was reopened and closed again
-                    schedule.compliance_status = compliance_status
-                    schedule.due_date = due_date
-                    schedule.status = 'PENDING'
-                    schedule.reminder_sent = False
-                    schedule.reminder_sent_date = None
-                    schedule.save()
-                
-                logger.info(f"Reinspection schedule created for {establishment.name} due {due_date}")
-                
-        except Exception as e:
-            logger.error(f"Failed to create reinspection schedule for {instance.code}: {str(e)}")
-
-
 @receiver(post_save, sender=InspectionHistory)
 def log_inspection_status_change(sender, instance, created, **kwargs):
     """Log inspection status changes"""
@@ -95,3 +54,155 @@ def log_inspection_status_change(sender, instance, created, **kwargs):
         except Exception as e:
             logger.error(f"Failed to log inspection status change: {str(e)}")
 
+
+
+@receiver(post_delete, sender=InspectionDocument)
+def delete_document_variants(sender, instance, **kwargs):
+    """Remove generated image variants when a document is deleted"""
+    if instance.variants:
+        try:
+            from core.image_pipeline import delete_variants
+            delete_variants(instance.variants)
+        except Exception as e:
+            logger.error(f"Failed to delete variants for document {instance.pk}: {str(e)}")
+
+
+def _workload_changes(previous, current):
+    """[(user_id, delta)] moving one open inspection between assignees' counters"""
+    if previous == current:
+        return []
+    (old_user, old_status), (new_user, new_status) = previous, current
+    changes = []
+    if old_user and is_open(old_status):
+        changes.append((old_user, -1))
+    if new_user and is_open(new_status):
+        changes.append((new_user, 1))
+    return changes
+
+
+def _apply_workload_changes(changes):
+    def apply():
+        for user_id, delta in changes:
+            adjust_workload(user_id, delta)
+
+    if changes:
+        transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=Inspection)
+def update_assignee_workload(sender, instance, created, **kwargs):
+    """Keep the roster's open-inspection counters in step with (re)assignments and closures"""
+    previous = getattr(instance, '_loaded_assignment', (None, None))
+    current = (instance.assigned_to_id, instance.current_status)
+    _apply_workload_changes(_workload_changes(previous, current))
+    instance._loaded_assignment = current
+
+
+@receiver(post_delete, sender=Inspection)
+def release_assignee_workload(sender, instance, **kwargs):
+    previous = getattr(instance, '_loaded_assignment', (instance.assigned_to_id, instance.current_status))
+    _apply_workload_changes(_workload_changes(previous, (None, None)))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def refresh_personnel_roster(sender, instance, **kwargs):
+    """Rebuild the assignment roster after any user change (logins excepted)"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    transaction.on_commit(invalidate_roster)
+
+
+@receiver(post_save, sender=Inspection)
+def refresh_on_status_change(sender, instance, created, **kwargs):
+    """Update the establishments' inspection state and reinspection schedules when the status changes"""
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.current_status
+    # New inspections have no establishments yet - m2m_changed covers them
+    if created or previous == instance.current_status:
+        return
+
+    refresh_establishment_state(instance.establishments.values_list('pk', flat=True))
+    if is_closing(previous, instance.current_status):
+        try:
+            scheduled = schedule_reinspections([instance])
+            logger.info(f"Scheduled {scheduled} reinspection(s) for {instance.code}")
+        except Exception as e:
+            logger.error(f"Failed to create reinspection schedule for {instance.code}: {str(e)}")
+
+
+@receiver(m2m_changed, sender=Inspection.establishments.through)
+def refresh_establishments_on_link_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Update the inspection state of establishments added to/removed from an inspection"""
+    if reverse:
+        # instance is an Establishment
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_establishment_state([instance.pk])
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_establishment_ids = list(instance.establishments.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_establishment_state(getattr(instance, '_cleared_establishment_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_establishment_state(pk_set or [])
+
+
+@receiver(pre_delete, sender=Inspection)
+def remember_inspection_establishments(sender, instance, **kwargs):
+    instance._deleted_establishment_ids = list(instance.establishments.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Inspection)
+def refresh_establishments_on_delete(sender, instance, **kwargs):
+    refresh_establishment_state(getattr(instance, '_deleted_establishment_ids', []))
+
+
+# Search documents ------------------------------------------------------------
+
+@receiver(post_save, sender=Inspection)
+def refresh_search_on_save(sender, instance, created, **kwargs):
+    """Rebuild the inspection's search document when its code, law, status or assignee changes"""
+    previous = getattr(instance, '_loaded_search_key', None)
+    current = search_key(instance)
+    instance._loaded_search_key = current
+    if created or previous != current:
+        refresh_inspection_search_text([instance.pk])
+
+
+@receiver(m2m_changed, sender=Inspection.establishments.through)
+def refresh_search_on_link_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Rebuild the search documents of inspections whose establishments changed"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_inspection_search_text([instance.pk])
+        return
+
+    # instance is an Establishment
+    if action == 'pre_clear':
+        instance._cleared_inspection_ids = list(inspections_of_establishment(instance.pk))
+    elif action == 'post_clear':
+        refresh_inspection_search_text(getattr(instance, '_cleared_inspection_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_inspection_search_text(pk_set or [])
+
+
+@receiver(post_save, sender=Establishment)
+def refresh_search_on_establishment_change(sender, instance, created, **kwargs):
+    """Re-index an establishment's inspections after its name, address or business changes"""
+    previous = getattr(instance, '_loaded_search_text', None)
+    instance._loaded_search_text = instance.search_text
+    if not created and previous != instance.search_text:
+        refresh_inspection_search_text(inspections_of_establishment(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def refresh_search_on_assignee_change(sender, instance, created, **kwargs):
+    """Re-index a user's assigned inspections after their name or e-mail changes"""
+    previous = getattr(instance, '_loaded_search_text', None)
+    instance._loaded_search_text = instance.search_text
+    if not created and previous != instance.search_text:
+        refresh_inspection_search_text(
+            Inspection.objects.filter(assigned_to=instance).values_list('pk', flat=True)
+        )
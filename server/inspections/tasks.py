@@ -23,3 +23,106 @@ def send_nov_compliance_reminders():
         logger.error(f"Error in NOV compliance reminder task: {str(e)}")
         raise
 
+
+
+@shared_task
+def generate_document_variants(document_id):
+    """
+    Build thumbnail/medium WebP + JPEG variants for an inspection photo.
+    Queued after upload so the request does not wait on image processing.
+    """
+    from core.image_pipeline import build_variants, delete_variants
+    from .models import InspectionDocument
+
+    document = InspectionDocument.objects.filter(pk=document_id).first()
+    if not document or not document.is_image:
+        return None
+
+    try:
+        with document.file.open('rb') as source:
+            variants = build_variants(source, document.get_variant_storage_prefix())
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not generate variants for document {document_id}: {str(e)}")
+        return None
+
+    # The document may have been deleted while variants were being rendered
+    updated = InspectionDocument.objects.filter(pk=document_id).update(variants=variants)
+    if not updated:
+        delete_variants(variants)
+        return None
+    return variants
+
+
+
+@shared_task
+def cleanup_stale_uploads():
+    """
+    Garbage-collect abandoned chunked uploads and their staging files.
+    This task runs hourly via Celery Beat.
+    """
+    from .uploads import cleanup_stale_uploads as cleanup
+
+    removed = cleanup()
+    if removed:
+        logger.info(f"Removed {removed} stale document upload(s)")
+    return removed
+
+
+@shared_task
+def flush_inspection_events():
+    """
+    Write buffered auto-save/draft history and audit events in bulk.
+    This task runs every INSPECTION_EVENT_FLUSH_SECONDS via Celery Beat.
+    """
+    from .event_buffer import flush_inspection_events as flush
+
+    written = flush()
+    if written:
+        logger.info(f"Flushed {written} buffered inspection event(s)")
+    return written
+
+
+@shared_task
+def reconcile_workloads():
+    """
+    Rewrite cached open-inspection counters used for assignee selection.
+    This task runs hourly via Celery Beat.
+    """
+    from .roster import reconcile_workloads as reconcile
+
+    written = reconcile()
+    logger.info(f"Reconciled inspection workload counters for {written} user(s)")
+    return written
+
+
+@shared_task
+def evaluate_previous_quarter():
+    """
+    Evaluate every law for the quarter that has just ended.
+    This task runs daily via Celery Beat; quarters that already have an
+    evaluation (e.g. evaluated manually) are left as they are.
+    """
+    from .quota_evaluation import evaluate_quarters, previous_quarter
+
+    year, quarter = previous_quarter()
+    evaluations = evaluate_quarters(year, quarter, overwrite=False)
+    logger.info(f"Quarter evaluation for Q{quarter} {year} covers {len(evaluations)} law(s)")
+    return len(evaluations)
+
+
+@shared_task
+def sweep_deadlines():
+    """
+    Notify the Legal Unit of expired NOV compliance deadlines and Division
+    Chiefs of upcoming reinspections, each in one batch.
+    This task runs daily via Celery Beat.
+    """
+    from .deadlines import sweep_compliance_deadlines, sweep_reinspection_reminders
+
+    expired = sweep_compliance_deadlines()
+    reminded = sweep_reinspection_reminders()
+    logger.info(
+        f"Deadline sweep: {len(expired)} expired compliance deadline(s), "
+        f"{len(reminded)} reinspection reminder(s)"
+    )
+    return {'expired': len(expired), 'reinspections': len(reminded)}
@@ -0,0 +1,220 @@
+"""
+Chunked, resumable uploads for inspection documents.
+
+A client initiates an upload, sends the file as numbered chunks (each with a
+SHA-256 checksum) and then completes it. Chunks are appended to a private
+staging file outside MEDIA_ROOT; on completion the staging file is moved into
+storage as a regular InspectionDocument.
+"""
+import hashlib
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DocumentUpload, InspectionDocument, InspectionForm
+
+logger = logging.getLogger(__name__)
+
+
+class UploadError(Exception):
+    """Raised when a chunk or completion request cannot be accepted"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StagedFile(File):
+    """File wrapper that lets FileSystemStorage move the staging file instead of copying it"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def get_staging_path(upload):
+    """Absolute path of the staging file for an upload"""
+    return os.path.join(settings.UPLOAD_STAGING_DIR, f"{upload.id}.part")
+
+
+def initiate_upload(inspection, user, file_name, total_size, document_type='OTHER', description='', checksum=''):
+    """Create a staging record and an empty staging file"""
+    if not file_name:
+        raise UploadError('file_name is required')
+    try:
+        total_size = int(total_size)
+    except (TypeError, ValueError):
+        raise UploadError('total_size must be an integer')
+    if total_size <= 0:
+        raise UploadError('total_size must be greater than zero')
+    if total_size > settings.UPLOAD_MAX_FILE_SIZE:
+        raise UploadError(f'File exceeds the {settings.UPLOAD_MAX_FILE_SIZE // (1024 * 1024)}MB limit')
+
+    valid_types = {choice for choice, _ in InspectionDocument.DOCUMENT_TYPE_CHOICES}
+    if document_type not in valid_types:
+        document_type = 'OTHER'
+
+    upload = DocumentUpload.objects.create(
+        inspection=inspection,
+        uploaded_by=user,
+        file_name=os.path.basename(file_name)[:255],
+        total_size=total_size,
+        checksum=(checksum or '').lower(),
+        document_type=document_type,
+        description=(description or '')[:255],
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+    )
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    open(get_staging_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload_id, index, chunk_file, checksum):
+    """
+    Append chunk number `index` to the staging file.
+
+    Chunks must arrive in order. Re-sending a chunk that was already stored
+    is acknowledged without writing, so clients can safely retry.
+    """
+    if not checksum:
+        raise UploadError('checksum (SHA-256 of the chunk) is required')
+
+    with transaction.atomic():
+        # Row lock serializes concurrent retries of the same chunk
+        upload = DocumentUpload.objects.select_for_update().get(pk=upload_id)
+        if upload.status != 'PENDING':
+            raise UploadError('Upload is already completed', status_code=409)
+        if index < upload.next_index:
+            return upload
+        if index > upload.next_index:
+            raise UploadError(f'Expected chunk {upload.next_index}, got {index}', status_code=409)
+
+        data = chunk_file.read(upload.chunk_size + 1)
+        is_last = index == upload.total_chunks - 1
+        if len(data) > upload.chunk_size or (not is_last and len(data) != upload.chunk_size):
+            raise UploadError(f'Chunk {index} must be {upload.chunk_size} bytes')
+        if upload.received_bytes + len(data) > upload.total_size:
+            raise UploadError('Chunk exceeds the declared file size')
+        if hashlib.sha256(data).hexdigest() != checksum.lower():
+            raise UploadError(f'Checksum mismatch for chunk {index}')
+
+        staging_path = get_staging_path(upload)
+        with open(staging_path, 'r+b') as f:
+            # Truncate any bytes left over from an interrupted write
+            f.truncate(upload.received_bytes)
+            f.seek(upload.received_bytes)
+            f.write(data)
+
+        upload.received_bytes += len(data)
+        upload.next_index += 1
+        upload.save(update_fields=['received_bytes', 'next_index', 'updated_at'])
+        return upload
+
+
+def _verify_complete(upload):
+    """Check the staging file is whole and matches the declared checksum"""
+    if upload.status != 'PENDING':
+        raise UploadError(f'Upload {upload.id} is already completed', status_code=409)
+    if not upload.is_complete:
+        raise UploadError(
+            f'Upload {upload.id} is incomplete ({upload.received_bytes}/{upload.total_size} bytes)',
+            status_code=409,
+        )
+    if upload.checksum:
+        digest = hashlib.sha256()
+        with open(get_staging_path(upload), 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        if digest.hexdigest() != upload.checksum:
+            raise UploadError(f'Checksum mismatch for {upload.file_name}')
+
+
+def complete_uploads(inspection, upload_ids, user):
+    """
+    Finalize one or more uploads of an inspection into InspectionDocuments
+    in a single transaction.
+
+    Either every upload becomes a document or none do.
+    """
+    moved = []
+    try:
+        with transaction.atomic():
+            uploads = list(
+                DocumentUpload.objects.select_for_update()
+                .filter(pk__in=upload_ids, inspection=inspection, uploaded_by=user)
+            )
+            if len(uploads) != len(set(upload_ids)):
+                raise UploadError('One or more uploads were not found', status_code=404)
+
+            for upload in uploads:
+                _verify_complete(upload)
+
+            form, _ = InspectionForm.objects.get_or_create(inspection=inspection)
+            documents = []
+            for upload in uploads:
+                document = InspectionDocument(
+                    inspection_form=form,
+                    document_type=upload.document_type,
+                    description=upload.description,
+                    uploaded_by=user,
+                )
+                staging_path = get_staging_path(upload)
+                with open(staging_path, 'rb') as staged:
+                    document.file.save(upload.file_name, StagedFile(staged), save=False)
+                moved.append((document.file.name, staging_path))
+                document.save()
+                documents.append(document)
+
+                upload.status = 'COMPLETED'
+                upload.document = document
+                upload.save(update_fields=['status', 'document', 'updated_at'])
+            return documents
+    except Exception:
+        # The transaction rolled back - put staged files back so the uploads can be retried
+        for name, staging_path in moved:
+            try:
+                os.replace(default_storage.path(name), staging_path)
+            except (OSError, NotImplementedError):
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+        raise
+
+
+def abort_upload(upload):
+    """Discard a pending upload and its staging file"""
+    staging_path = get_staging_path(upload)
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+    upload.delete()
+
+
+def cleanup_stale_uploads(max_age_hours=None):
+    """
+    Delete pending uploads that have not received a chunk recently, plus any
+    completed records whose staging file has already been moved.
+
+    Returns:
+        int: Number of upload records removed
+    """
+    max_age_hours = max_age_hours or settings.UPLOAD_SESSION_TTL_HOURS
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    stale = DocumentUpload.objects.filter(updated_at__lt=cutoff)
+
+    removed_ids = []
+    for upload in stale.iterator():
+        staging_path = get_staging_path(upload)
+        if os.path.exists(staging_path):
+            try:
+                os.remove(staging_path)
+            except OSError as e:
+                logger.warning(f"Could not remove staging file {staging_path}: {str(e)}")
+                continue
+        removed_ids.append(upload.pk)
+
+    DocumentUpload.objects.filter(pk__in=removed_ids).delete()
+    return len(removed_ids)
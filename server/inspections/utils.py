@@ -10,6 +10,80 @@ from django.utils.html import strip_tags, linebreaks
 logger = logging.getLogger(__name__)
 
 
+def build_notice_email(subject, body, recipient_email, notice_type='NOV', context=None):
+    """
+    Build (without sending) a NOV/NOO notice e-mail from the government-style templates.
+    
+    Args:
+        subject: Email subject line
+        body: Plain text body (used as fallback)
+        recipient_email: Recipient email address
+        notice_type: 'NOV', 'NOO' or 'NOV_REMINDER'
+        context: Dictionary with template context variables
+    
+    Raises:
+        ValueError: If the recipient email is empty
+    """
+    # Validate recipient email
+    if not recipient_email or not recipient_email.strip():
+        raise ValueError("Recipient email is required and cannot be empty")
+    
+    recipient_email = recipient_email.strip()
+    
+    # Prepare context for template
+    template_context = context or {}
+    
+    # Add default values if not provided
+    from django.utils import timezone
+    from django.contrib.humanize.templatetags.humanize import intcomma
+    from decimal import Decimal
+    
+    template_context.setdefault('site_url', getattr(settings, 'FRONTEND_URL', 'http://localhost:3000'))
+    template_context.setdefault('current_year', timezone.now().year)
+    
+    # Format penalty fees with comma separators if it's a number
+    if 'penalty_fees' in template_context:
+        try:
+            penalty = template_context['penalty_fees']
+            if isinstance(penalty, (int, float, Decimal)):
+                template_context['penalty_fees'] = f"{float(penalty):,.2f}"
+        except Exception:
+            pass
+    
+    # Select template based on notice type
+    if notice_type.upper() == 'NOO':
+        template_name = 'emails/notice_of_order.html'
+    elif notice_type.upper() == 'NOV_REMINDER':
+        template_name = 'emails/nov_compliance_reminder.html'
+    else:
+        template_name = 'emails/notice_of_violation.html'
+    
+    # Render HTML template
+    try:
+        html_body = render_to_string(template_name, template_context)
+    except Exception as template_error:
+        logger.warning(f"Failed to render email template, using plain text fallback: {str(template_error)}")
+        # Fallback to plain text with linebreaks
+        html_body = linebreaks(body)
+    
+    # Create plain text version from HTML
+    plain_text = strip_tags(html_body)
+    # Clean up plain text formatting
+    import re
+    plain_text = re.sub(r'\n\s*\n', '\n\n', plain_text)
+    plain_text = plain_text.strip()
+    
+    # Create email
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=plain_text,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient_email],
+    )
+    email.attach_alternative(html_body, "text/html")
+    return email
+
+
 def send_notice_email(subject, body, recipient_email, notice_type='NOV', context=None):
     """
     Send NOV/NOO notices to establishments using professional government-style templates.
@@ -22,10 +96,7 @@ def send_notice_email(subject, body, recipient_email, notice_type='NOV', context
         context: Dictionary with template context variables
     """
     try:
-        # Validate recipient email
-        if not recipient_email or not recipient_email.strip():
-            raise ValueError("Recipient email is required and cannot be empty")
-        
+        email = build_notice_email(subject, body, recipient_email, notice_type, context)
         recipient_email = recipient_email.strip()
         
         # Check email backend configuration
@@ -37,58 +108,6 @@ def send_notice_email(subject, body, recipient_email, notice_type='NOV', context
             logger.warning(f"Email backend is set to console - email will not actually be sent to {recipient_email}")
             logger.warning("Please configure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD in settings or environment variables")
         
-        # Prepare context for template
-        template_context = context or {}
-        
-        # Add default values if not provided
-        from django.utils import timezone
-        from django.contrib.humanize.templatetags.humanize import intcomma
-        from decimal import Decimal
-        
-        template_context.setdefault('site_url', getattr(settings, 'FRONTEND_URL', 'http://localhost:3000'))
-        template_context.setdefault('current_year', timezone.now().year)
-        
-        # Format penalty fees with comma separators if it's a number
-        if 'penalty_fees' in template_context:
-            try:
-                penalty = template_context['penalty_fees']
-                if isinstance(penalty, (int, float, Decimal)):
-                    template_context['penalty_fees'] = f"{float(penalty):,.2f}"
-            except Exception:
-                pass
-        
-        # Select template based on notice type
-        if notice_type.upper() == 'NOO':
-            template_name = 'emails/notice_of_order.html'
-        elif notice_type.upper() == 'NOV_REMINDER':
-            template_name = 'emails/nov_compliance_reminder.html'
-        else:
-            template_name = 'emails/notice_of_violation.html'
-        
-        # Render HTML template
-        try:
-            html_body = render_to_string(template_name, template_context)
-        except Exception as template_error:
-            logger.warning(f"Failed to render email template, using plain text fallback: {str(template_error)}")
-            # Fallback to plain text with linebreaks
-            html_body = linebreaks(body)
-        
-        # Create plain text version from HTML
-        plain_text = strip_tags(html_body)
-        # Clean up plain text formatting
-        import re
-        plain_text = re.sub(r'\n\s*\n', '\n\n', plain_text)
-        plain_text = plain_text.strip()
-        
-        # Create email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=plain_text,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient_email],
-        )
-        email.attach_alternative(html_body, "text/html")
-        
         logger.info(f"Sending {notice_type} email to {recipient_email} with subject '{subject}' using backend {backend_name}")
         email.send(fail_silently=False)
         logger.info(f"Notice email sent successfully to {recipient_email} with subject '{subject}'")
@@ -334,7 +353,7 @@ def create_completion_notification(recipient, inspection, completed_by, completi
     Create in-app notification when inspection is completed (both compliant and non-compliant)
     """
     try:
-        from notifications.models import Notification
+        from notifications.services import notify_user
         
         # Get establishment names
         establishment_names = [est.name for est in inspection.establishments.all()]
@@ -352,8 +371,8 @@ def create_completion_notification(recipient, inspection, completed_by, completi
             message += f" Remarks: {remarks}"
         
         # Create notification
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify_user(
+            recipient,
             sender=completed_by,
             notification_type='inspection_completed',
             title=f'Inspection Completed ({compliance_text})',
@@ -436,7 +455,7 @@ def create_review_notification(recipient, inspection, reviewer, review_status, r
     Create in-app notification when inspection review is completed and forwarded (both compliant and non-compliant)
     """
     try:
-        from notifications.models import Notification
+        from notifications.services import notify_user
         
         # Get establishment names
         establishment_names = [est.name for est in inspection.establishments.all()]
@@ -450,8 +469,8 @@ def create_review_notification(recipient, inspection, reviewer, review_status, r
             message += f" Remarks: {remarks}"
         
         # Create notification
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify_user(
+            recipient,
             sender=reviewer,
             notification_type='inspection_review',
             title='Inspection Review Required',
@@ -473,7 +492,7 @@ def create_forward_notification(recipient, inspection, forwarded_by, remarks=Non
     Create in-app notification when inspection is forwarded to a user
     """
     try:
-        from notifications.models import Notification
+        from notifications.services import notify_user
 
         # Get establishment names
         establishment_names = [est.name for est in inspection.establishments.all()]
@@ -487,8 +506,8 @@ def create_forward_notification(recipient, inspection, forwarded_by, remarks=Non
             message += f" Remarks: {remarks}"
 
         # Create notification
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify_user(
+            recipient,
             sender=forwarded_by,
             notification_type='inspection_forward',
             title='Inspection Forwarded to You',
@@ -510,7 +529,7 @@ def create_return_notification(recipient, inspection, returned_by, return_status
     Create in-app notification when inspection is returned for additional action.
     """
     try:
-        from notifications.models import Notification
+        from notifications.services import notify_user
 
         establishment_names = [est.name for est in inspection.establishments.all()]
         establishment_list = ", ".join(establishment_names) if establishment_names else "No establishments"
@@ -541,8 +560,8 @@ def create_return_notification(recipient, inspection, returned_by, return_status
         if remarks:
             message += f" Remarks: {remarks}"
 
-        notification = Notification.objects.create(
-            recipient=recipient,
+        notification = notify_user(
+            recipient,
             sender=returned_by,
             notification_type='inspection_return',
             title='Inspection Returned for Corrections',
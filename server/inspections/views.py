@@ -2,11 +2,12 @@
 Refactored Inspection Views with Complete Workflow
 """
 import logging
+import uuid
 
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Exists, OuterRef, Prefetch
+from django.db.models import Q, F, Exists, OuterRef, Prefetch
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -14,14 +15,23 @@ from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.models import ActivityLog
 from audit.serializers import ActivityLogSerializer
 from audit.utils import log_activity
+from core.background import dispatch_on_commit
+from core.pagination import CursorPaginationMixin, keyset_ordering
+from core.search import search_filter
 
-from .models import Inspection, InspectionForm, InspectionDocument, InspectionHistory, NoticeOfViolation, NoticeOfOrder, BillingRecord
+from .models import Inspection, InspectionForm, InspectionDocument, InspectionHistory, NoticeOfViolation, NoticeOfOrder, BillingRecord, DocumentUpload
 from .serializers import (
     InspectionSerializer, InspectionCreateSerializer, InspectionFormSerializer,
     InspectionHistorySerializer, InspectionDocumentSerializer,
     InspectionActionSerializer, NOVSerializer, NOOSerializer, BillingRecordSerializer,
     SignatureUploadSerializer, RecommendationSerializer, LegalReportSerializer, DivisionReportSerializer
 )
+from . import analytics, deadlines, quota_evaluation, workflow
+from .event_buffer import record_inspection_event
+from .roster import COMBINED_SECTION, candidates, get_workloads, least_loaded, pick_assignee, section_for_law
+from .json_patch import PatchError, apply_json_patch, apply_merge_patch, touched_top_level_keys
+from .tasks import generate_document_variants
+from .uploads import UploadError, initiate_upload, append_chunk, complete_uploads, abort_upload
 from .utils import (
     send_inspection_forward_notification,
     create_forward_notification,
@@ -43,6 +53,12 @@ def capture_inspector_info(form, user):
     return False  # Not first fill-out
 
 
+def queue_document_variants(document):
+    """Queue thumbnail/medium variant generation for image documents"""
+    if document.is_image:
+        dispatch_on_commit(generate_document_variants, document.id)
+
+
 def audit_inspection_event(user, inspection, action, description, request, metadata=None):
     """Helper to standardize inspection audit logging."""
     reference = getattr(inspection, "reference_no", None) or getattr(inspection, "reference_number", None)
@@ -66,7 +82,7 @@ def audit_inspection_event(user, inspection, action, description, request, metad
     )
 
 
-class InspectionViewSet(viewsets.ModelViewSet):
+class InspectionViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     Complete Inspection ViewSet with workflow state machine
     """
@@ -155,8 +171,16 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Call the parent update method for other fields
         return super().update(request, *args, **kwargs)
     
+    def get_cursor_ordering(self):
+        """Keyset ordering matching get_queryset's order_by/order_direction (code is nullable)"""
+        order_by = self.request.query_params.get('order_by', 'created_at')
+        if order_by not in ['created_at', 'updated_at', 'current_status', 'law']:
+            order_by = 'created_at'
+        descending = self.request.query_params.get('order_direction', 'desc') == 'desc'
+        return keyset_ordering(order_by, descending)
+    
     def list(self, request, *args, **kwargs):
-        """List inspections with pagination"""
+        """List inspections with pagination (?pagination=cursor for keyset pages)"""
         queryset = self.filter_queryset(self.get_queryset())
         
         page = self.paginate_queryset(queryset)
@@ -703,31 +727,11 @@ class InspectionViewSet(viewsets.ModelViewSet):
         """
         Apply comprehensive search across multiple fields
         Searches: Code, Establishment names, Law, Status, Assigned To
+
+        All of these are part of the maintained search_text document (see
+        search.py), so no establishment/user joins or DISTINCT are needed.
         """
-        # Build complex Q query for OR search
-        search_query = Q()
-        
-        # Search in inspection code
-        search_query |= Q(code__icontains=search_term)
-        
-        # Search in law field
-        search_query |= Q(law__icontains=search_term)
-        
-        # Search in current status
-        search_query |= Q(current_status__icontains=search_term)
-        
-        # Search in assigned user's name
-        search_query |= Q(assigned_to__first_name__icontains=search_term)
-        search_query |= Q(assigned_to__last_name__icontains=search_term)
-        search_query |= Q(assigned_to__email__icontains=search_term)
-        
-        # Search in establishments (name, city, province, nature of business)
-        search_query |= Q(establishments__name__icontains=search_term)
-        search_query |= Q(establishments__city__icontains=search_term)
-        search_query |= Q(establishments__province__icontains=search_term)
-        search_query |= Q(establishments__nature_of_business__icontains=search_term)
-        
-        return queryset.filter(search_query).distinct()
+        return queryset.filter(search_filter(search_term))
     
     def get_serializer_class(self):
         """Use different serializers for different actions"""
@@ -776,10 +780,126 @@ class InspectionViewSet(viewsets.ModelViewSet):
             description=description,
             uploaded_by=request.user
         )
+        queue_document_variants(document)
         
         serializer = InspectionDocumentSerializer(document, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @staticmethod
+    def _serialize_upload(upload):
+        return {
+            'upload_id': str(upload.id),
+            'file_name': upload.file_name,
+            'total_size': upload.total_size,
+            'received_bytes': upload.received_bytes,
+            'chunk_size': upload.chunk_size,
+            'total_chunks': upload.total_chunks,
+            'next_index': upload.next_index,
+            'status': upload.status,
+        }
+    
+    def _get_pending_upload(self, request, inspection, upload_id):
+        return DocumentUpload.objects.filter(
+            pk=upload_id, inspection=inspection, uploaded_by=request.user
+        ).first()
+    
+    @action(detail=True, methods=['post'], url_path='uploads')
+    def start_upload(self, request, pk=None):
+        """
+        Start a chunked, resumable document upload.
+        Body: file_name, total_size, document_type, description, checksum (optional SHA-256 of the whole file)
+        """
+        inspection = self.get_object()
+        try:
+            upload = initiate_upload(
+                inspection,
+                request.user,
+                file_name=request.data.get('file_name'),
+                total_size=request.data.get('total_size'),
+                document_type=request.data.get('document_type', 'OTHER'),
+                description=request.data.get('description', ''),
+                checksum=request.data.get('checksum', ''),
+            )
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self._serialize_upload(upload), status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get', 'delete'], url_path=r'uploads/(?P<upload_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})')
+    def upload_status(self, request, pk=None, upload_id=None):
+        """Get upload progress (to resume after a dropped connection) or abort the upload"""
+        inspection = self.get_object()
+        upload = self._get_pending_upload(request, inspection, upload_id)
+        if not upload:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.method == 'DELETE':
+            abort_upload(upload)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(self._serialize_upload(upload))
+    
+    @action(
+        detail=True, methods=['post', 'put'],
+        url_path=r'uploads/(?P<upload_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})/chunks/(?P<index>\d+)'
+    )
+    def upload_chunk(self, request, pk=None, upload_id=None, index=None):
+        """
+        Upload chunk N of a file as multipart field `chunk` with its SHA-256 in `checksum`.
+        Chunks must be sent in order; re-sending a stored chunk is a no-op.
+        """
+        inspection = self.get_object()
+        if not self._get_pending_upload(request, inspection, upload_id):
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        chunk = request.FILES.get('chunk')
+        if not chunk:
+            return Response({'error': 'No chunk provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        checksum = request.data.get('checksum') or request.headers.get('X-Chunk-Checksum')
+        try:
+            upload = append_chunk(upload_id, int(index), chunk, checksum)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self._serialize_upload(upload))
+    
+    @action(detail=True, methods=['post'], url_path=r'uploads/(?P<upload_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})/complete')
+    def complete_upload(self, request, pk=None, upload_id=None):
+        """Finalize a fully received upload into an inspection document"""
+        inspection = self.get_object()
+        try:
+            documents = complete_uploads(inspection, [upload_id], request.user)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        
+        queue_document_variants(documents[0])
+        serializer = InspectionDocumentSerializer(documents[0], context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'], url_path='uploads/complete-batch')
+    def complete_upload_batch(self, request, pk=None):
+        """
+        Finalize several uploads at once. All documents are created in one
+        transaction; if any upload is incomplete, none are created.
+        Body: upload_ids (list)
+        """
+        inspection = self.get_object()
+        upload_ids = request.data.get('upload_ids')
+        if not isinstance(upload_ids, list) or not upload_ids:
+            return Response({'error': 'upload_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload_ids = [str(uuid.UUID(str(upload_id))) for upload_id in upload_ids]
+        except ValueError:
+            return Response({'error': 'Invalid upload id'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            documents = complete_uploads(inspection, upload_ids, request.user)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        
+        for document in documents:
+            queue_document_variants(document)
+        serializer = InspectionDocumentSerializer(documents, many=True, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'], url_path='findings/documents')
     def findings_documents(self, request, pk=None):
         """Upload finding documents with system association"""
@@ -814,6 +934,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
         metadata = f"system_id:{system_id}|finding_type:{finding_type}|caption:{caption}"
         document.description = metadata
         document.save()
+        queue_document_variants(document)
         
         serializer = InspectionDocumentSerializer(document, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -868,6 +989,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             metadata = f"system_id:{system_id}|finding_type:{finding_type}|caption:{caption}"
             document.description = metadata
             document.save()
+            queue_document_variants(document)
             
             serializer = InspectionDocumentSerializer(document, context={'request': request})
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -913,19 +1035,13 @@ class InspectionViewSet(viewsets.ModelViewSet):
         inspection = self.get_object()
         user = request.user
         
-        valid_statuses = ['SECTION_ASSIGNED', 'UNIT_ASSIGNED', 'MONITORING_ASSIGNED']
-        if inspection.current_status not in valid_statuses:
+        if not workflow.allows('start', inspection.current_status):
             return Response(
                 {'error': f'Cannot inspect from status {inspection.current_status}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        status_map = {
-            'SECTION_ASSIGNED': 'SECTION_IN_PROGRESS',
-            'UNIT_ASSIGNED': 'UNIT_IN_PROGRESS',
-            'MONITORING_ASSIGNED': 'MONITORING_IN_PROGRESS',
-        }
-        next_status = status_map.get(inspection.current_status)
+        next_status = workflow.start_status(inspection.current_status)
 
         if not inspection.can_transition_to(next_status, user):
             return Response(
@@ -993,13 +1109,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             inspection.assigned_to = user
         
         # Determine next status
-        status_map = {
-            'SECTION_ASSIGNED': 'SECTION_IN_PROGRESS',
-            'UNIT_ASSIGNED': 'UNIT_IN_PROGRESS',
-            'MONITORING_ASSIGNED': 'MONITORING_IN_PROGRESS',
-        }
-        
-        next_status = status_map.get(inspection.current_status)
+        next_status = workflow.start_status(inspection.current_status)
         if not next_status:
             return Response(
                 {'error': f'Cannot start from status {inspection.current_status}'},
@@ -1191,7 +1301,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         
         # Only allow for MONITORING_IN_PROGRESS status
-        if inspection.current_status != 'MONITORING_IN_PROGRESS':
+        if not workflow.allows('continue', inspection.current_status):
             return Response(
                 {'error': f'Cannot continue from status {inspection.current_status}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -1292,36 +1402,25 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 changed_by=user,
                 remarks='Status changed to In Progress when draft was saved'
             )
-            audit_metadata = {
-                "previous_status": prev_status,
-                "new_status": inspection.current_status,
-                "remarks": "Status changed to In Progress when draft was saved",
-                "draft": True,
-            }
-        else:
-            # Log draft save without status change
-            InspectionHistory.objects.create(
-                inspection=inspection,
-                previous_status=inspection.current_status,
-                new_status=inspection.current_status,
-                changed_by=user,
-                remarks='Saved inspection form as draft'
+            audit_inspection_event(
+                user,
+                inspection,
+                AUDIT_ACTIONS["UPDATE"],
+                f"{user.email} saved inspection draft",
+                request,
+                metadata={
+                    "previous_status": prev_status,
+                    "new_status": inspection.current_status,
+                    "remarks": "Status changed to In Progress when draft was saved",
+                    "draft": True,
+                },
             )
-            audit_metadata = {
-                "previous_status": inspection.current_status,
-                "new_status": inspection.current_status,
-                "remarks": "Saved inspection form as draft",
-                "draft": True,
-            }
-
-        audit_inspection_event(
-            user,
-            inspection,
-            AUDIT_ACTIONS["UPDATE"],
-            f"{user.email} saved inspection draft",
-            request,
-            metadata=audit_metadata,
-        )
+        else:
+            # Plain draft saves are frequent - buffer the history/audit marker
+            try:
+                record_inspection_event(inspection, user, 'draft_save', request)
+            except Exception as e:
+                logger.error(f"Failed to buffer draft-save event for inspection {inspection.id}: {str(e)}")
         
         serializer = self.get_serializer(inspection)
         return Response({
@@ -1359,8 +1458,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Store all form data in the checklist JSON field
-        form.checklist = {
+        sections = {
             'general': form_data.get('general', {}),
             'purpose': form_data.get('purpose', {}),
             'permits': form_data.get('permits', []),
@@ -1370,6 +1468,21 @@ class InspectionViewSet(viewsets.ModelViewSet):
             'lawFilter': form_data.get('lawFilter', []),
             'findingImages': form_data.get('findingImages', {}),
             'generalFindings': form_data.get('generalFindings', []),
+        }
+        
+        # Unchanged auto-save - skip the write entirely
+        current = form.checklist or {}
+        if not created and current.get('is_draft') and all(current.get(key) == value for key, value in sections.items()):
+            return Response({
+                'message': 'No changes',
+                'last_saved': current.get('last_saved'),
+                'revision': form.revision,
+                'is_draft': True
+            }, status=status.HTTP_200_OK)
+        
+        # Store all form data in the checklist JSON field
+        form.checklist = {
+            **sections,
             'is_draft': True,
             'last_saved': timezone.now().isoformat(),
             'saved_by': user.id,
@@ -1396,42 +1509,121 @@ class InspectionViewSet(viewsets.ModelViewSet):
         
         form.save()
         
-        # Only log history for significant changes (not every auto-save)
-        # This reduces database writes for frequent auto-saves
-        last_history = InspectionHistory.objects.filter(
-            inspection=inspection
-        ).order_by('-created_at').first()
+        self._log_auto_save(inspection, user, request)
         
-        # Only create history entry if it's been more than 5 minutes since last save
-        should_log = True
-        if last_history and last_history.remarks == 'Auto-saved inspection form':
-            time_diff = timezone.now() - last_history.created_at
-            if time_diff.total_seconds() < 300:  # 5 minutes
-                should_log = False
+        return Response({
+            'message': 'Auto-save successful',
+            'last_saved': form.checklist.get('last_saved'),
+            'revision': form.revision,
+            'is_draft': True
+        }, status=status.HTTP_200_OK)
+    
+    def _log_auto_save(self, inspection, user, request):
+        """Buffer the auto-save history/audit marker; flushed in bulk by flush_inspection_events"""
+        try:
+            record_inspection_event(inspection, user, 'auto_save', request)
+        except Exception as e:
+            logger.error(f"Failed to buffer auto-save event for inspection {inspection.id}: {str(e)}")
+    
+    @action(detail=True, methods=['post'])
+    def auto_save_patch(self, request, pk=None):
+        """
+        Delta auto-save: apply only what changed since `base_revision`.
+        Body: base_revision plus either `patch` (RFC 6902 operations) or
+        `merge_patch` (RFC 7396 object). Returns 409 if the form has moved on,
+        in which case the client should reload or fall back to a full auto_save.
+        """
+        inspection = self.get_object()
+        user = request.user
         
-        if should_log:
-            InspectionHistory.objects.create(
-                inspection=inspection,
-                previous_status=inspection.current_status,
-                new_status=inspection.current_status,
-                changed_by=user,
-                remarks='Auto-saved inspection form'
+        # Check if user can act
+        if inspection.assigned_to != user:
+            return Response(
+                {'error': 'You are not assigned to this inspection'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            audit_inspection_event(
-                user,
-                inspection,
-                AUDIT_ACTIONS["UPDATE"],
-                f"{user.email} auto-saved inspection form",
-                request,
-                metadata={
-                    "auto_save": True,
-                    "remarks": "Auto-saved inspection form",
-                },
+        
+        try:
+            base_revision = int(request.data.get('base_revision'))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'base_revision is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        operations = request.data.get('patch')
+        merge_patch = request.data.get('merge_patch')
+        if operations is None and merge_patch is None:
+            return Response(
+                {'error': 'Provide either patch or merge_patch'},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
+        form, created = InspectionForm.objects.get_or_create(inspection=inspection)
+        if form.revision != base_revision:
+            return Response({
+                'error': 'Form has changed since your last save',
+                'revision': form.revision,
+            }, status=status.HTTP_409_CONFLICT)
+        
+        current = form.checklist or {}
+        try:
+            if operations is not None:
+                checklist = apply_json_patch(current, operations)
+            else:
+                checklist = apply_merge_patch(current, merge_patch)
+            touched = touched_top_level_keys(operations, merge_patch)
+        except PatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(checklist, dict):
+            return Response({'error': 'Checklist must remain an object'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Nothing changed - no write, no history
+        if checklist == current:
+            return Response({
+                'message': 'No changes',
+                'last_saved': current.get('last_saved'),
+                'revision': form.revision,
+                'is_draft': current.get('is_draft', True)
+            }, status=status.HTTP_200_OK)
+        
+        now = timezone.now()
+        checklist.update({
+            'is_draft': True,
+            'last_saved': now.isoformat(),
+            'saved_by': user.id,
+            'auto_save': True
+        })
+        updates = {'checklist': checklist, 'updated_at': now}
+        
+        # Only sync the denormalized columns when the general section was touched
+        if 'general' in touched:
+            general_data = checklist.get('general') or {}
+            if general_data.get('violations_found'):
+                updates['violations_found'] = general_data['violations_found']
+            if general_data.get('compliance_observations'):
+                updates['compliance_decision'] = general_data['compliance_observations']
+            if general_data.get('inspection_date_time'):
+                updates['scheduled_at'] = general_data['inspection_date_time']
+        if form.inspected_by_id is None:
+            updates['inspected_by'] = user
+        
+        # Compare-and-swap on revision: a concurrent save makes this update a no-op
+        updated = InspectionForm.objects.filter(
+            pk=form.pk, revision=base_revision
+        ).update(revision=F('revision') + 1, **updates)
+        if not updated:
+            form.refresh_from_db(fields=['revision'])
+            return Response({
+                'error': 'Form has changed since your last save',
+                'revision': form.revision,
+            }, status=status.HTTP_409_CONFLICT)
+        
+        self._log_auto_save(inspection, user, request)
+        
         return Response({
             'message': 'Auto-save successful',
-            'last_saved': form.checklist.get('last_saved'),
+            'last_saved': checklist['last_saved'],
+            'revision': base_revision + 1,
             'is_draft': True
         }, status=status.HTTP_200_OK)
     
@@ -1541,19 +1733,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
         if inspection.assigned_to == user:
             can_act = True
         else:
-            # Check if user can act based on role and status
-            user_level = user.userlevel
-            current_status = inspection.current_status
-            
-            # Monitoring Personnel can complete MONITORING_IN_PROGRESS inspections
-            if user_level == 'Monitoring Personnel' and current_status == 'MONITORING_IN_PROGRESS':
-                can_act = True
-            # Unit Head can complete UNIT_IN_PROGRESS inspections
-            elif user_level == 'Unit Head' and current_status == 'UNIT_IN_PROGRESS':
-                can_act = True
-            # Section Chief can complete SECTION_IN_PROGRESS inspections
-            elif user_level == 'Section Chief' and current_status == 'SECTION_IN_PROGRESS':
-                can_act = True
+            # Each role can complete its own stage's in-progress inspections
+            can_act = workflow.allows('complete_unassigned', inspection.current_status, user.userlevel)
         
         if not can_act:
             return Response(
@@ -1642,16 +1823,9 @@ class InspectionViewSet(viewsets.ModelViewSet):
         
         form.save()
         
-        if inspection.current_status == 'SECTION_IN_PROGRESS':
-            # Section Chief completes inspection
-            next_status = 'SECTION_COMPLETED_COMPLIANT' if compliance_decision == 'COMPLIANT' else 'SECTION_COMPLETED_NON_COMPLIANT'
-        elif inspection.current_status == 'UNIT_IN_PROGRESS':
-            # Unit Head completes inspection
-            next_status = 'UNIT_COMPLETED_COMPLIANT' if compliance_decision == 'COMPLIANT' else 'UNIT_COMPLETED_NON_COMPLIANT'
-        elif inspection.current_status == 'MONITORING_IN_PROGRESS':
-            # Monitoring Personnel completes inspection
-            next_status = 'MONITORING_COMPLETED_COMPLIANT' if compliance_decision == 'COMPLIANT' else 'MONITORING_COMPLETED_NON_COMPLIANT'
-        else:
+        # Section Chief, Unit Head or Monitoring Personnel completes their stage
+        next_status = workflow.complete_status(inspection.current_status, compliance_decision == 'COMPLIANT')
+        if not next_status:
             return Response(
                 {'error': f'Cannot complete from status {inspection.current_status}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -1770,9 +1944,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
         if inspection.created_by:
             inspection.assigned_to = inspection.created_by
         else:
-            # Fallback: find any Division Chief
-            from users.models import User
-            division_chief = User.objects.filter(userlevel='Division Chief').first()
+            # Fallback: least-loaded Division Chief
+            division_chief = pick_assignee('Division Chief')
             if division_chief:
                 inspection.assigned_to = division_chief
         
@@ -1792,23 +1965,14 @@ class InspectionViewSet(viewsets.ModelViewSet):
         prev_status = inspection.current_status
         inspection.current_status = 'SECTION_REVIEWED'
         
-        # Find Section Chief (original assignee or based on law)
-        from users.models import User
-        # Special case: PD-1586, RA-8749, RA-9275 should use combined section
-        target_section = inspection.law
-        if inspection.law in ['PD-1586', 'RA-8749', 'RA-9275']:
-            target_section = 'PD-1586,RA-8749,RA-9275'  # EIA, Air & Water Combined
-        
-        section_chief = User.objects.filter(
-            userlevel='Section Chief',
-            section=target_section
-        ).first()
+        # Find Section Chief based on law (combined section for PD-1586, RA-8749, RA-9275)
+        section_chief = pick_assignee('Section Chief', section_for_law(inspection.law))
         
         if section_chief:
             inspection.assigned_to = section_chief
         else:
-            # Fallback: find any Section Chief
-            section_chief = User.objects.filter(userlevel='Section Chief').first()
+            # Fallback: least-loaded Section Chief of any section
+            section_chief = pick_assignee('Section Chief')
             if section_chief:
                 inspection.assigned_to = section_chief
         
@@ -1826,15 +1990,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
     def _auto_assign_to_section_chief(self, inspection, user):
         """Auto-assign to Section Chief for review (status unchanged)"""
         # Find Section Chief based on law
-        target_section = inspection.law
-        if inspection.law in ['PD-1586', 'RA-8749', 'RA-9275']:
-            target_section = 'PD-1586,RA-8749,RA-9275'
-        
-        section_chief = User.objects.filter(
-            userlevel='Section Chief',
-            section=target_section,
-            is_active=True
-        ).first()
+        section_chief = pick_assignee('Section Chief', section_for_law(inspection.law))
         
         if section_chief:
             inspection.assigned_to = section_chief
@@ -1857,8 +2013,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
         if inspection.created_by:
             inspection.assigned_to = inspection.created_by
         else:
-            # Fallback: find any Division Chief
-            division_chief = User.objects.filter(userlevel='Division Chief', is_active=True).first()
+            # Fallback: least-loaded Division Chief
+            division_chief = pick_assignee('Division Chief')
             if division_chief:
                 inspection.assigned_to = division_chief
         
@@ -1880,11 +2036,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
         
         if is_combined_section:
             # Combined section: Assign to Unit Head
-            unit_head = User.objects.filter(
-                userlevel='Unit Head',
-                section=inspection.law,
-                is_active=True
-            ).first()
+            unit_head = pick_assignee('Unit Head', inspection.law)
             
             if unit_head:
                 inspection.assigned_to = unit_head
@@ -1899,11 +2051,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 )
         else:
             # Individual section: NO Unit Head, assign to Section Chief
-            section_chief = User.objects.filter(
-                userlevel='Section Chief',
-                section=inspection.law,
-                is_active=True
-            ).first()
+            section_chief = pick_assignee('Section Chief', inspection.law)
             
             if section_chief:
                 inspection.assigned_to = section_chief
@@ -2087,8 +2235,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        monitoring_completed_statuses = ['MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT']
-        if inspection.current_status not in monitoring_completed_statuses:
+        if not workflow.allows('return_to_monitoring', inspection.current_status):
             return Response(
                 {'error': f'Cannot return to monitoring from status {inspection.current_status}.'},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -2142,14 +2289,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        valid_statuses = [
-            'UNIT_REVIEWED',
-            'UNIT_COMPLETED_COMPLIANT',
-            'UNIT_COMPLETED_NON_COMPLIANT',
-            'MONITORING_COMPLETED_COMPLIANT',
-            'MONITORING_COMPLETED_NON_COMPLIANT',
-        ]
-        if inspection.current_status not in valid_statuses:
+        if not workflow.allows('return_to_unit', inspection.current_status):
             return Response(
                 {'error': f'Cannot return to unit from status {inspection.current_status}.'},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -2254,13 +2394,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        valid_statuses = [
-            'SECTION_REVIEWED',
-            'SECTION_COMPLETED_COMPLIANT',
-            'SECTION_COMPLETED_NON_COMPLIANT',
-            'DIVISION_REVIEWED',  # Division Chief can return from review status
-        ]
-        if inspection.current_status not in valid_statuses:
+        if not workflow.allows('return_to_section', inspection.current_status):
             return Response(
                 {'error': f'Cannot return to section from status {inspection.current_status}.'},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -2434,6 +2568,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             section=inspection.law,
             is_active=True
         ).order_by(*ordering)
+        workloads = get_workloads(person.id for person in monitoring_personnel)
         
         # Separate district-based and other personnel
         district_personnel = []
@@ -2447,6 +2582,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 'last_name': person.last_name,
                 'email': person.email,
                 'district': district_value,
+                'open_inspections': workloads.get(person.id, 0),
                 'is_district_match': USER_HAS_DISTRICT and inspection.district and district_value == inspection.district
             }
             
@@ -2482,19 +2618,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             # - If user is in individual section: go directly to Monitoring Personnel
             if user.section == 'PD-1586,RA-8749,RA-9275':
                 # Combined section: look for Unit Head by specific law first, then by combined section
-                unit_head = User.objects.filter(
-                    userlevel='Unit Head',
-                    section=inspection.law,  # Try specific law first
-                    is_active=True
-                ).first()
-                
-                # If no Unit Head found for specific law, try combined section
-                if not unit_head:
-                    unit_head = User.objects.filter(
-                        userlevel='Unit Head',
-                        section='PD-1586,RA-8749,RA-9275',  # Try combined section
-                        is_active=True
-                    ).first()
+                unit_head = pick_assignee('Unit Head', [inspection.law, COMBINED_SECTION])
                 
                 if unit_head:
                     next_status = 'UNIT_ASSIGNED'
@@ -2529,19 +2653,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Get next assignee
         if next_status == 'UNIT_ASSIGNED' and user.section == 'PD-1586,RA-8749,RA-9275':
             # Special case: For combined section forwarding to Unit Head, try specific law first, then combined section
-            next_assignee = User.objects.filter(
-                userlevel='Unit Head',
-                section=inspection.law,  # Try specific law first
-                is_active=True
-            ).first()
-            
-            # If no Unit Head found for specific law, try combined section
-            if not next_assignee:
-                next_assignee = User.objects.filter(
-                    userlevel='Unit Head',
-                    section='PD-1586,RA-8749,RA-9275',  # Try combined section
-                    is_active=True
-                ).first()
+            next_assignee = pick_assignee('Unit Head', [inspection.law, COMBINED_SECTION])
         elif next_status == 'MONITORING_ASSIGNED':
             # Special case: For Monitoring Personnel, use specific law and prefer same district
             monitoring_query = User.objects.filter(
@@ -2563,7 +2675,9 @@ class InspectionViewSet(viewsets.ModelViewSet):
             else:
                 # Auto-assignment: Prefer same district if available
                 if USER_HAS_DISTRICT and inspection.district:
-                    next_assignee = monitoring_query.filter(district=inspection.district).first()
+                    next_assignee = least_loaded(
+                        candidates('Monitoring Personnel', inspection.law, district=inspection.district)
+                    )
                     if not next_assignee:
                         # No district match - return available options instead of error
                         value_fields = ['id', 'first_name', 'last_name', 'email']
@@ -2579,7 +2693,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                             status=status.HTTP_400_BAD_REQUEST
                         )
                 else:
-                    next_assignee = monitoring_query.first()
+                    next_assignee = pick_assignee('Monitoring Personnel', inspection.law)
                     if not next_assignee:
                         # No Monitoring Personnel found - return error
                         error_message = f'No Monitoring Personnel found for {inspection.law}. Please assign Monitoring Personnel before forwarding.'
@@ -2692,37 +2806,10 @@ class InspectionViewSet(viewsets.ModelViewSet):
             # User is assigned - can always review
             user_can_review = True
         else:
-            # User is not assigned - check special cases
-            if user.userlevel == 'Unit Head' and inspection.current_status in [
-                'UNIT_REVIEWED',
-                'MONITORING_IN_PROGRESS',
-                'MONITORING_COMPLETED_COMPLIANT',
-                'MONITORING_COMPLETED_NON_COMPLIANT',
-            ]:
-                # Unit Head can review monitoring-stage work even if reassigned
-                user_can_review = True
-            elif user.userlevel == 'Section Chief' and inspection.current_status in [
-                'SECTION_REVIEWED',
-                'UNIT_IN_PROGRESS',
-                'UNIT_COMPLETED_COMPLIANT',
-                'UNIT_COMPLETED_NON_COMPLIANT',
-                'UNIT_REVIEWED',
-            ]:
-                # Section Chief can review unit-stage work even if reassigned
-                user_can_review = True
-            elif user.userlevel == 'Division Chief' and inspection.current_status in [
-                'DIVISION_REVIEWED',
-                'SECTION_REVIEWED',
-                'SECTION_COMPLETED_COMPLIANT',
-                'SECTION_COMPLETED_NON_COMPLIANT',
-            ]:
-                # Division Chief can review section-level work even if reassigned
-                user_can_review = True
-            elif user.userlevel == 'Legal Unit' and inspection.current_status == 'LEGAL_REVIEW':
-                # Legal Unit can review inspections in LEGAL_REVIEW status even if not assigned
-                user_can_review = True
-            else:
-                user_can_review = False
+            # User is not assigned - stage owners can review work that was reassigned
+            # (Unit Head: monitoring stage, Section Chief: unit stage, Division Chief:
+            # section stage, Legal Unit: LEGAL_REVIEW)
+            user_can_review = workflow.allows('review_unassigned', inspection.current_status, user.userlevel)
         
         if not user_can_review:
             return Response(
@@ -2751,7 +2838,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         
         # Check valid statuses
-        if inspection.current_status not in ['MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT']:
+        if not workflow.allows('review_and_forward_unit', inspection.current_status):
             return Response(
                 {'error': f'Cannot review from status {inspection.current_status}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -2878,14 +2965,10 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check valid statuses based on section type
-        valid_statuses = ['UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT', 'UNIT_REVIEWED']
-        
-        # For individual sections (non-combined), also accept MONITORING_COMPLETED
-        if user.section != 'PD-1586,RA-8749,RA-9275':
-            valid_statuses.extend(['MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT'])
-        
-        if inspection.current_status not in valid_statuses:
+        # Check valid statuses based on section type: individual (non-combined)
+        # sections have no Unit Head stage, so they also accept MONITORING_COMPLETED
+        guard = 'review_and_forward_section' if user.section == COMBINED_SECTION else 'review_and_forward_section_direct'
+        if not workflow.allows(guard, inspection.current_status):
             return Response(
                 {'error': f'Cannot review from status {inspection.current_status}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -3014,8 +3097,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         
         # Check valid status - allow SECTION_REVIEWED and SECTION_COMPLETED_* statuses
-        valid_statuses = ['SECTION_REVIEWED', 'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT']
-        if inspection.current_status not in valid_statuses:
+        if not workflow.allows('review_division', inspection.current_status):
+            valid_statuses = workflow.guard_statuses('review_division')
             return Response(
                 {'error': f'Cannot review from status {inspection.current_status}. Expected one of: {", ".join(valid_statuses)}.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -3076,7 +3159,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         
         # Check if in correct status
-        if inspection.current_status != 'DIVISION_REVIEWED':
+        if not workflow.allows('forward_to_legal', inspection.current_status):
             return Response(
                 {'error': 'Can only forward to legal from Division Reviewed status'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -3085,7 +3168,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Removed compliance validation - Division Chief can decide to forward any case to Legal Unit
         
         # Find Legal Unit user
-        legal_user = User.objects.filter(userlevel='Legal Unit', is_active=True).first()
+        legal_user = pick_assignee('Legal Unit')
         if not legal_user:
             return Response(
                 {'error': 'No Legal Unit personnel found'},
@@ -3537,7 +3620,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
         inspection = self.get_object()
         user = request.user
         
-        if user.userlevel == 'Section Chief' and inspection.current_status == 'SECTION_REVIEWED':
+        can_close = workflow.allows('close', inspection.current_status, user.userlevel)
+        if user.userlevel == 'Section Chief' and can_close:
             # Section Chief closing - send to Division
             next_assignee = inspection.get_next_assignee('DIVISION_REVIEWED')
             if not next_assignee:
@@ -3573,7 +3657,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 },
             )
             
-        elif user.userlevel == 'Division Chief' and inspection.current_status in ['DIVISION_REVIEWED', 'SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT']:
+        elif user.userlevel == 'Division Chief' and can_close:
             # Division Chief finalizing
             final_status = request.data.get('final_status', 'CLOSED')
             
@@ -3607,7 +3691,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 },
             )
             
-        elif user.userlevel == 'Legal Unit' and inspection.current_status in ['LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT']:
+        elif user.userlevel == 'Legal Unit' and can_close:
             # Legal Unit finalizing
             final_status = request.data.get('final_status', 'CLOSED_NON_COMPLIANT')
             
@@ -3663,7 +3747,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
             )
         
         # Check valid status
-        if inspection.current_status != 'LEGAL_REVIEW':
+        if not workflow.allows('return_to_division', inspection.current_status):
             return Response(
                 {'error': f'Cannot return from status {inspection.current_status}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -3731,31 +3815,21 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        from .models import InspectionForm
-        
-        # Find inspections with expired NOV compliance deadlines
-        expired = []
+        # Inspections with expired NOV compliance deadlines (one query)
         now = timezone.now()
-        
-        # Query inspections in NOV_SENT or NOO_SENT with expired deadlines
-        inspections = Inspection.objects.filter(
-            current_status__in=['NOV_SENT', 'NOO_SENT']
-        ).select_related('form')
-        
-        for inspection in inspections:
-            form = getattr(inspection, 'form', None)
-            if form and form.nov_compliance_date:
-                if form.nov_compliance_date < now:
-                    days_overdue = (now.date() - form.nov_compliance_date.date()).days
-                    expired.append({
-                        'id': inspection.id,
-                        'code': inspection.code,
-                        'establishment': inspection.establishments.first().name if inspection.establishments.exists() else 'N/A',
-                        'status': inspection.current_status,
-                        'compliance_deadline': form.nov_compliance_date,
-                        'days_overdue': days_overdue,
-                        'violations': form.nov_violations or form.violations_found
-                    })
+        today = timezone.localdate(now)
+        expired = [
+            {
+                'id': inspection.id,
+                'code': inspection.code,
+                'establishment': inspection.establishment_name or 'N/A',
+                'status': inspection.current_status,
+                'compliance_deadline': inspection.compliance_deadline,
+                'days_overdue': (today - timezone.localdate(inspection.compliance_deadline)).days,
+                'violations': inspection.nov_violations or inspection.violations_found
+            }
+            for inspection in deadlines.expired_compliance(now)
+        ]
         
         return Response({
             'count': len(expired),
@@ -3995,11 +4069,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
         Get compliance statistics grouped by law with role-based filtering.
         Supports monthly, quarterly, and yearly period filtering (defaults to quarterly).
         """
-        from django.db.models import Count, Q
-        from .models import InspectionForm, Inspection
         from datetime import datetime, timedelta
         from django.utils import timezone as tz
-        from calendar import month_name
         
         # Get period type (monthly, quarterly, yearly) - default to 'quarterly'
         period_type = request.query_params.get('period_type', 'quarterly')
@@ -4052,8 +4123,6 @@ class InspectionViewSet(viewsets.ModelViewSet):
         else:  # yearly
             current_start, current_end = get_year_range(current_year)
         
-        date_filter = Q(created_at__range=[current_start, current_end])
-        
         # Get selected laws from query parameter
         selected_laws = request.query_params.getlist('laws')
         if selected_laws:
@@ -4071,72 +4140,12 @@ class InspectionViewSet(viewsets.ModelViewSet):
             # Filter law_choices to only include allowed laws
             law_choices = [(code, name) for code, name in law_choices if code in allowed_laws]
         
-        stats_by_law = []
+        # One grouped query over the role-scoped forms (cached per scope and period)
+        grouped = analytics.compliance_by_law(user, [code for code, _ in law_choices], current_start, current_end)
         
+        stats_by_law = []
         for law_code, law_name in law_choices:
-            # Get base inspection queryset for this law
-            base_inspections = Inspection.objects.filter(law=law_code)
-            
-            # Apply role-based filtering (similar to get_queryset logic)
-            if user.userlevel == 'Admin':
-                # Admin sees all inspections
-                filtered_inspections = base_inspections
-            elif user.userlevel == 'Division Chief':
-                # Division Chief sees inspections they created or are assigned for review
-                filtered_inspections = base_inspections.filter(
-                    Q(created_by=user) | Q(current_status='DIVISION_REVIEWED')
-                )
-            elif user.userlevel == 'Section Chief':
-                # Section Chief sees inspections related to their section
-                if user.section == 'PD-1586,RA-8749,RA-9275':
-                    # Special case for combined EIA section
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | 
-                        Q(law__in=['PD-1586', 'RA-8749', 'RA-9275'])
-                    )
-                else:
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | Q(law=user.section)
-                    )
-            elif user.userlevel == 'Unit Head':
-                # Unit Head sees inspections related to their section
-                if user.section == 'PD-1586,RA-8749,RA-9275':
-                    # Special case for combined EIA section
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | 
-                        Q(law__in=['PD-1586', 'RA-8749', 'RA-9275'])
-                    )
-                else:
-                    filtered_inspections = base_inspections.filter(
-                        Q(assigned_to=user) | Q(law=user.section)
-                    )
-            elif user.userlevel == 'Monitoring Personnel':
-                # Monitoring Personnel sees inspections assigned to them
-                filtered_inspections = base_inspections.filter(assigned_to=user)
-            elif user.userlevel == 'Legal Unit':
-                # Legal Unit sees inspections in legal review status
-                filtered_inspections = base_inspections.filter(
-                    current_status__in=['LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT']
-                )
-            else:
-                # Default: only see inspections assigned to user
-                filtered_inspections = base_inspections.filter(assigned_to=user)
-            
-            # Get inspection IDs for compliance stats
-            inspection_ids = filtered_inspections.values_list('id', flat=True)
-            
-            # Build compliance stats query with optional date filter
-            compliance_query = Q(inspection_id__in=inspection_ids)
-            if date_filter:
-                compliance_query &= date_filter
-            
-            # Get compliance stats for these inspections
-            law_stats = InspectionForm.objects.filter(compliance_query).aggregate(
-                pending=Count('inspection_id', filter=Q(compliance_decision='PENDING')),
-                compliant=Count('inspection_id', filter=Q(compliance_decision='COMPLIANT')),
-                non_compliant=Count('inspection_id', filter=Q(compliance_decision__in=['NON_COMPLIANT', 'PARTIALLY_COMPLIANT']))
-            )
-            
+            law_stats = grouped.get(law_code, {'pending': 0, 'compliant': 0, 'non_compliant': 0})
             total = law_stats['pending'] + law_stats['compliant'] + law_stats['non_compliant']
             
             stats_by_law.append({
@@ -4246,6 +4255,8 @@ class InspectionViewSet(viewsets.ModelViewSet):
         # Admin and Division Chief see all quotas (no filter)
         
         quota_data = []
+        # Count accomplishments for every quota at once instead of per quota
+        quotas = quota_evaluation.prime_accomplished(quotas)
         
         # For quarterly and yearly views, aggregate monthly quotas by law
         if view_mode == 'quarterly' or view_mode == 'yearly':
@@ -4482,7 +4493,9 @@ class InspectionViewSet(viewsets.ModelViewSet):
         year = int(request.data.get('year', datetime.now().year))
         quarter = int(request.data.get('quarter', ((datetime.now().month - 1) // 3) + 1))
         
-        current_quotas = ComplianceQuota.objects.filter(year=year, quarter=quarter)
+        current_quotas = quota_evaluation.prime_accomplished(
+            ComplianceQuota.objects.filter(year=year, quarter=quarter)
+        )
         adjusted_quotas = []
         
         for quota in current_quotas:
@@ -4552,35 +4565,12 @@ class InspectionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Calculate quarterly totals
-        total_target, total_achieved = ComplianceQuota.get_quarterly_totals(law, year, quarter)
-        
-        # Determine status
-        if total_achieved >= total_target:
-            quarter_status = 'EXCEEDED' if total_achieved > total_target else 'ACHIEVED'
-        else:
-            quarter_status = 'NOT_ACHIEVED'
-        
-        # Calculate surplus/deficit
-        surplus = max(0, total_achieved - total_target)
-        deficit = max(0, total_target - total_achieved)
-        
-        # Create or update evaluation
-        evaluation, created = QuarterlyEvaluation.objects.update_or_create(
-            law=law,
-            year=year,
-            quarter=quarter,
-            defaults={
-                'quarterly_target': total_target,
-                'quarterly_achieved': total_achieved,
-                'quarter_status': quarter_status,
-                'surplus': surplus,
-                'deficit': deficit,
-                'remarks': remarks,
-                'evaluated_by': request.user,
-                'is_archived': True
-            }
-        )
+        # Calculate quarterly totals and create or update the evaluation
+        created = not QuarterlyEvaluation.objects.filter(law=law, year=year, quarter=quarter).exists()
+        evaluation = quota_evaluation.evaluate_quarters(
+            year, quarter, laws=[law], user=request.user, remarks=remarks
+        )[0]
+        deficit = evaluation.deficit
         
         # Apply carry-over if enabled and policy is auto
         carry_over_applied = False
@@ -4620,6 +4610,52 @@ class InspectionViewSet(viewsets.ModelViewSet):
             'message': 'Quarter evaluated successfully'
         })
 
+    @action(detail=False, methods=['post'])
+    def evaluate_all_laws(self, request):
+        """Evaluate a quarter for every law with quotas in one batch"""
+        try:
+            year = int(request.data.get('year'))
+            quarter = int(request.data.get('quarter'))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Year and quarter are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if quarter not in [1, 2, 3, 4]:
+            return Response(
+                {'error': 'Quarter must be 1, 2, 3, or 4'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        evaluations = quota_evaluation.evaluate_quarters(
+            year, quarter, user=request.user, remarks=request.data.get('remarks', '')
+        )
+
+        return Response({
+            'evaluations': [
+                {
+                    'id': evaluation.id,
+                    'law': evaluation.law,
+                    'year': evaluation.year,
+                    'quarter': evaluation.quarter,
+                    'quarterly_target': evaluation.quarterly_target,
+                    'quarterly_achieved': evaluation.quarterly_achieved,
+                    'quarter_status': evaluation.quarter_status,
+                    'surplus': evaluation.surplus,
+                    'deficit': evaluation.deficit,
+                    'percentage': evaluation.percentage,
+                    'remarks': evaluation.remarks,
+                    'evaluated_at': evaluation.evaluated_at,
+                    'evaluated_by': evaluation.evaluated_by.email if evaluation.evaluated_by else None,
+                    'is_archived': evaluation.is_archived
+                }
+                for evaluation in evaluations
+            ],
+            'total_evaluated': len(evaluations),
+            'message': f"Evaluated Q{quarter} {year} for {len(evaluations)} law(s)"
+        })
+
     @action(detail=False, methods=['get'])
     def get_quarterly_evaluations(self, request):
         """Get all evaluated quarters (archived)"""
@@ -5186,7 +5222,7 @@ class InspectionViewSet(viewsets.ModelViewSet):
         return Response({'detail': 'Recommendation deleted successfully.'})
 
 
-class BillingViewSet(viewsets.ModelViewSet):
+class BillingViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Billing Records
     """
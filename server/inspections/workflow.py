@@ -0,0 +1,304 @@
+"""
+Inspection workflow rules.
+
+The status/role rules of the inspection workflow are declared once here and
+compiled at import into flat lookups, so checking a transition or listing a
+user's buttons is a dict/set lookup instead of rebuilding the maps per call
+(or per serialized row):
+
+- TRANSITIONS: status -> {target status: roles allowed to make the move};
+  used by Inspection.can_transition_to()
+- ACTIONS: (status, role) -> buttons shown to that role; actions_for() and
+  actions_for_many() also apply the rules for users who are not the assignee
+- GUARDS: statuses (optionally per role) from which the InspectionViewSet
+  actions may run; checked with allows()
+"""
+
+# Roles ---------------------------------------------------------------------
+
+DIVISION_CHIEF = 'Division Chief'
+SECTION_CHIEF = 'Section Chief'
+UNIT_HEAD = 'Unit Head'
+MONITORING_PERSONNEL = 'Monitoring Personnel'
+LEGAL_UNIT = 'Legal Unit'
+
+# Transitions ---------------------------------------------------------------
+
+TRANSITIONS = {
+    'CREATED': {
+        'SECTION_ASSIGNED': [DIVISION_CHIEF],
+    },
+    'SECTION_ASSIGNED': {
+        'SECTION_IN_PROGRESS': [SECTION_CHIEF],
+        'UNIT_ASSIGNED': [SECTION_CHIEF],  # Can forward directly
+        'MONITORING_ASSIGNED': [SECTION_CHIEF],  # Can forward directly if no unit head
+    },
+    'SECTION_IN_PROGRESS': {
+        'SECTION_COMPLETED_COMPLIANT': [SECTION_CHIEF],
+        'SECTION_COMPLETED_NON_COMPLIANT': [SECTION_CHIEF],
+        'DIVISION_REVIEWED': [SECTION_CHIEF],  # Direct submission to Division Chief review
+    },
+    'SECTION_COMPLETED_COMPLIANT': {
+        'UNIT_ASSIGNED': [SECTION_CHIEF],
+        'MONITORING_ASSIGNED': [SECTION_CHIEF],  # If no unit head
+        'DIVISION_REVIEWED': [DIVISION_CHIEF],  # Auto-assign to Division Chief
+    },
+    'SECTION_COMPLETED_NON_COMPLIANT': {
+        'UNIT_ASSIGNED': [SECTION_CHIEF],
+        'MONITORING_ASSIGNED': [SECTION_CHIEF],  # If no unit head
+        'DIVISION_REVIEWED': [DIVISION_CHIEF],  # Auto-assign to Division Chief
+    },
+    'UNIT_ASSIGNED': {
+        'UNIT_IN_PROGRESS': [UNIT_HEAD],
+        'MONITORING_ASSIGNED': [UNIT_HEAD],  # Can forward directly
+        'SECTION_ASSIGNED': [UNIT_HEAD],  # Return to Section Chief
+    },
+    'UNIT_IN_PROGRESS': {
+        'UNIT_COMPLETED_COMPLIANT': [UNIT_HEAD],
+        'UNIT_COMPLETED_NON_COMPLIANT': [UNIT_HEAD],
+        'SECTION_REVIEWED': [UNIT_HEAD],  # Direct submission to Section Chief review
+    },
+    'UNIT_COMPLETED_COMPLIANT': {
+        'MONITORING_ASSIGNED': [UNIT_HEAD],
+        'SECTION_REVIEWED': [SECTION_CHIEF],  # Can send to Section
+    },
+    'UNIT_COMPLETED_NON_COMPLIANT': {
+        'MONITORING_ASSIGNED': [UNIT_HEAD],
+        'SECTION_REVIEWED': [SECTION_CHIEF],  # Can send to Section
+    },
+    'MONITORING_ASSIGNED': {
+        'MONITORING_IN_PROGRESS': [MONITORING_PERSONNEL],
+        'UNIT_ASSIGNED': [MONITORING_PERSONNEL, UNIT_HEAD],  # Return to Unit Head
+        'SECTION_ASSIGNED': [UNIT_HEAD],  # Optional return to Section Chief
+    },
+    'MONITORING_IN_PROGRESS': {
+        'MONITORING_COMPLETED_COMPLIANT': [MONITORING_PERSONNEL],
+        'MONITORING_COMPLETED_NON_COMPLIANT': [MONITORING_PERSONNEL],
+    },
+    'MONITORING_COMPLETED_COMPLIANT': {
+        'UNIT_REVIEWED': [UNIT_HEAD],  # Auto-assign to Unit Head
+    },
+    'MONITORING_COMPLETED_NON_COMPLIANT': {
+        'UNIT_REVIEWED': [UNIT_HEAD],  # Auto-assign to Unit Head
+    },
+    'UNIT_REVIEWED': {
+        'SECTION_REVIEWED': [SECTION_CHIEF],  # Section Chief forwards to Division
+    },
+    'SECTION_REVIEWED': {
+        'DIVISION_REVIEWED': [DIVISION_CHIEF],  # Division Chief forwards to finalize
+    },
+    'DIVISION_REVIEWED': {
+        'CLOSED_COMPLIANT': [DIVISION_CHIEF],  # If compliant
+        'LEGAL_REVIEW': [DIVISION_CHIEF],  # If non-compliant
+    },
+    'LEGAL_REVIEW': {
+        'NOV_SENT': [LEGAL_UNIT],
+        'NOO_SENT': [LEGAL_UNIT],
+        'CLOSED_NON_COMPLIANT': [LEGAL_UNIT],
+    },
+    'NOV_SENT': {
+        'NOO_SENT': [LEGAL_UNIT],
+        'CLOSED_NON_COMPLIANT': [LEGAL_UNIT],
+    },
+    'NOO_SENT': {
+        'CLOSED_NON_COMPLIANT': [LEGAL_UNIT],
+    },
+}
+
+# Stage an inspector moves into when they start, and the outcomes of completing it
+START_TRANSITIONS = {
+    'SECTION_ASSIGNED': 'SECTION_IN_PROGRESS',
+    'UNIT_ASSIGNED': 'UNIT_IN_PROGRESS',
+    'MONITORING_ASSIGNED': 'MONITORING_IN_PROGRESS',
+}
+COMPLETE_TRANSITIONS = {
+    'SECTION_IN_PROGRESS': ('SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT'),
+    'UNIT_IN_PROGRESS': ('UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT'),
+    'MONITORING_IN_PROGRESS': ('MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT'),
+}
+
+# Buttons (5 button strategy) -------------------------------------------------
+
+ACTIONS = {
+    # Initial creation - Division Chief can assign to sections
+    ('CREATED', DIVISION_CHIEF): ['forward'],
+
+    # Section Chief workflow
+    ('SECTION_ASSIGNED', SECTION_CHIEF): ['inspect', 'forward'],
+    ('SECTION_IN_PROGRESS', SECTION_CHIEF): ['continue'],
+    ('SECTION_COMPLETED_COMPLIANT', DIVISION_CHIEF): ['review'],  # NO forward, auto-assigned
+    ('SECTION_COMPLETED_NON_COMPLIANT', DIVISION_CHIEF): ['review'],  # NO forward, auto-assigned
+
+    # Unit Head workflow
+    ('UNIT_ASSIGNED', UNIT_HEAD): ['inspect', 'forward', 'return_to_previous'],
+    ('UNIT_IN_PROGRESS', UNIT_HEAD): ['continue', 'forward'],
+    ('UNIT_COMPLETED_COMPLIANT', SECTION_CHIEF): ['review'],  # NO forward, auto-assigned
+    ('UNIT_COMPLETED_NON_COMPLIANT', SECTION_CHIEF): ['review'],  # NO forward, auto-assigned
+
+    # Monitoring Personnel workflow
+    ('MONITORING_ASSIGNED', MONITORING_PERSONNEL): ['inspect', 'return_to_previous'],
+    ('MONITORING_ASSIGNED', UNIT_HEAD): ['forward', 'return_to_previous'],
+    ('MONITORING_IN_PROGRESS', MONITORING_PERSONNEL): ['continue'],
+    ('MONITORING_COMPLETED_COMPLIANT', UNIT_HEAD): ['review'],  # NO forward, auto-assigned
+    ('MONITORING_COMPLETED_NON_COMPLIANT', UNIT_HEAD): ['review'],  # NO forward, auto-assigned
+    # Section Chief can review Monitoring completed when no Unit Head exists
+    ('MONITORING_COMPLETED_COMPLIANT', SECTION_CHIEF): ['review'],
+    ('MONITORING_COMPLETED_NON_COMPLIANT', SECTION_CHIEF): ['review'],
+
+    # Review statuses (no Forward button)
+    ('UNIT_REVIEWED', SECTION_CHIEF): ['review', 'return_to_monitoring'],
+    ('SECTION_REVIEWED', DIVISION_CHIEF): ['review', 'return_to_unit'],
+    # DIVISION_REVIEWED closing/legal actions are manual buttons on the review page
+    ('DIVISION_REVIEWED', DIVISION_CHIEF): ['return_to_section'],
+
+    # Legal Unit actions
+    ('LEGAL_REVIEW', LEGAL_UNIT): ['review'],
+    ('NOV_SENT', LEGAL_UNIT): ['review'],
+    ('NOO_SENT', LEGAL_UNIT): ['review', 'close'],
+}
+
+# Buttons that do not depend on who the inspection is assigned to
+ASSIGNMENT_INDEPENDENT = {('DIVISION_REVIEWED', DIVISION_CHIEF), ('MONITORING_ASSIGNED', MONITORING_PERSONNEL)}
+
+# Which buttons a user who is not the assignee keeps (stage owners may take over)
+TAKE_OVER = {
+    'inspect': {
+        ('SECTION_ASSIGNED', SECTION_CHIEF),
+        ('UNIT_ASSIGNED', UNIT_HEAD),
+        ('MONITORING_ASSIGNED', MONITORING_PERSONNEL),
+    },
+    'forward': {SECTION_CHIEF, UNIT_HEAD, DIVISION_CHIEF},
+    'review': {UNIT_HEAD, SECTION_CHIEF, DIVISION_CHIEF},
+    'return_to_previous': {('MONITORING_ASSIGNED', UNIT_HEAD), ('UNIT_ASSIGNED', UNIT_HEAD)},
+    'send_to_legal': {DIVISION_CHIEF},
+    'close': {DIVISION_CHIEF},
+}
+
+# View guards ---------------------------------------------------------------
+# guard -> statuses, or guard -> {role: statuses} when it depends on the role
+
+MONITORING_COMPLETED = ('MONITORING_COMPLETED_COMPLIANT', 'MONITORING_COMPLETED_NON_COMPLIANT')
+UNIT_COMPLETED = ('UNIT_COMPLETED_COMPLIANT', 'UNIT_COMPLETED_NON_COMPLIANT')
+SECTION_COMPLETED = ('SECTION_COMPLETED_COMPLIANT', 'SECTION_COMPLETED_NON_COMPLIANT')
+LEGAL_STATUSES = ('LEGAL_REVIEW', 'NOV_SENT', 'NOO_SENT')
+
+GUARDS = {
+    'start': tuple(START_TRANSITIONS),
+    'continue': ('MONITORING_IN_PROGRESS',),
+    # Completing someone else's inspection: only the stage's own role
+    'complete_unassigned': {
+        MONITORING_PERSONNEL: ('MONITORING_IN_PROGRESS',),
+        UNIT_HEAD: ('UNIT_IN_PROGRESS',),
+        SECTION_CHIEF: ('SECTION_IN_PROGRESS',),
+    },
+    # Opening someone else's inspection for review
+    'review_unassigned': {
+        UNIT_HEAD: ('UNIT_REVIEWED', 'MONITORING_IN_PROGRESS') + MONITORING_COMPLETED,
+        SECTION_CHIEF: ('SECTION_REVIEWED', 'UNIT_IN_PROGRESS') + UNIT_COMPLETED + ('UNIT_REVIEWED',),
+        DIVISION_CHIEF: ('DIVISION_REVIEWED', 'SECTION_REVIEWED') + SECTION_COMPLETED,
+        LEGAL_UNIT: ('LEGAL_REVIEW',),
+    },
+    'return_to_monitoring': MONITORING_COMPLETED,
+    'return_to_unit': ('UNIT_REVIEWED',) + UNIT_COMPLETED + MONITORING_COMPLETED,
+    'return_to_section': ('SECTION_REVIEWED',) + SECTION_COMPLETED + ('DIVISION_REVIEWED',),
+    'review_and_forward_unit': MONITORING_COMPLETED,
+    'review_and_forward_section': UNIT_COMPLETED + ('UNIT_REVIEWED',),
+    # Individual (non-combined) sections have no Unit Head stage
+    'review_and_forward_section_direct': UNIT_COMPLETED + ('UNIT_REVIEWED',) + MONITORING_COMPLETED,
+    'review_division': ('SECTION_REVIEWED',) + SECTION_COMPLETED,
+    'forward_to_legal': ('DIVISION_REVIEWED',),
+    'return_to_division': ('LEGAL_REVIEW',),
+    'close': {
+        SECTION_CHIEF: ('SECTION_REVIEWED',),
+        DIVISION_CHIEF: ('DIVISION_REVIEWED',) + SECTION_COMPLETED,
+        LEGAL_UNIT: LEGAL_STATUSES,
+    },
+}
+
+
+# Compiled lookups ------------------------------------------------------------
+
+def _compile_transitions():
+    return frozenset(
+        (status, target, role)
+        for status, targets in TRANSITIONS.items()
+        for target, roles in targets.items()
+        for role in roles
+    )
+
+
+def _keeps(action, status, role):
+    allowed = TAKE_OVER.get(action, ())
+    return (status, role) in allowed or role in allowed
+
+
+def _compile_actions():
+    compiled = {}
+    for (status, role), actions in ACTIONS.items():
+        assigned = tuple(actions)
+        if (status, role) in ASSIGNMENT_INDEPENDENT:
+            compiled[(status, role)] = (assigned, assigned)
+        else:
+            compiled[(status, role)] = (assigned, tuple(a for a in actions if _keeps(a, status, role)))
+    return compiled
+
+
+def _compile_guards():
+    compiled = set()
+    for guard, statuses in GUARDS.items():
+        by_role = statuses if isinstance(statuses, dict) else {None: statuses}
+        for role, role_statuses in by_role.items():
+            compiled.update((guard, status, role) for status in role_statuses)
+    return frozenset(compiled)
+
+
+_TRANSITIONS = _compile_transitions()
+_ACTIONS = _compile_actions()
+_GUARDS = _compile_guards()
+_NO_ACTIONS = ((), ())
+
+
+# Lookups -------------------------------------------------------------------
+
+def can_transition(status, target, role):
+    """Whether `role` may move an inspection from `status` to `target`"""
+    return (status, target, role) in _TRANSITIONS
+
+
+def allows(guard, status, role=None):
+    """Whether the view action `guard` may run from `status` (for `role`, if the guard is per role)"""
+    return (guard, status, None) in _GUARDS or (role is not None and (guard, status, role) in _GUARDS)
+
+
+def guard_statuses(guard):
+    """Statuses a role-independent guard accepts (for error messages)"""
+    return list(GUARDS[guard])
+
+
+def start_status(status):
+    """Status an inspector moves into when starting from `status`, or None"""
+    return START_TRANSITIONS.get(status)
+
+
+def complete_status(status, compliant):
+    """Outcome status of completing the stage in `status`, or None"""
+    outcomes = COMPLETE_TRANSITIONS.get(status)
+    if outcomes is None:
+        return None
+    return outcomes[0] if compliant else outcomes[1]
+
+
+def actions_for(status, role, is_assignee):
+    """Buttons a user with `role` sees on an inspection in `status`"""
+    assigned, unassigned = _ACTIONS.get((status, role), _NO_ACTIONS)
+    return list(assigned if is_assignee else unassigned)
+
+
+def actions_for_many(inspections, user):
+    """{inspection id: buttons} for `user` over many inspections (one lookup per row)"""
+    role = user.userlevel
+    user_id = user.pk
+    return {
+        inspection.pk: actions_for(inspection.current_status, role, inspection.assigned_to_id == user_id)
+        for inspection in inspections
+    }
@@ -0,0 +1,93 @@
+"""
+Cached per-user unread notification counts.
+
+Badges and the push channel read the count from the cache. The counter is
+adjusted in place when notifications are created, read or deleted, and
+reconcile_unread_counts() periodically rewrites it from the database to undo
+any drift. The database is otherwise only queried on a cache miss.
+
+Counters need a cache shared by every worker and Celery (REDIS_CACHE_URL);
+with a per-process cache a change made elsewhere would leave this process's
+count stale. Without one, every read runs the indexed (recipient, is_read)
+COUNT and the counter functions do nothing.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.cache_utils import shared_cache
+
+from .models import Notification
+
+UNREAD_COUNT_TTL = 24 * 60 * 60
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    """Unread count for a user, computed from the database on a cache miss"""
+    count = cache.get(_key(user_id)) if shared_cache() else None
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        set_unread_count(user_id, count)
+    return count
+
+
+def count_unread(user_ids):
+    """{user_id: unread count} straight from the database, in one grouped query"""
+    counts = dict(
+        Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .order_by()
+        .values_list('recipient_id')
+        .annotate(total=Count('id'))
+    )
+    return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+
+def get_cached_unread_count(user_id):
+    """Unread count if it is cached, else None (never touches the database)"""
+    return cache.get(_key(user_id)) if shared_cache() else None
+
+
+def increment_unread_count(user_id, delta=1):
+    """
+    Adjust a cached count. Returns the new value, or None if nothing was
+    cached (the next read recomputes it).
+    """
+    if not shared_cache():
+        return None
+    try:
+        return cache.incr(_key(user_id), delta)
+    except ValueError:
+        return None
+
+
+def set_unread_count(user_id, count):
+    if shared_cache():
+        cache.set(_key(user_id), count, UNREAD_COUNT_TTL)
+
+
+def invalidate_unread_count(user_id):
+    cache.delete(_key(user_id))
+
+
+def reconcile_unread_counts():
+    """
+    Rewrite every active user's cached count from one grouped query.
+
+    Returns:
+        int: Number of counters written
+    """
+    if not shared_cache():
+        return 0
+    counts = dict(
+        Notification.objects.filter(is_read=False)
+        .order_by()
+        .values_list('recipient_id')
+        .annotate(total=Count('id'))
+    )
+    user_ids = get_user_model().objects.filter(is_active=True).values_list('id', flat=True)
+    cache.set_many({_key(user_id): counts.get(user_id, 0) for user_id in user_ids}, UNREAD_COUNT_TTL)
+    return len(user_ids)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_alter_notification_notification_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read'], name='notificatio_recipie_4e3567_idx'),
+        ),
+    ]
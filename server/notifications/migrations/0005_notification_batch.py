@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-19 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_recipient_is_read_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='batch',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
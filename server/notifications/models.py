@@ -41,14 +41,26 @@ class Notification(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Set by bulk inserts on backends that cannot return the new ids (MySQL),
+    # so the rows can be read back
+    batch = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', '-created_at']),
+            models.Index(fields=['recipient', 'is_read']),
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['related_object_type', 'related_object_id']),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored read state so signals can adjust unread counters
+        instance._loaded_is_read = instance.__dict__.get('is_read')
+        return instance
+    
     def save(self, *args, **kwargs):
         # Sync user and recipient fields for backward compatibility
         if self.user and not self.recipient_id:
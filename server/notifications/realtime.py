@@ -0,0 +1,198 @@
+"""
+Publish/subscribe channel for per-user notification events.
+
+Events are delivered to the SSE and long-poll endpoints in notifications/views.py.
+Within one process an in-memory broker is used. When NOTIFICATION_PUBSUB_URL
+is set, events go through Redis pub/sub instead, so that notifications created
+by other workers or Celery reach every connected client.
+
+Event types:
+    unread_count  {"count": <int>}
+    notification  {"id", "title", "message", "notification_type", ...}
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from core.cache_utils import shared_cache
+
+from .counters import (
+    count_unread, get_cached_unread_count, get_unread_count, increment_unread_count, invalidate_unread_count,
+    set_unread_count,
+)
+
+logger = logging.getLogger(__name__)
+
+# user_id -> {(event loop, asyncio.Queue)} for local subscribers
+_subscribers = defaultdict(set)
+_subscribers_lock = threading.Lock()
+_redis_client = None
+
+
+def _pubsub_url():
+    return getattr(settings, 'NOTIFICATION_PUBSUB_URL', '')
+
+
+def _channel(user_id):
+    return f'notifications:user:{user_id}'
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(_pubsub_url())
+    return _redis_client
+
+
+def _deliver_local(user_id, item):
+    with _subscribers_lock:
+        targets = list(_subscribers.get(user_id, ()))
+    for loop, queue in targets:
+        try:
+            loop.call_soon_threadsafe(_put_nowait, queue, item)
+        except RuntimeError:
+            # Subscriber's event loop is closed - it will unsubscribe itself
+            pass
+
+
+def _put_nowait(queue, item):
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        # Slow consumer: drop the event, the next unread_count catches it up
+        pass
+
+
+def publish(user_id, event, data):
+    """Send an event to every open stream of a user"""
+    try:
+        if _pubsub_url():
+            _get_redis().publish(_channel(user_id), json.dumps({'event': event, 'data': data}))
+        else:
+            _deliver_local(user_id, (event, data))
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} event for user {user_id}: {str(e)}")
+
+
+def serialize_notification(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'related_object_type': notification.related_object_type,
+        'related_object_id': notification.related_object_id,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def notifications_created(notifications):
+    """Update cached counts and push new notifications (call after commit)"""
+    # Without shared counters, push the stored counts (one grouped query)
+    counts = None if shared_cache() else count_unread({n.recipient_id for n in notifications})
+    for notification in notifications:
+        user_id = notification.recipient_id
+        if counts is not None:
+            count = counts[user_id]
+        elif not notification.is_read:
+            count = increment_unread_count(user_id)
+        else:
+            count = get_cached_unread_count(user_id)
+        publish(user_id, 'notification', serialize_notification(notification))
+        if count is not None:
+            publish(user_id, 'unread_count', {'count': count})
+
+
+def unread_count_adjusted(user_id, delta):
+    """Apply a +/- change to the cached count once the transaction commits and push it"""
+    def apply():
+        count = increment_unread_count(user_id, delta)
+        if count is not None and count < 0:
+            # Counter drifted - recompute rather than show a negative badge
+            invalidate_unread_count(user_id)
+            count = None
+        if count is None:
+            count = get_unread_count(user_id)
+        publish(user_id, 'unread_count', {'count': count})
+
+    transaction.on_commit(apply)
+
+
+def unread_count_reset(user_id, count=0):
+    """Set the cached count to a known value (e.g. after mark-all-read) and push it"""
+    def apply():
+        set_unread_count(user_id, count)
+        publish(user_id, 'unread_count', {'count': count})
+
+    transaction.on_commit(apply)
+
+
+def unread_count_changed(user_id):
+    """Drop the cached count and push the fresh value once the transaction commits"""
+    invalidate_unread_count(user_id)
+    transaction.on_commit(lambda: publish(user_id, 'unread_count', {'count': get_unread_count(user_id)}))
+
+
+class Subscription:
+    """
+    Open subscription to a user's events, registered on entry so nothing
+    published after `async with` is missed.
+
+        async with Subscription(user_id) as subscription:
+            item = await subscription.next_event()  # (event, data) or None
+    """
+
+    def __init__(self, user_id, heartbeat=25):
+        self.user_id = user_id
+        self.heartbeat = heartbeat
+        self._queue = None
+        self._redis = None
+        self._pubsub = None
+
+    async def __aenter__(self):
+        if _pubsub_url():
+            from redis import asyncio as aioredis
+
+            self._redis = aioredis.Redis.from_url(_pubsub_url())
+            self._pubsub = self._redis.pubsub()
+            await self._pubsub.subscribe(_channel(self.user_id))
+        else:
+            self._queue = asyncio.Queue(maxsize=100)
+            with _subscribers_lock:
+                _subscribers[self.user_id].add((asyncio.get_running_loop(), self._queue))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(_channel(self.user_id))
+            await self._pubsub.aclose()
+            await self._redis.aclose()
+        else:
+            with _subscribers_lock:
+                _subscribers[self.user_id].discard((asyncio.get_running_loop(), self._queue))
+                if not _subscribers[self.user_id]:
+                    del _subscribers[self.user_id]
+
+    async def next_event(self):
+        """Wait for the next (event, data); None after `heartbeat` quiet seconds"""
+        if self._pubsub is None:
+            try:
+                return await asyncio.wait_for(self._queue.get(), self.heartbeat)
+            except asyncio.TimeoutError:
+                return None
+
+        deadline = time.monotonic() + self.heartbeat
+        while time.monotonic() < deadline:
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message and message.get('type') == 'message':
+                payload = json.loads(message['data'])
+                return payload['event'], payload['data']
+        return None
@@ -0,0 +1,150 @@
+"""
+Notification fan-out helpers.
+
+Creating a notification per recipient with Notification.objects.create costs
+one INSERT (plus the user/recipient sync in Notification.save) per row. These
+helpers build all rows up front and insert them with a single bulk_create, and
+hand any e-mails to the background pool as one batch over one SMTP connection.
+"""
+import logging
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+
+from core.background import submit
+
+from .models import Notification
+from .realtime import notifications_created
+
+logger = logging.getLogger(__name__)
+
+
+def active_users(userlevels, section=None):
+    """Active users with the given role(s), optionally limited to one section - one query"""
+    if isinstance(userlevels, str):
+        userlevels = [userlevels]
+    users = get_user_model().objects.filter(userlevel__in=userlevels, is_active=True)
+    if section is not None:
+        users = users.filter(section=section)
+    return users
+
+
+def build_notifications(recipients, *, notification_type, title, message, sender=None,
+                        related_object_type='', related_object_id=None):
+    """
+    Build (unsaved) notifications for each recipient with both FKs set.
+
+    Recipients appearing more than once are only notified once.
+    """
+    notifications = []
+    seen = set()
+    for recipient in recipients:
+        if recipient is None or recipient.pk in seen:
+            continue
+        seen.add(recipient.pk)
+        notifications.append(Notification(
+            recipient=recipient,
+            user=recipient,
+            sender=sender,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            related_object_type=related_object_type or '',
+            related_object_id=related_object_id,
+        ))
+    return notifications
+
+
+def send_notifications(notifications, emails=None):
+    """
+    Insert notifications with one bulk_create inside a transaction.
+
+    A single notification is saved normally, so post_save publishes it.
+
+    Args:
+        notifications: Unsaved Notification instances (see build_notifications)
+        emails: Optional list of EmailMessage objects sent in one batch after
+            the transaction commits
+
+    Returns:
+        list: The created notifications
+    """
+    with transaction.atomic():
+        if len(notifications) == 1:
+            notifications[0].save()
+            created = list(notifications)
+        else:
+            created = _bulk_create(notifications) if notifications else []
+            # bulk_create skips post_save, so push to open streams here
+            transaction.on_commit(lambda: notifications_created(created))
+        if emails:
+            transaction.on_commit(lambda: submit(send_email_batch, list(emails)))
+    return created
+
+
+def _bulk_create(notifications):
+    """
+    bulk_create that always sets the primary keys.
+
+    Backends that cannot return them (MySQL) get the rows stamped with a batch
+    id and read back by (batch, recipient), which build_notifications keeps
+    unique.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return Notification.objects.bulk_create(notifications)
+
+    batch = uuid.uuid4()
+    for notification in notifications:
+        notification.batch = batch
+    created = Notification.objects.bulk_create(notifications)
+    ids = dict(Notification.objects.filter(batch=batch).values_list('recipient_id', 'pk'))
+    for notification in created:
+        notification.pk = ids.get(notification.recipient_id)
+    return created
+
+
+def notify_users(recipients, *, email_subject=None, email_body=None, html=False, **fields):
+    """
+    Notify every recipient in-app (one INSERT) and optionally by e-mail.
+
+    `fields` are passed to build_notifications (notification_type, title,
+    message, sender, related_object_type, related_object_id).
+    """
+    notifications = build_notifications(recipients, **fields)
+    emails = []
+    if email_subject and email_body:
+        emails = [
+            build_email(email_subject, email_body, [n.recipient.email], html=html)
+            for n in notifications if n.recipient.email
+        ]
+    return send_notifications(notifications, emails)
+
+
+def notify_user(recipient, **fields):
+    """Notify a single recipient; returns the created notification (or None)"""
+    created = notify_users([recipient], **fields)
+    return created[0] if created else None
+
+
+def build_email(subject, body, to, html=False):
+    email = EmailMessage(subject=subject, body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=to)
+    if html:
+        email.content_subtype = 'html'
+    return email
+
+
+def send_email_batch(messages):
+    """Send several e-mails over a single connection"""
+    if not messages:
+        return 0
+    try:
+        connection = get_connection()
+        sent = connection.send_messages(messages) or 0
+        logger.info(f"Sent {sent}/{len(messages)} notification e-mail(s)")
+        return sent
+    except Exception as e:
+        logger.error(f"Failed to send notification e-mail batch of {len(messages)}: {str(e)}")
+        return 0
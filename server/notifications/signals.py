@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .realtime import notifications_created, unread_count_adjusted, unread_count_changed
+
+
+@receiver(post_save, sender=Notification)
+def push_notification_saved(sender, instance, created, **kwargs):
+    """Keep the cached unread count current and push the change to open streams"""
+    if created:
+        transaction.on_commit(lambda: notifications_created([instance]))
+        return
+
+    loaded_is_read = getattr(instance, '_loaded_is_read', None)
+    if loaded_is_read is None:
+        # Read state before the save is unknown - recompute
+        unread_count_changed(instance.recipient_id)
+    elif loaded_is_read != instance.is_read:
+        unread_count_adjusted(instance.recipient_id, -1 if instance.is_read else 1)
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def push_notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        unread_count_adjusted(instance.recipient_id, -1)
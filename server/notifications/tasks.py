@@ -0,0 +1,20 @@
+"""
+Celery tasks for notifications app
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_unread_counts():
+    """
+    Rewrite cached unread notification counters from the database.
+    This task runs hourly via Celery Beat.
+    """
+    from .counters import reconcile_unread_counts as reconcile
+
+    written = reconcile()
+    logger.info(f"Reconciled unread notification counts for {written} user(s)")
+    return written
@@ -11,4 +11,7 @@ urlpatterns = [
     path('<int:pk>/delete/', views.delete_notification, name='delete-notification'),
     path('delete-all/', views.delete_all_notifications, name='delete-all-notifications'),
     path('notifications/unread-count/', unread_count, name='notifications-unread-count'),
+    path('stream/ticket/', views.notification_stream_ticket, name='notification-stream-ticket'),
+    path('stream/', views.notification_stream, name='notification-stream'),
+    path('poll/', views.notification_poll, name='notification-poll'),
 ]
\ No newline at end of file
@@ -6,12 +6,23 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Notification
 from .serializers import NotificationSerializer
 from django.contrib.auth import get_user_model
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+import json
+import time
+from core.pagination import CursorPaginationMixin
+from .counters import get_unread_count
+from .realtime import Subscription, unread_count_reset
 
 User = get_user_model()
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(CursorPaginationMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -31,8 +42,9 @@ class MarkNotificationAsReadView(generics.UpdateAPIView):
         if notification.recipient != request.user:
             return Response({'detail': 'Not found.'}, status=404)
         
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=['is_read'])
         return Response({'status': 'marked as read'})
 
 
@@ -42,6 +54,8 @@ def mark_all_notifications_read(request):
     try:
         # Mark all unread notifications for the current user as read
         Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        # update() bypasses post_save, so reset the cached count explicitly
+        unread_count_reset(request.user.id)
         return Response({'status': 'all notifications marked as read'})
     except Exception as e:
         return Response({'detail': str(e)}, status=400)
@@ -50,8 +64,7 @@ def mark_all_notifications_read(request):
 @permission_classes([IsAuthenticated])
 def unread_notifications_count(request):
     try:
-        count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-        return Response({'count': count})
+        return Response({'count': get_unread_count(request.user.id)})
     except Exception as e:
         return Response({'detail': str(e)}, status=400)
 
@@ -79,5 +92,129 @@ def delete_all_notifications(request):
 
 @login_required
 def unread_count(request):
-    count = request.user.notification_set.filter(is_read=False).count()
-    return JsonResponse({'unread_count': count})
\ No newline at end of file
+    count = get_unread_count(request.user.id)
+    return JsonResponse({'unread_count': count})
+
+
+# ---------------------------
+# Push channel (SSE / long-poll)
+# ---------------------------
+STREAM_TICKET_SALT = 'notifications.stream'
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notification_stream_ticket(request):
+    """
+    Short-lived ticket for opening the push channel.
+
+    EventSource cannot send an Authorization header, so the stream URL
+    carries ?ticket=... instead of the access token, which would otherwise
+    end up in access logs. Tickets are signed (no server-side state) and
+    expire after NOTIFICATION_STREAM_TICKET_SECONDS; fetch a new one before
+    each (re)connect.
+    """
+    return Response({
+        'ticket': signing.dumps(request.user.id, salt=STREAM_TICKET_SALT),
+        'expires_in': settings.NOTIFICATION_STREAM_TICKET_SECONDS,
+    })
+
+
+def _authenticate_stream(request):
+    """Resolve the user from a JWT in the Authorization header or a stream ticket"""
+    user = None
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header is not None else None
+    if raw_token:
+        try:
+            user = auth.get_user(auth.get_validated_token(raw_token))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+    elif request.GET.get('ticket'):
+        try:
+            user_id = signing.loads(
+                request.GET['ticket'], salt=STREAM_TICKET_SALT, max_age=settings.NOTIFICATION_STREAM_TICKET_SECONDS
+            )
+        except signing.BadSignature:
+            return None
+        user = User.objects.filter(pk=user_id).first()
+    return user if user is not None and user.is_active else None
+
+
+def _is_asgi(request):
+    """Long-lived responses need the ASGI server; under WSGI they would pin a worker thread"""
+    return isinstance(request, ASGIRequest)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def notification_stream(request):
+    """
+    Server-sent events stream of unread-count and new-notification events.
+
+    Sends the current unread count on connect, then every change as it
+    happens. Streams are closed after NOTIFICATION_STREAM_MAX_SECONDS and
+    EventSource reconnects automatically. Requires the ASGI server (503
+    under WSGI, where clients should poll unread-count/ instead).
+    """
+    if not _is_asgi(request):
+        return JsonResponse({'detail': 'Notification streaming is not available on this server.'}, status=503)
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    async def events():
+        deadline = time.monotonic() + settings.NOTIFICATION_STREAM_MAX_SECONDS
+        async with Subscription(user.id, heartbeat=settings.NOTIFICATION_STREAM_HEARTBEAT) as subscription:
+            yield "retry: 5000\n\n"
+            count = await sync_to_async(get_unread_count)(user.id)
+            yield _sse('unread_count', {'count': count})
+            while time.monotonic() < deadline:
+                item = await subscription.next_event()
+                if item is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield _sse(*item)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+    return response
+
+
+async def notification_poll(request):
+    """
+    Long-poll fallback for clients without EventSource.
+
+    GET ?count=<last unread count seen>. Returns at once if the count has
+    changed, otherwise waits up to NOTIFICATION_POLL_TIMEOUT seconds for the
+    next event (under WSGI it never waits). Response:
+    {"unread_count": n, "notifications": [...]}.
+    """
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    if not _is_asgi(request):
+        # Plain polling: answer at once rather than hold a WSGI thread
+        count = await sync_to_async(get_unread_count)(user.id)
+        return JsonResponse({'unread_count': count, 'notifications': []})
+
+    notifications = []
+    async with Subscription(user.id, heartbeat=settings.NOTIFICATION_POLL_TIMEOUT) as subscription:
+        count = await sync_to_async(get_unread_count)(user.id)
+        known = request.GET.get('count')
+        if known is not None and str(count) == known:
+            while True:
+                item = await subscription.next_event()
+                if item is None:
+                    break
+                event, data = item
+                if event == 'unread_count':
+                    count = data['count']
+                    break
+                notifications.append(data)
+    return JsonResponse({'unread_count': count, 'notifications': notifications})
@@ -0,0 +1,236 @@
+"""
+Retention and archival for notifications and audit log entries.
+
+Rows older than the retention configured in SystemConfiguration are moved,
+in batches, out of the hot tables into gzip-compressed JSON Lines files, one
+per table and month (ARCHIVE_DIR/<archive>/<YYYY-MM>.jsonl.gz). Nothing is
+archived until retention is configured (the defaults keep every row).
+
+Archived audit entries are read back by the audit log list a month at a time
+(iter_archived_months()). Archived notifications have no read path in the
+app: they disappear from users' lists and the files are kept as records.
+
+Rows are appended to the archive before they are deleted, so an interrupted
+run can only produce duplicates in the archive (readers skip them), never
+lose data. A row is always filed under its own created_at month, so
+duplicates never span files.
+"""
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from system_config.models import SystemConfiguration
+
+logger = logging.getLogger(__name__)
+
+# Archive name -> model, the field retention overrides are keyed on, and the
+# SystemConfiguration fields holding (default days, per-category overrides)
+ARCHIVES = {
+    'notifications': {
+        'model': 'notifications.Notification',
+        'category_field': 'notification_type',
+        'config_fields': ('notification_retention_days', 'notification_retention_by_type'),
+    },
+    'activity_logs': {
+        'model': 'audit.ActivityLog',
+        'category_field': 'action',
+        'config_fields': ('audit_log_retention_days', 'audit_log_retention_by_action'),
+    },
+}
+
+
+def get_retention_policy(name, config=None):
+    """
+    Return (default_days, {category: days}) for an archive.
+    0 days means "keep forever".
+    """
+    config = config or SystemConfiguration.get_active_config()
+    default_field, overrides_field = ARCHIVES[name]['config_fields']
+    overrides = {
+        str(category): int(days)
+        for category, days in (getattr(config, overrides_field) or {}).items()
+    }
+    return int(getattr(config, default_field) or 0), overrides
+
+
+def _expired_filter(name, now, config=None):
+    """Q matching rows past their retention, or None if everything is kept"""
+    category_field = ARCHIVES[name]['category_field']
+    default_days, overrides = get_retention_policy(name, config)
+
+    conditions = []
+    for category, days in overrides.items():
+        if days > 0:
+            conditions.append(Q(**{category_field: category, 'created_at__lt': now - timedelta(days=days)}))
+    if default_days > 0:
+        conditions.append(
+            Q(created_at__lt=now - timedelta(days=default_days)) & ~Q(**{f'{category_field}__in': list(overrides)})
+        )
+    if not conditions:
+        return None
+
+    expired = conditions[0]
+    for condition in conditions[1:]:
+        expired |= condition
+    return expired
+
+
+def archive_horizon(name, config=None, now=None):
+    """
+    Oldest moment for which the hot table is still guaranteed complete.
+    Date filters reaching before it must also read the archive.
+    Returns None when nothing is ever archived.
+    """
+    now = now or timezone.now()
+    default_days, overrides = get_retention_policy(name, config)
+    days = [d for d in [default_days, *overrides.values()] if d > 0]
+    if not days:
+        return None
+    return now - timedelta(days=min(days))
+
+
+def get_archive_path(name, month):
+    return os.path.join(settings.ARCHIVE_DIR, name, f'{month}.jsonl.gz')
+
+
+def _append(path, rows):
+    """Append rows as a new gzip member and flush it to disk"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as gz:
+            for row in rows:
+                gz.write(json.dumps(row, cls=DjangoJSONEncoder).encode('utf-8') + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _attach_user_details(rows):
+    """Store who the user was, since the account may be gone when the archive is read"""
+    user_ids = {row['user_id'] for row in rows if row.get('user_id')}
+    users = {
+        user['id']: user
+        for user in get_user_model().objects.filter(id__in=user_ids).values('id', 'email', 'first_name', 'last_name')
+    }
+    for row in rows:
+        user = users.get(row.get('user_id')) or {}
+        row['user_email'] = user.get('email', '')
+        row['user_first_name'] = user.get('first_name', '')
+        row['user_last_name'] = user.get('last_name', '')
+
+
+def archive_expired(name, batch_size=None, now=None, config=None):
+    """
+    Move expired rows of one archive into the monthly files.
+
+    Returns:
+        int: Number of rows archived
+    """
+    model = apps.get_model(ARCHIVES[name]['model'])
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    now = now or timezone.now()
+    expired_filter = _expired_filter(name, now, config)
+    if expired_filter is None:
+        return 0
+
+    expired = model.objects.filter(expired_filter).order_by('created_at')
+    archived = 0
+    while True:
+        rows = list(expired.values()[:batch_size])
+        if not rows:
+            break
+        if name == 'activity_logs':
+            _attach_user_details(rows)
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[row['created_at'].strftime('%Y-%m')].append(row)
+        for month, month_rows in by_month.items():
+            _append(get_archive_path(name, month), month_rows)
+
+        with transaction.atomic():
+            model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+
+    if archived:
+        logger.info(f"Archived {archived} {name} row(s)")
+    return archived
+
+
+def _utc_month(moment):
+    if timezone.is_aware(moment):
+        moment = moment.astimezone(dt_timezone.utc)
+    return moment.strftime('%Y-%m')
+
+
+def archive_months(name):
+    """Months with an archive file, oldest first"""
+    directory = os.path.join(settings.ARCHIVE_DIR, name)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(f[:7] for f in os.listdir(directory) if f.endswith('.jsonl.gz'))
+
+
+def archive_signature(name):
+    """Changes whenever an archive file is added or appended to (for cache keys)"""
+    signature = []
+    for month in archive_months(name):
+        stat = os.stat(get_archive_path(name, month))
+        signature.append(f'{month}:{stat.st_size}:{stat.st_mtime_ns}')
+    return ','.join(signature)
+
+
+def read_archive_month(name, month, start=None, end=None):
+    """Rows of one month's file (created_at as datetime) with start <= created_at < end"""
+    path = get_archive_path(name, month)
+    if not os.path.exists(path):
+        return []
+    rows = []
+    seen = set()
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            if row['id'] in seen:
+                continue
+            created_at = parse_datetime(row['created_at'])
+            if (start and created_at < start) or (end and created_at >= end):
+                continue
+            seen.add(row['id'])
+            row['created_at'] = created_at
+            rows.append(row)
+    return rows
+
+
+def iter_archived_months(name, start=None, end=None, newest_first=False):
+    """
+    Yield (month, rows) for each archive month overlapping [start, end).
+    Only one month is held in memory at a time.
+    """
+    # Files are named by the UTC month of the rows they hold
+    first = _utc_month(start) if start else ''
+    last = _utc_month(end) if end else '9999-12'
+    months = [month for month in archive_months(name) if first <= month <= last]
+    if newest_first:
+        months.reverse()
+    for month in months:
+        yield month, read_archive_month(name, month, start, end)
+
+
+def iter_archived(name, start=None, end=None):
+    """
+    Yield archived rows (dicts, created_at as datetime) with
+    start <= created_at < end, oldest month first.
+    """
+    for _month, rows in iter_archived_months(name, start, end):
+        yield from rows
@@ -160,3 +160,23 @@ def cleanup_old_backups():
         logger.error(f"Cleanup old backups task error: {str(e)}")
         return {"success": False, "error": str(e)}
 
+
+
+@shared_task
+def archive_expired_records():
+    """Move notifications and audit log entries past their retention into monthly archive files"""
+    from core.cache_utils import cache_lock
+    from system.archive import ARCHIVES, archive_expired
+
+    with cache_lock('archive_expired_records', timeout=6 * 60 * 60, wait=0) as acquired:
+        if not acquired:
+            logger.info("Archival already running, skipping")
+            return {"success": False, "error": "already running"}
+        try:
+            config = SystemConfiguration.get_active_config()
+            archived = {name: archive_expired(name, config=config) for name in ARCHIVES}
+            logger.info(f"Archival completed: {archived}")
+            return {"success": True, "archived": archived}
+        except Exception as e:
+            logger.error(f"Archive expired records task error: {str(e)}")
+            return {"success": False, "error": str(e)}
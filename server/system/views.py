@@ -1,7 +1,7 @@
 import os
 import subprocess
 import json
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.timezone import now
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 import logging
 import traceback
 from .models import BackupRecord
+from core.archives import save_upload
+from core.downloads import serve_file
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.utils import log_activity
 
@@ -254,6 +256,44 @@ def create_sql_backup_python(db_config, file_path):
     except Exception as e:
         return False, f"Python SQL backup failed: {str(e)}"
 
+def iter_sql_statements(f, chunk_size=1024 * 1024):
+    """Yield the statements of a SQL script read from `f` in chunks.
+
+    Splits on semicolons outside single/double-quoted strings (honouring
+    backslash escapes); string state carries over between chunks.
+    """
+    current = []
+    in_string = False
+    string_char = None
+    escaped = False
+
+    for chunk in iter(lambda: f.read(chunk_size), ''):
+        for char in chunk:
+            if escaped:
+                current.append(char)
+                escaped = False
+            elif char == '\\':
+                current.append(char)
+                escaped = True
+            elif char in ('"', "'") and not in_string:
+                in_string = True
+                string_char = char
+                current.append(char)
+            elif char == string_char and in_string:
+                in_string = False
+                string_char = None
+                current.append(char)
+            elif char == ';' and not in_string:
+                yield ''.join(current).strip()
+                current = []
+            else:
+                current.append(char)
+
+    # The last statement, if any
+    last = ''.join(current).strip()
+    if last:
+        yield last
+
 def restore_sql_backup_python(db_config, file_path):
     """Restore SQL backup using pure Python without mysql client"""
     try:
@@ -278,43 +318,9 @@ def restore_sql_backup_python(db_config, file_path):
             charset='utf8mb4'
         )
         
+        # Statements are read and executed one at a time, so memory stays flat for large dumps
         with conn.cursor() as cursor, open(file_path, 'r', encoding='utf-8') as f:
-            sql_script = f.read()
-            
-            # Split by semicolons but be careful about semicolons in strings
-            statements = []
-            current_statement = ""
-            in_string = False
-            string_char = None
-            escaped = False
-            
-            for char in sql_script:
-                if escaped:
-                    current_statement += char
-                    escaped = False
-                elif char == '\\':
-                    current_statement += char
-                    escaped = True
-                elif char in ('"', "'") and not in_string:
-                    in_string = True
-                    string_char = char
-                    current_statement += char
-                elif char == string_char and in_string:
-                    in_string = False
-                    string_char = None
-                    current_statement += char
-                elif char == ';' and not in_string:
-                    statements.append(current_statement.strip())
-                    current_statement = ""
-                else:
-                    current_statement += char
-            
-            # Add the last statement if any
-            if current_statement.strip():
-                statements.append(current_statement.strip())
-            
-            # Execute each statement
-            for statement in statements:
+            for statement in iter_sql_statements(f):
                 if statement and not statement.startswith('--') and not statement.startswith('/*'):
                     try:
                         cursor.execute(statement)
@@ -606,10 +612,8 @@ def restore_database(request):
             if not file.name.endswith('.sql'):
                 return JsonResponse({"error": "Only .sql files are supported"}, status=400)
                 
-            file_path = os.path.join(BACKUP_DIR, file.name)
-            with open(file_path, "wb+") as dest:
-                for chunk in file.chunks():
-                    dest.write(chunk)
+            # Moves Django's spooled temporary file into place instead of copying it
+            file_path = save_upload(file, os.path.join(BACKUP_DIR, os.path.basename(file.name)))
             file_name = file.name
             # Try to find existing BackupRecord for uploaded file
             try:
@@ -939,10 +943,14 @@ def download_backup(request, file_name):
             )
             return JsonResponse({"error": "Not a backup file"}, status=400)
             
-        # Serve the file for download
-        with open(file_path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/octet-stream')
-            response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        # Stream the file (resumable via Range, or offloaded to the web server)
+        response = serve_file(
+            request, file_path, filename=file_name, as_attachment=True, content_type='application/octet-stream'
+        )
+        # Log a download once: not for 304s or for the later pieces of a resumed transfer
+        if response.status_code == 200 or (
+            response.status_code == 206 and response['Content-Range'].startswith('bytes 0-')
+        ):
             log_activity(
                 audit_user,
                 AUDIT_ACTIONS["EXPORT"],
@@ -955,7 +963,7 @@ def download_backup(request, file_name):
                 },
                 request=request,
             )
-            return response
+        return response
             
     except Exception as e:
         logger.error(f"Download backup error: {str(e)}")
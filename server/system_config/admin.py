@@ -37,6 +37,14 @@ class SystemConfigurationAdmin(admin.ModelAdmin):
             'fields': ('quota_carry_over_enabled', 'quota_carry_over_policy'),
             'description': 'Configure how deficit amounts are handled between quarters.'
         }),
+        ('Data Retention Configuration', {
+            'fields': (
+                'notification_retention_days', 'notification_retention_by_type',
+                'audit_log_retention_days', 'audit_log_retention_by_action'
+            ),
+            'description': 'Rows older than these limits are moved to monthly archive files. 0 keeps them forever.',
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('is_active', 'created_at', 'updated_at'),
             'classes': ('collapse',)
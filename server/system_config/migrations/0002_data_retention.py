@@ -0,0 +1,33 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_config', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='systemconfiguration',
+            name='audit_log_retention_by_action',
+            field=models.JSONField(blank=True, default=dict, help_text='Per audit action overrides in days, e.g. {"view": 90}'),
+        ),
+        migrations.AddField(
+            model_name='systemconfiguration',
+            name='audit_log_retention_days',
+            field=models.IntegerField(default=0, help_text='Days to keep audit log entries before they are archived (0 = keep forever)'),
+        ),
+        migrations.AddField(
+            model_name='systemconfiguration',
+            name='notification_retention_by_type',
+            field=models.JSONField(blank=True, default=dict, help_text='Per notification type overrides in days, e.g. {"new_user": 30}'),
+        ),
+        migrations.AddField(
+            model_name='systemconfiguration',
+            name='notification_retention_days',
+            field=models.IntegerField(default=0, help_text='Days to keep notifications before they are archived (0 = keep forever). Archived notifications no longer appear in the app'),
+        ),
+    ]
@@ -54,6 +54,12 @@ class SystemConfiguration(models.Model):
         help_text="Enable carry-over of deficit amounts between quarters"
     )
     
+    # Data Retention Configuration (0 days = keep forever; archiving is opt-in)
+    notification_retention_days = models.IntegerField(default=0, help_text="Days to keep notifications before they are archived (0 = keep forever). Archived notifications no longer appear in the app")
+    notification_retention_by_type = models.JSONField(default=dict, blank=True, help_text="Per notification type overrides in days, e.g. {\"new_user\": 30}")
+    audit_log_retention_days = models.IntegerField(default=0, help_text="Days to keep audit log entries before they are archived (0 = keep forever)")
+    audit_log_retention_by_action = models.JSONField(default=dict, blank=True, help_text="Per audit action overrides in days, e.g. {\"view\": 90}")
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
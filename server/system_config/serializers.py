@@ -25,6 +25,10 @@ class SystemConfigurationSerializer(serializers.ModelSerializer):
             'backup_retention_days',
             'quota_carry_over_policy',
             'quota_carry_over_enabled',
+            'notification_retention_days',
+            'notification_retention_by_type',
+            'audit_log_retention_days',
+            'audit_log_retention_by_action',
             'created_at',
             'updated_at',
             'is_active'
@@ -57,6 +61,31 @@ class SystemConfigurationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Refresh token lifetime cannot exceed 365 days")
         return value
     
+    def _validate_retention_days(self, value):
+        if value < 0:
+            raise serializers.ValidationError("Retention must be 0 (keep forever) or a positive number of days")
+        return value
+    
+    def _validate_retention_overrides(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Retention overrides must be an object of {name: days}")
+        for key, days in value.items():
+            if not isinstance(days, int) or isinstance(days, bool) or days < 0:
+                raise serializers.ValidationError(f"Retention for '{key}' must be a non-negative whole number of days")
+        return value
+    
+    def validate_notification_retention_days(self, value):
+        return self._validate_retention_days(value)
+    
+    def validate_audit_log_retention_days(self, value):
+        return self._validate_retention_days(value)
+    
+    def validate_notification_retention_by_type(self, value):
+        return self._validate_retention_overrides(value)
+    
+    def validate_audit_log_retention_by_action(self, value):
+        return self._validate_retention_overrides(value)
+    
     def validate_default_from_email(self, value):
         """Validate default from email format - allow partial emails like noreply@"""
         if not value:
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_delete_emailqueue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['updated_at'], name='users_user_updated_cc7221_idx'),
+        ),
+    ]
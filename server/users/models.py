@@ -4,6 +4,16 @@ from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseU
 from django.utils import timezone
 from django.conf import settings
 from system_config.models import SystemConfiguration  # Import from system_config
+from core.search import SearchTextField, search_document
+
+# Fields combined into User.search_text
+SEARCH_FIELDS = ['first_name', 'middle_name', 'last_name', 'email', 'userlevel', 'section']
+
+
+def build_search_text(user):
+    """Text indexed for a user's keyword search"""
+    return search_document(*(getattr(user, field) for field in SEARCH_FIELDS))
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, password_provided=False, **extra_fields):
@@ -85,6 +95,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     account_locked_until = models.DateTimeField(null=True, blank=True)
     is_account_locked = models.BooleanField(default=False)
 
+    # Lower-cased name/e-mail/role text, kept in sync on save (FULLTEXT-indexed on MySQL)
+    search_text = SearchTextField(blank=True, default='', editable=False)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
@@ -93,10 +106,21 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.email} ({self.userlevel})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored document so signals can tell when inspections need re-indexing
+        instance._loaded_search_text = instance.__dict__.get('search_text')
+        return instance
+
     def save(self, *args, **kwargs):
         # Update the updated_at field on every save
         if self.pk:  # Only update if the object already exists
             self.updated_at = timezone.now()
+        self.search_text = build_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(SEARCH_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'search_text'}
         super().save(*args, **kwargs)
     
     DEFAULT_MAX_FAILED_LOGIN_ATTEMPTS = 10
@@ -187,4 +211,5 @@ class User(AbstractBaseUser, PermissionsMixin):
             models.Index(fields=['first_name', 'last_name']),
             models.Index(fields=['email']),
             models.Index(fields=['userlevel']),
+            models.Index(fields=['updated_at']),
         ]
\ No newline at end of file
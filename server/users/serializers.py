@@ -219,6 +219,15 @@ class UserSerializer(serializers.ModelSerializer):
             return []
 
 
+class UserSearchSerializer(serializers.ModelSerializer):
+    """Compact user row for global search results (no avatar URL or report access lookups)"""
+
+    class Meta:
+        model = User
+        fields = ('id', 'email', 'first_name', 'middle_name', 'last_name', 'userlevel', 'section', 'is_active')
+        read_only_fields = fields
+
+
 class MyTokenObtainPairSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
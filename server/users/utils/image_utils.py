@@ -6,6 +6,8 @@ from PIL import Image
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.utils import timezone
 
+from core.image_pipeline import flatten_to_rgb
+
 
 def optimize_avatar(image_file, user_id):
     """
@@ -30,15 +32,7 @@ def optimize_avatar(image_file, user_id):
         img = Image.open(image_file)
         
         # Convert RGBA to RGB if necessary (removes alpha channel)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            # Create white background
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
+        img = flatten_to_rgb(img)
         
         # Resize to 256x256 maintaining aspect ratio, crop center if needed
         target_size = (256, 256)
@@ -14,18 +14,19 @@ from .utils.otp_utils import generate_otp, verify_otp, send_otp_email
 from .utils.email_utils import send_account_activated_email, send_account_deactivated_email
 from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q
 from django.utils.dateparse import parse_datetime
 
 # Import from system_config for password generation
 # from system_config.models import SystemConfiguration  # No longer needed in views
 
 # Notifications
-from notifications.models import Notification
+from notifications.services import active_users, build_notifications, send_notifications
 
 # Audit logging
 from audit.constants import AUDIT_ACTIONS, AUDIT_MODULES
 from audit.utils import log_activity
+from core.pagination import CursorPaginationMixin, keyset_ordering
+from core.search import search_filter
 
 User = get_user_model()
 
@@ -331,84 +332,65 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def create_new_user_notifications(self, new_user):
-        division_chiefs = User.objects.filter(userlevel="Division Chief", is_active=True)
-
-        if new_user.userlevel == "Division Chief":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Division Chief Created',
-                    message=f'A new Division Chief ({new_user.email}) has been created.'
-                )
+        """Notify the new user's chain of command with a single INSERT"""
+        level = new_user.userlevel
+        section = new_user.section
+        fields = {'sender': new_user, 'notification_type': 'new_user'}
+        notifications = []
+
+        if level == "Division Chief":
+            notifications += build_notifications(
+                active_users("Division Chief"),
+                title='New Division Chief Created',
+                message=f'A new Division Chief ({new_user.email}) has been created.',
+                **fields,
+            )
 
-        elif new_user.userlevel == "Section Chief":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Section Chief Created',
-                    message=f'A new Section Chief ({new_user.email}) created for section: {new_user.section}.'
-                )
+        elif level == "Section Chief":
+            notifications += build_notifications(
+                active_users("Division Chief"),
+                title='New Section Chief Created',
+                message=f'A new Section Chief ({new_user.email}) created for section: {section}.',
+                **fields,
+            )
 
-        elif new_user.userlevel == "Unit Head":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Unit Head Created',
-                    message=f'A new Unit Head ({new_user.email}) created for section: {new_user.section}.'
-                )
-            section_chiefs = User.objects.filter(userlevel="Section Chief", section=new_user.section, is_active=True)
-            for recipient in section_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Unit Head Created',
-                    message=f'Unit Head ({new_user.email}) created in your section: {new_user.section}.'
-                )
+        elif level == "Unit Head":
+            notifications += build_notifications(
+                active_users("Division Chief"),
+                title='New Unit Head Created',
+                message=f'A new Unit Head ({new_user.email}) created for section: {section}.',
+                **fields,
+            )
+            notifications += build_notifications(
+                active_users("Section Chief", section=section),
+                title='New Unit Head Created',
+                message=f'Unit Head ({new_user.email}) created in your section: {section}.',
+                **fields,
+            )
 
-        elif new_user.userlevel == "Monitoring Personnel":
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created for section: {new_user.section}.'
-                )
-            section_chiefs = User.objects.filter(userlevel="Section Chief", section=new_user.section, is_active=True)
-            for recipient in section_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section}.'
-                )
-            unit_heads = User.objects.filter(userlevel="Unit Head", section=new_user.section, is_active=True)
-            for recipient in unit_heads:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section}.'
-                )
+        elif level == "Monitoring Personnel":
+            notifications += build_notifications(
+                active_users("Division Chief"),
+                title='New Monitoring Personnel Created',
+                message=f'New Monitoring Personnel ({new_user.email}) created for section: {section}.',
+                **fields,
+            )
+            notifications += build_notifications(
+                active_users(["Section Chief", "Unit Head"], section=section),
+                title='New Monitoring Personnel Created',
+                message=f'New Monitoring Personnel ({new_user.email}) created in your section: {section}.',
+                **fields,
+            )
 
-        elif new_user.userlevel in ["Admin", "Legal Unit"]:
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title=f'New {new_user.userlevel} Created',
-                    message=f'A new {new_user.userlevel} ({new_user.email}) has been created.'
-                )
+        elif level in ["Admin", "Legal Unit"]:
+            notifications += build_notifications(
+                active_users("Division Chief"),
+                title=f'New {level} Created',
+                message=f'A new {level} ({new_user.email}) has been created.',
+                **fields,
+            )
+
+        send_notifications(notifications)
 
 
 # ---------------------------
@@ -425,9 +407,10 @@ class ProfileView(APIView):
 # ---------------------------
 # List Users
 # ---------------------------
-class UserListView(generics.ListAPIView):
+class UserListView(CursorPaginationMixin, generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = keyset_ordering('updated_at', tiebreakers=())
 
     def get_queryset(self):
         return User.objects.exclude(userlevel="Admin").order_by('-updated_at')
@@ -443,12 +426,7 @@ class UserListView(generics.ListAPIView):
         # Apply search filter if provided
         search = request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(section__icontains=search)
-            )
+            queryset = queryset.filter(search_filter(search))
         
         # Apply role filter if provided
         role = request.query_params.get('role')
@@ -463,6 +441,12 @@ class UserListView(generics.ListAPIView):
             elif status == 'inactive':
                 queryset = queryset.filter(is_active=False)
         
+        # Cursor mode (?pagination=cursor): keyset pages, no OFFSET or count
+        if self.use_cursor_pagination():
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         # Calculate pagination
         total_count = queryset.count()
         start_index = (page - 1) * page_size
@@ -682,6 +666,7 @@ def toggle_user_active(request, pk):
                 "after": {"is_active": new_active_status},
             },
             request=request,
+            sync=True,
         )
 
         # Send email notification to the user
@@ -958,13 +943,7 @@ def user_search(request):
     if not query or len(query) < 2:
         return Response({'results': [], 'count': 0})
     
-    users = User.objects.filter(
-        Q(first_name__icontains=query) |
-        Q(middle_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(userlevel__icontains=query)
-    ).exclude(userlevel="Admin")
+    users = User.objects.filter(search_filter(query)).exclude(userlevel="Admin")
     
     serializer = UserSerializer(users, many=True)
     return Response({
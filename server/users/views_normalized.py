@@ -16,7 +16,7 @@ from .serializers_normalized import (
     UserAssignmentHistorySerializer, UserPermissionSerializer, MyTokenObtainPairSerializer
 )
 from .utils.otp_utils import generate_otp, verify_otp, send_otp_email
-from notifications.models import Notification
+from notifications.services import build_notifications, send_notifications
 from audit.utils import log_activity
 
 
@@ -194,100 +194,71 @@ class UserViewSet(viewsets.ModelViewSet):
         self.record_assignment_changes(old_user, new_user)
     
     def create_new_user_notifications(self, new_user):
-        """Create notifications for new user creation"""
+        """Create notifications for new user creation (single INSERT)"""
+        level = new_user.userlevel.code
+        section_name = new_user.section.name if new_user.section else "N/A"
         division_chiefs = User.objects.filter(userlevel__code='Division Chief', is_active=True)
+        section_staff = lambda codes: User.objects.filter(
+            userlevel__code__in=codes,
+            section=new_user.section,
+            is_active=True
+        )
+        fields = {'sender': new_user, 'notification_type': 'new_user'}
+        notifications = []
+        
+        if level == 'Division Chief':
+            notifications += build_notifications(
+                division_chiefs,
+                title='New Division Chief Created',
+                message=f'A new Division Chief ({new_user.email}) has been created.',
+                **fields
+            )
         
-        if new_user.userlevel.code == 'Division Chief':
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Division Chief Created',
-                    message=f'A new Division Chief ({new_user.email}) has been created.'
-                )
-        
-        elif new_user.userlevel.code == 'Section Chief':
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Section Chief Created',
-                    message=f'A new Section Chief ({new_user.email}) created for section: {new_user.section.name if new_user.section else "N/A"}.'
-                )
+        elif level == 'Section Chief':
+            notifications += build_notifications(
+                division_chiefs,
+                title='New Section Chief Created',
+                message=f'A new Section Chief ({new_user.email}) created for section: {section_name}.',
+                **fields
+            )
         
-        elif new_user.userlevel.code == 'Unit Head':
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Unit Head Created',
-                    message=f'A new Unit Head ({new_user.email}) created for section: {new_user.section.name if new_user.section else "N/A"}.'
-                )
-            
-            section_chiefs = User.objects.filter(
-                userlevel__code='Section Chief',
-                section=new_user.section,
-                is_active=True
+        elif level == 'Unit Head':
+            notifications += build_notifications(
+                division_chiefs,
+                title='New Unit Head Created',
+                message=f'A new Unit Head ({new_user.email}) created for section: {section_name}.',
+                **fields
+            )
+            notifications += build_notifications(
+                section_staff(['Section Chief']),
+                title='New Unit Head Created',
+                message=f'Unit Head ({new_user.email}) created in your section: {section_name}.',
+                **fields
             )
-            for recipient in section_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Unit Head Created',
-                    message=f'Unit Head ({new_user.email}) created in your section: {new_user.section.name if new_user.section else "N/A"}.'
-                )
         
-        elif new_user.userlevel.code == 'Monitoring Personnel':
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created for section: {new_user.section.name if new_user.section else "N/A"}.'
-                )
-            
-            section_chiefs = User.objects.filter(
-                userlevel__code='Section Chief',
-                section=new_user.section,
-                is_active=True
+        elif level == 'Monitoring Personnel':
+            notifications += build_notifications(
+                division_chiefs,
+                title='New Monitoring Personnel Created',
+                message=f'New Monitoring Personnel ({new_user.email}) created for section: {section_name}.',
+                **fields
             )
-            for recipient in section_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section.name if new_user.section else "N/A"}.'
-                )
-            
-            unit_heads = User.objects.filter(
-                userlevel__code='Unit Head',
-                section=new_user.section,
-                is_active=True
+            notifications += build_notifications(
+                section_staff(['Section Chief', 'Unit Head']),
+                title='New Monitoring Personnel Created',
+                message=f'New Monitoring Personnel ({new_user.email}) created in your section: {section_name}.',
+                **fields
             )
-            for recipient in unit_heads:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title='New Monitoring Personnel Created',
-                    message=f'New Monitoring Personnel ({new_user.email}) created in your section: {new_user.section.name if new_user.section else "N/A"}.'
-                )
         
-        elif new_user.userlevel.code in ['Admin', 'Legal Unit']:
-            for recipient in division_chiefs:
-                Notification.objects.create(
-                    recipient=recipient,
-                    sender=new_user,
-                    notification_type='new_user',
-                    title=f'New {new_user.userlevel.name} Created',
-                    message=f'A new {new_user.userlevel.name} ({new_user.email}) has been created.'
-                )
+        elif level in ['Admin', 'Legal Unit']:
+            notifications += build_notifications(
+                division_chiefs,
+                title=f'New {new_user.userlevel.name} Created',
+                message=f'A new {new_user.userlevel.name} ({new_user.email}) has been created.',
+                **fields
+            )
+        
+        send_notifications(notifications)
     
     def record_assignment_changes(self, old_user, new_user):
         """Record assignment changes in history"""
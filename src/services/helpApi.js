@@ -14,6 +14,21 @@ export const getHelpTopics = async () => {
   }
 };
 
+/**
+ * Search help topics on the server (title, description and tags; every word must match)
+ */
+export const searchHelpTopics = async (query, category) => {
+  try {
+    const params = { q: query };
+    if (category) params.category = category;
+    const response = await api.get('/help/topics/', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error searching help topics:', error);
+    throw error;
+  }
+};
+
 /**
  * Get all help categories from the API
  */